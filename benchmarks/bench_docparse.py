@@ -0,0 +1,42 @@
+"""
+Benchmark the single-pass documentation parser against BeautifulSoup.
+
+    python benchmarks/bench_docparse.py [--repeat 200]
+
+Every page under tests/fixtures/docs is parsed through
+  - bs4:   docs.extract_sections_bs4 (builds the full tree)
+  - fast:  docparse.extract_sections (one pass, stops after Format)
+and the best of `repeat` runs is reported in milliseconds per page.
+"""
+
+import argparse
+from pathlib import Path
+
+from rdatasets_search.docparse import extract_sections
+from rdatasets_search.docs import extract_sections_bs4
+from timing import best_of
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "docs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'page':<24} {'bytes':>7} {'bs4 ms':>8} {'fast ms':>8} {'speedup':>8}")
+    total_bs4 = total_fast = 0.0
+    for path in sorted(FIXTURES.glob("*.html")):
+        content = path.read_bytes()
+        assert extract_sections(content) == extract_sections_bs4(content)
+
+        bs4_ms = best_of(lambda: extract_sections_bs4(content), args.repeat)
+        fast_ms = best_of(lambda: extract_sections(content), args.repeat)
+        total_bs4 += bs4_ms
+        total_fast += fast_ms
+        print(f"{path.name:<24} {len(content):>7} {bs4_ms:>8.3f} {fast_ms:>8.3f} {bs4_ms / fast_ms:>7.1f}x")
+    print(f"{'total':<24} {'':>7} {total_bs4:>8.3f} {total_fast:>8.3f} {total_bs4 / total_fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark the secondary catalog indexes against plain polars filters.
+
+    python benchmarks/bench_index.py [--scales 1 10 100 1000] [--repeat 5]
+
+For each synthetic catalog size, every filter mix is timed through
+  - polars:  catalog.filter(<one expression per predicate>), building the
+             expressions as data_having did before the indexes
+  - index:   CatalogIndex.filter(predicates)  (index built beforehand)
+and the best of `repeat` runs is reported in milliseconds. The "mask"
+columns time only the predicate evaluation, without gathering the matching
+rows, which dominates the end-to-end time on large results.
+"""
+
+import argparse
+import time
+
+import polars as pl
+
+from rdatasets_search.index import CatalogIndex
+from rdatasets_search.search import parse_filter, predicate_expr
+from synthetic import BASE_SIZE, FILTER_MIXES, synthetic_catalog
+from timing import best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>10}  {'filters':<14} {'polars ms':>10} {'index ms':>10} {'speedup':>8}"
+        f" {'polars mask':>12} {'index mask':>11} {'speedup':>8}"
+    )
+    for scale in args.scales:
+        catalog = synthetic_catalog(scale)
+        start = time.perf_counter()
+        index = CatalogIndex(catalog)
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"{int(BASE_SIZE * scale):>10}  {'(index build)':<14} {'':>10} {build_ms:>10.2f}")
+
+        for name, filters in FILTER_MIXES.items():
+            predicates = [parse_filter(f) for f in filters]
+            exprs = [predicate_expr(p) for p in predicates]
+            assert index.filter(predicates).equals(catalog.filter(*exprs))
+
+            polars_ms = best_of(lambda: catalog.filter(*[predicate_expr(p) for p in predicates]), args.repeat)
+            index_ms = best_of(lambda: index.filter(predicates), args.repeat)
+            polars_mask_ms = best_of(
+                lambda: catalog.select(pl.all_horizontal([predicate_expr(p) for p in predicates])), args.repeat
+            )
+            index_mask_ms = best_of(lambda: index.mask_all(predicates), args.repeat)
+            print(
+                f"{len(catalog):>10}  {name:<14} {polars_ms:>10.2f} {index_ms:>10.2f} {polars_ms / index_ms:>7.1f}x"
+                f" {polars_mask_ms:>12.2f} {index_mask_ms:>11.2f} {polars_mask_ms / index_mask_ms:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Offline benchmark suite, with machine-readable results.
+
+    python benchmarks/bench_suite.py [--scales 1 10 100 1000] [--repeat 5]
+        [--catalog datasets.csv] [--output results.json] [--compare old.json]
+
+Nothing is downloaded: the catalog is synthetic (benchmarks/synthetic.py)
+or, with --catalog, a local copy of datasets.csv, resized to each scale and
+installed with search.set_catalog(). For every scale it times
+  - having:   data_having over several filter mixes, on an empty query cache
+              ("cold"), repeated ("warm") and refining a cached query, and
+              the same filters as one query on the SQLite backend ("sqlite"),
+              and the 20 largest matches, by top-k selection and by a full
+              sort ("top 20", "full sort")
+  - render:   one page of results, as drawn by paginate_results (slice,
+              numbering, format_dataframe_output), and paging through
+              paginate_results itself (forward, and back over pages already
+              drawn) with terminal I/O discarded
+and once, on the pages under tests/fixtures/docs,
+  - docparse: docparse.extract_sections, the BeautifulSoup fallback and
+              docs.parse_documentation
+
+Each result records the best and median of `repeat` runs in milliseconds.
+--output writes them as JSON together with the package, Python and polars
+versions; --compare reads an earlier file and reports the ratio of every
+case found in both, marking those slower by more than --threshold.
+"""
+
+import argparse
+import builtins
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+import polars as pl
+
+from rdatasets_search import cli, database, prefetch, search
+from rdatasets_search.docparse import extract_sections
+from rdatasets_search.docs import extract_sections_bs4, parse_documentation
+from synthetic import FILTER_MIXES, scale_catalog, synthetic_catalog
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "docs"
+
+# Matches kept in the top-k benchmark
+TOP = 20
+
+PAGE_SIZE = 30
+
+# Pages turned in the paginate_results benchmark
+PAGES = 10
+
+
+def timings(func, repeat: int, setup=None) -> dict:
+    """Return the best and median of `repeat` runs of func, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"best_ms": min(times), "median_ms": statistics.median(times)}
+
+
+def bench_having(catalog: pl.DataFrame, repeat: int, scratch: Path) -> list[dict]:
+    search.set_catalog(catalog)
+    database.build(catalog, scratch / database.DATABASE_NAME)
+    db = database.CatalogDatabase(scratch / database.DATABASE_NAME)
+    results = []
+    for name, filters in FILTER_MIXES.items():
+        # The first filter alone is cached before the refining query runs
+        predicates = [search.parse_filter(f) for f in filters]
+
+        def cache_base(filters=filters):
+            search.clear_query_cache()
+            search.data_having(filters[0])
+
+        cases = {
+            "cold": timings(lambda: search.data_having(*filters), repeat, setup=search.clear_query_cache),
+            "warm": timings(lambda: search.data_having(*filters), repeat),
+            "refine": timings(lambda: search.data_having(*filters), repeat, setup=cache_base),
+            "sqlite": timings(lambda: db.filter(predicates), repeat),
+            "top 20": timings(lambda: search.data_having(*filters, sort="rows", descending=True, limit=TOP), repeat),
+            "full sort": timings(
+                lambda: search.data_having(*filters).sort("Rows", descending=True, maintain_order=True).head(TOP), repeat,
+            ),
+        }
+        matches = len(search.data_having(*filters))
+        for mode, result in cases.items():
+            results.append({"benchmark": "having", "case": f"{name} ({mode})", "matches": matches, **result})
+    db.close()
+    return results
+
+
+@contextmanager
+def quiet_terminal(answers):
+    """Answer input() from answers and discard everything paginate_results draws"""
+    answers = iter(answers)
+
+    class NoPrefetch(prefetch.DocumentationPrefetcher):
+        def __init__(self):
+            super().__init__(fetch=lambda url: "")
+
+    with mock.patch.object(builtins, "input", lambda prompt="": next(answers)), \
+            mock.patch.object(cli, "clear_screen", lambda: None), \
+            mock.patch.object(cli.typer, "echo", lambda *args, **kwargs: None), \
+            mock.patch.object(prefetch, "DocumentationPrefetcher", NoPrefetch):
+        yield
+
+
+def bench_render(catalog: pl.DataFrame, repeat: int) -> list[dict]:
+    # The same steps paginate_results takes to draw a page
+    def render_page():
+        page = catalog.slice(0, PAGE_SIZE)
+        numbered = page.with_columns(pl.Series("No.", range(1, len(page) + 1))).select(
+            ["No.", "Package", "Item", "Title", "Rows", "Cols"]
+        )
+        return cli.format_dataframe_output(numbered)
+
+    pages = min(PAGES, -(-len(catalog) // PAGE_SIZE))
+
+    def page_through(answers):
+        with quiet_terminal(answers):
+            cli.paginate_results(catalog, catalog, page_size=PAGE_SIZE)
+
+    paging = timings(lambda: page_through(["n"] * (pages - 1) + ["q"]), repeat)
+    # Forward, then back over the pages already drawn
+    revisits = 2 * pages - 1
+    back_and_forth = timings(lambda: page_through(["n"] * (pages - 1) + ["p"] * (pages - 1) + ["q"]), repeat)
+    return [
+        {"benchmark": "render", "case": "format page", **timings(render_page, repeat)},
+        {
+            "benchmark": "render",
+            "case": "paginate_results (per page)",
+            "best_ms": paging["best_ms"] / pages,
+            "median_ms": paging["median_ms"] / pages,
+        },
+        {
+            "benchmark": "render",
+            "case": "paginate_results back and forth (per page)",
+            "best_ms": back_and_forth["best_ms"] / revisits,
+            "median_ms": back_and_forth["median_ms"] / revisits,
+        },
+    ]
+
+
+def bench_docparse(repeat: int) -> list[dict]:
+    results = []
+    for path in sorted(FIXTURES.glob("*.html")):
+        content = path.read_bytes()
+        for case, func in [
+            ("fast", extract_sections),
+            ("bs4", extract_sections_bs4),
+            ("parse_documentation", lambda content: parse_documentation(content, path.as_uri())),
+        ]:
+            results.append({
+                "benchmark": "docparse",
+                "case": f"{path.name} ({case})",
+                "bytes": len(content),
+                **timings(lambda: func(content), repeat),
+            })
+    return results
+
+
+def environment() -> dict:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        package_version = version("rdatasets-search")
+    except PackageNotFoundError:
+        package_version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "version": package_version,
+        "commit": commit,
+        "python": platform.python_version(),
+        "polars": pl.__version__,
+        "platform": platform.platform(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def result_key(result: dict) -> tuple:
+    return (result["benchmark"], result.get("scale"), result["case"])
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float) -> None:
+    """Print how every case changed relative to baseline"""
+    before = {result_key(r): r for r in baseline}
+    print(f"\n{'benchmark':<9} {'scale':>7}  {'case':<44} {'old ms':>9} {'new ms':>9} {'ratio':>7}")
+    for result in results:
+        old = before.get(result_key(result))
+        if old is None:
+            continue
+        ratio = result["best_ms"] / old["best_ms"] if old["best_ms"] else float("inf")
+        flag = "  slower" if ratio > 1 + threshold else ""
+        scale = "" if result.get("scale") is None else f"{result['scale']:g}x"
+        print(
+            f"{result['benchmark']:<9} {scale:>7}  {result['case']:<44}"
+            f" {old['best_ms']:>9.3f} {result['best_ms']:>9.3f} {ratio:>6.2f}x{flag}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--catalog", type=Path, help="local datasets.csv to scale instead of a synthetic catalog")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="ratio above 1 reported as slower (default: 0.1)")
+    args = parser.parse_args()
+
+    base = pl.read_csv(args.catalog) if args.catalog else None
+    results = []
+    # Derived indexes are built in a scratch cache, never the user's
+    with tempfile.TemporaryDirectory() as scratch, \
+            mock.patch.dict("os.environ", {"RDATASETS_CACHE_DIR": scratch}):
+        for scale in args.scales:
+            catalog = scale_catalog(base, scale) if base is not None else synthetic_catalog(scale)
+            for result in bench_having(catalog, args.repeat, Path(scratch)) + bench_render(catalog, args.repeat):
+                results.append({"scale": scale, "rows": len(catalog), **result})
+        search.set_catalog(None)
+        results += bench_docparse(args.repeat * 20)
+
+    print(f"{'benchmark':<9} {'rows':>9}  {'case':<44} {'best ms':>9} {'median ms':>10}")
+    for result in results:
+        rows = result.get("rows", "")
+        print(f"{result['benchmark']:<9} {rows:>9}  {result['case']:<44} {result['best_ms']:>9.3f} {result['median_ms']:>10.3f}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text())["results"], args.threshold)
+
+    if args.output:
+        report = {
+            "environment": environment(),
+            "catalog": str(args.catalog) if args.catalog else "synthetic",
+            "repeat": args.repeat,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nWrote {len(results)} results to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
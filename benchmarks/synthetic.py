@@ -0,0 +1,88 @@
+"""
+Synthetic catalogs with the same schema as Rdatasets' datasets.csv.
+
+The real index has roughly 2,300 datasets; `scale` multiplies that size.
+Values are derived from hashes of the row number, so a given (scale, seed)
+always produces the same catalog.
+"""
+
+import polars as pl
+
+BASE_SIZE = 2300
+
+# data_having filter mixes timed by the benchmarks, from a single type flag
+# to several types and ranges
+FILTER_MIXES = {
+    "one type": ["binary"],
+    "two types": ["binary", "factor"],
+    "range": ["rows > 1000"],
+    "narrow range": ["rows == 100"],
+    "type + range": ["factor", "rows > 1000"],
+    "all": ["binary", "numeric", "rows >= 100", "cols < 10"],
+}
+
+# Share of datasets that have at least one column of each type, roughly
+# matching the live catalog
+TYPE_SHARES = {
+    "n_binary": 0.35,
+    "n_character": 0.15,
+    "n_factor": 0.40,
+    "n_logical": 0.05,
+    "n_numeric": 0.90,
+}
+
+WORDS = [
+    "data", "survival", "wage", "income", "survey", "growth", "trial", "health",
+    "prices", "housing", "cancer", "panel", "election", "crime", "weather",
+    "education", "experiment", "patients", "counts", "time", "series", "model",
+]
+
+
+def _uniform(i: pl.Expr, seed: int) -> pl.Expr:
+    """Deterministic pseudo-random numbers in [0, 1)"""
+    return (i.hash(seed) % 1_000_003) / 1_000_003
+
+
+def synthetic_catalog(scale: float = 1, seed: int = 0) -> pl.DataFrame:
+    """Return a catalog of BASE_SIZE * scale synthetic datasets"""
+    n = max(1, int(BASE_SIZE * scale))
+    n_packages = max(1, n // 12)
+    words = pl.Series(WORDS)
+    i = pl.col("rownames")
+
+    def word(k: int) -> pl.Expr:
+        return pl.lit(words).gather((_uniform(i, seed + 10 + k) * len(WORDS)).cast(pl.UInt32))
+
+    df = pl.DataFrame({"rownames": pl.int_range(1, n + 1, eager=True)})
+    df = df.with_columns(
+        Package=pl.format("pkg{}", (_uniform(i, seed) * n_packages).cast(pl.Int64)),
+        Item=pl.format("item{}", i),
+        Title=pl.concat_str([word(k) for k in range(4)], separator=" ").str.to_titlecase(),
+        # Dataset sizes are heavy-tailed
+        Rows=(_uniform(i, seed + 1) * 12).exp().cast(pl.Int64) + 1,
+        Cols=(_uniform(i, seed + 2) * 39).cast(pl.Int64) + 1,
+        **{
+            col: pl.when(_uniform(i, seed + 3 + k) < share)
+            .then((_uniform(i, seed + 20 + k) * 9).cast(pl.Int64) + 1)
+            .otherwise(0)
+            for k, (col, share) in enumerate(TYPE_SHARES.items())
+        },
+    )
+    return df.with_columns(
+        CSV=pl.format("https://vincentarelbundock.github.io/Rdatasets/csv/{}/{}.csv", "Package", "Item"),
+        Doc=pl.format("https://vincentarelbundock.github.io/Rdatasets/doc/{}/{}.html", "Package", "Item"),
+    )
+
+
+def scale_catalog(catalog: pl.DataFrame, scale: float) -> pl.DataFrame:
+    """
+    Resize a real catalog by `scale`, repeating its rows with renamed items
+    (Item, Item.2, Item.3, ...) so that Package/Item stays unique.
+    """
+    n = max(1, int(len(catalog) * scale))
+    copies = -(-n // len(catalog))
+    df = pl.concat([
+        catalog.with_columns(Item=pl.col("Item") + f".{copy + 1}") if copy else catalog
+        for copy in range(copies)
+    ]).head(n)
+    return df.with_columns(rownames=pl.int_range(1, n + 1))
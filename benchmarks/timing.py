@@ -0,0 +1,15 @@
+"""
+Timing helper shared by the benchmarks.
+"""
+
+import time
+
+
+def best_of(func, repeat):
+    """Return the fastest of `repeat` runs of func, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
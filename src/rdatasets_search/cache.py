@@ -0,0 +1,169 @@
+"""
+On-disk cache of the Rdatasets index.
+
+The last downloaded ``datasets.csv`` is kept as an uncompressed Arrow IPC
+snapshot under the user cache directory, next to a small JSON file with the
+HTTP validators (ETag / Last-Modified) and the time of the last check.
+
+While the snapshot is younger than the TTL it is read straight from disk
+(polars memory-maps uncompressed IPC files). Once it is stale, the index is
+revalidated with a conditional request; a ``304 Not Modified`` only refreshes
+the timestamp. If the network is unavailable, the stale snapshot is used.
+
+Environment variables:
+  - RDATASETS_CACHE_DIR: cache directory (default: $XDG_CACHE_HOME/rdatasets-search)
+  - RDATASETS_CACHE_TTL: seconds before revalidation (default: 86400)
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+# polars and requests are imported by the functions that use them, so that
+# cache_dir() stays cheap for callers such as the daemon client
+if TYPE_CHECKING:
+    import polars as pl
+
+
+DEFAULT_TTL = 24 * 60 * 60
+
+SNAPSHOT_NAME = "datasets.arrow"
+META_NAME = "datasets.json"
+
+
+def cache_dir() -> Path:
+    """Return the cache directory, honouring RDATASETS_CACHE_DIR and XDG_CACHE_HOME"""
+    override = os.environ.get("RDATASETS_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "rdatasets-search"
+
+
+def cache_ttl() -> float:
+    """Return the revalidation TTL in seconds from RDATASETS_CACHE_TTL"""
+    value = os.environ.get("RDATASETS_CACHE_TTL")
+    if value is None:
+        return DEFAULT_TTL
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid RDATASETS_CACHE_TTL: {value!r}. Expected a number of seconds")
+
+
+def _read_meta(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def temp_path(path: Path) -> Path:
+    """Return a temporary file name next to path for writing it atomically"""
+    # Unique per process and thread, so concurrent writers of the same file do not clash
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write bytes to path through a temporary file and a rename"""
+    tmp = temp_path(path)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def catalog_fingerprint(catalog: pl.DataFrame) -> str:
+    """Return a fingerprint of the whole catalog, used to detect changes"""
+    return f"{int(catalog.hash_rows(seed=0).sum())}:{catalog.height}:{','.join(catalog.columns)}"
+
+
+def _write_snapshot(df: pl.DataFrame, directory: Path, meta: dict) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    buffer = io.BytesIO()
+    # Uncompressed so that the snapshot can be memory-mapped on read
+    df.write_ipc(buffer)
+    write_atomic(directory / SNAPSHOT_NAME, buffer.getvalue())
+    write_atomic(directory / META_NAME, json.dumps(meta).encode("utf-8"))
+
+
+def load_index(url: str, ttl: float | None = None, directory: Path | None = None) -> pl.DataFrame:
+    """
+    Load the dataset index from the cache, revalidating it against url when stale.
+    """
+    import polars as pl
+    import requests
+    from . import net
+
+    if ttl is None:
+        ttl = cache_ttl()
+    if directory is None:
+        directory = cache_dir()
+
+    snapshot = directory / SNAPSHOT_NAME
+    meta_path = directory / META_NAME
+    meta = _read_meta(meta_path) if snapshot.exists() else {}
+
+    if meta.get("url") == url and time.time() - meta.get("checked", 0) < ttl:
+        return pl.read_ipc(snapshot)
+
+    headers = {}
+    if meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = net.get(url, headers=headers)
+        response.raise_for_status()
+    except requests.RequestException:
+        if meta.get("url") == url:
+            # Offline or slow network: a stale index beats no index
+            return pl.read_ipc(snapshot)
+        raise
+
+    if response.status_code == 304:
+        meta["checked"] = time.time()
+        try:
+            write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError:
+            pass
+        return pl.read_ipc(snapshot)
+
+    df = pl.read_csv(io.BytesIO(response.content))
+    new_meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "checked": time.time(),
+    }
+    try:
+        _write_snapshot(df, directory, new_meta)
+    except OSError:
+        # A read-only or full cache directory must not break searching
+        pass
+    return df
+
+
+def clear_cache(directory: Path | None = None) -> None:
+    """Remove the cached index snapshot"""
+    if directory is None:
+        directory = cache_dir()
+    for name in (SNAPSHOT_NAME, META_NAME):
+        try:
+            (directory / name).unlink()
+        except FileNotFoundError:
+            pass
@@ -1,26 +1,41 @@
+from __future__ import annotations
+
 import typer
-import polars as pl
-from typing import List
-from .search import data_having
+from collections import OrderedDict
+from typing import List, TYPE_CHECKING
 import sys
 import shutil
-import requests
-from bs4 import BeautifulSoup, Tag
-import re
 import os
+from pathlib import Path
+from .docs import fetch_documentation
+
+# polars, requests and bs4 are imported inside the functions that use them,
+# so that commands like `info` and `--help` start without loading them.
+if TYPE_CHECKING:
+    import polars as pl
 
 app = typer.Typer(help="R Datasets Search CLI")
 
-def format_dataframe_output(df: pl.DataFrame) -> str:
+# ANSI escapes: cursor home, clear the screen and the scrollback
+CLEAR_SCREEN = "\033[H\033[2J\033[3J"
+
+def terminal_width(default: int = 80) -> int:
+    """Return the terminal width in columns, or default if it is unknown"""
+    try:
+        return shutil.get_terminal_size().columns
+    except:
+        return default
+
+def format_dataframe_output(df: pl.DataFrame, width: int | None = None) -> str:
     """
     Format Polars DataFrame for better CLI output without truncation
     """
-    # Get terminal width, with max of 100 and fallback to 80
-    try:
-        terminal_width = shutil.get_terminal_size().columns
-        table_width = min(terminal_width, 100)
-    except:
-        table_width = 80
+    import polars as pl
+
+    # Fit the terminal width, with max of 100
+    if width is None:
+        width = terminal_width()
+    table_width = min(width, 100)
     
     # Configure Polars to show more rows and columns
     with pl.Config(
@@ -33,103 +48,27 @@ def format_dataframe_output(df: pl.DataFrame) -> str:
     ):
         return str(df)
 
-def fetch_documentation(doc_url: str) -> str:
-    """
-    Fetch and format documentation from the given URL
-    """
-    try:
-        response = requests.get(doc_url, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else "Documentation"
-        
-        # Remove " R Documentation" suffix if present
-        title_text = re.sub(r'\s*R Documentation$', '', title_text)
-        
-        # Extract main content
-        main_content = soup.find('div', {'id': 'main'}) or soup.find('div', class_='main') or soup.body
-        
-        if not main_content:
-            return f"Title: {title_text}\nURL: {doc_url}\n\nCould not extract main content from the documentation."
-        
-        # Remove script and style elements
-        if main_content and isinstance(main_content, Tag):
-            for script in main_content.find_all(["script", "style"]):
-                script.decompose()
-        
-        result = f"Title: {title_text}\nURL: {doc_url}\n\n"
-        
-        # Extract description section
-        description_section = main_content.find('h3', string='Description')
-        if description_section:
-            desc_content = []
-            for sibling in description_section.find_next_siblings():
-                if sibling.name == 'h3':
-                    break
-                if sibling.name == 'p':
-                    desc_content.append(sibling.get_text().strip())
-            if desc_content:
-                result += '\n'.join(desc_content) + '\n\n'
-        
-        # Extract format/variables section
-        format_section = main_content.find('h3', string='Format') or main_content.find('h3', string='Variables')
-        if format_section:
-            result += "## Variables\n\n"
-            
-            # Get description before the definition list
-            format_desc = []
-            for sibling in format_section.find_next_siblings():
-                if sibling.name == 'h3':
-                    break
-                if sibling.name == 'p':
-                    format_desc.append(sibling.get_text().strip())
-                elif sibling.name == 'dl':
-                    break
-            
-            if format_desc:
-                result += '\n'.join(format_desc) + '\n\n'
-            
-            # Extract definition list (dt/dd pairs)
-            dl = format_section.find_next_sibling('dl')
-            if not dl:
-                # Look for dl in subsequent siblings
-                for sibling in format_section.find_next_siblings():
-                    if sibling.name == 'dl':
-                        dl = sibling
-                        break
-                    elif sibling.name == 'h3':
-                        break
-            
-            if dl:
-                dt_elements = dl.find_all('dt')
-                dd_elements = dl.find_all('dd')
-                
-                for dt, dd in zip(dt_elements, dd_elements):
-                    dt_text = dt.get_text().strip()
-                    dd_text = dd.get_text().strip()
-                    result += f"{dt_text} : {dd_text}\n"
-        
-        # Limit total length
-        if len(result) > 3000:
-            result = result[:3000] + "...\n\n[Content truncated - visit URL for full documentation]"
-        
-        return result
-        
-    except requests.RequestException as e:
-        return f"Error fetching documentation: {e}\nURL: {doc_url}"
-    except Exception as e:
-        return f"Error parsing documentation: {e}\nURL: {doc_url}"
-
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if os.name == 'nt':
+        # Older Windows consoles do not interpret ANSI escapes
+        os.system('cls')
+    else:
+        # Writing the escapes avoids spawning `clear` on every keypress
+        typer.echo(CLEAR_SCREEN, nl=False)
 
-def download_dataset(csv_url: str, dataset_name: str) -> bool:
+def print_progress(done: int, total: int | None):
+    """Show download progress on a single terminal line"""
+    if total:
+        typer.echo(f"\r  {done / total:6.1%} ({done / 1e6:.1f} of {total / 1e6:.1f} MB)", nl=False)
+    else:
+        typer.echo(f"\r  {done / 1e6:.1f} MB", nl=False)
+
+def download_dataset(csv_url: str, dataset_name: str, checksum: str | None = None) -> bool:
     """Download dataset from CSV URL to current directory"""
+    import requests
+    from .download import ChecksumError, stream_download
+
     try:
         # Ask for confirmation
         response = input(f"Download {dataset_name}.csv to current directory? (yes/no): ").strip().lower()
@@ -137,37 +76,36 @@ def download_dataset(csv_url: str, dataset_name: str) -> bool:
             typer.echo("Download cancelled.")
             return False
         
-        # Download the file
+        # Stream the file to disk, resuming an interrupted download
         typer.echo(f"Downloading {dataset_name}.csv...")
-        response = requests.get(csv_url, timeout=30)
-        response.raise_for_status()
-        
-        # Save to current directory
         filename = f"{dataset_name}.csv"
-        with open(filename, 'wb') as f:
-            f.write(response.content)
+        stream_download(csv_url, filename, checksum=checksum, progress=print_progress)
+        typer.echo("")
         
         typer.echo(f"Successfully downloaded {filename}")
         return True
         
     except requests.RequestException as e:
-        typer.echo(f"Error downloading file: {e}")
+        typer.echo(f"\nError downloading file: {e}")
+        typer.echo("The partial download was kept; download again to resume.")
+        return False
+    except ChecksumError as e:
+        typer.echo(f"\nError verifying file: {e}")
+        return False
+    except FileNotFoundError as e:
+        # Serving from a mirror that was synced without --csv
+        typer.echo(f"\nError downloading file: {e}")
         return False
     except Exception as e:
-        typer.echo(f"Error saving file: {e}")
+        typer.echo(f"\nError saving file: {e}")
         return False
 
-def display_documentation_with_navigation(doc_content: str, dataset_num: int, original_df: pl.DataFrame):
+def display_documentation_with_navigation(doc_content: str, dataset_num: int, dataset_row: dict):
     """Display documentation with navigation back to table"""
     while True:
         clear_screen()
         
-        # Get terminal width for separator lines
-        try:
-            terminal_width = shutil.get_terminal_size().columns
-            separator_width = min(terminal_width, 80)
-        except:
-            separator_width = 80
+        separator_width = min(terminal_width(), 80)
         
         typer.echo(f"Documentation for dataset #{dataset_num}")
         typer.echo("=" * separator_width)
@@ -186,7 +124,6 @@ def display_documentation_with_navigation(doc_content: str, dataset_num: int, or
             return 'q'
         elif choice == 'd':
             # Get dataset info for download
-            dataset_row = original_df.row(dataset_num - 1, named=True)
             csv_url = dataset_row["CSV"]
             package_name = dataset_row["Package"]
             item_name = dataset_row["Item"]
@@ -202,123 +139,226 @@ def display_documentation_with_navigation(doc_content: str, dataset_num: int, or
             typer.echo("Invalid choice. Press 'b' to go back, 'd' to download, or 'q' to quit.")
             input("Press Enter to continue...")
 
-def paginate_results(df: pl.DataFrame, original_df: pl.DataFrame, page_size: int | None = None):
+class PageRenderer:
     """
-    Display results with pagination using screen clearing like less
+    Render pages of results as screen text, remembering the pages already
+    drawn. Pages are keyed by page number and terminal width, so a page is
+    formatted again only after the terminal was resized.
+
+    df may be a LazyFrame (e.g. a sort): its rows are collected one page at
+    a time, when the page is first drawn.
     """
-    # Calculate adaptive page size based on terminal height
-    if page_size is None:
-        try:
-            terminal_height = shutil.get_terminal_size().lines
-            # Reserve space for header (3 lines), navigation (4 lines), and some buffer (3 lines)
-            available_lines = terminal_height - 10
-            # Minimum 10 rows, maximum 30 rows
-            page_size = max(10, min(available_lines, 30))
-        except:
-            page_size = 30  # fallback
-    
-    total_rows = len(df)
-    total_pages = (total_rows + page_size - 1) // page_size
-    current_page = 1
-    
-    while True:
-        # Clear screen and display current page
-        clear_screen()
-        
-        # Calculate start and end indices for current page
-        start_idx = (current_page - 1) * page_size
-        end_idx = min(start_idx + page_size, total_rows)
-        
-        # Get current page data and add row numbers
-        page_data = df.slice(start_idx, page_size)
+
+    # Rendered pages kept, most recently drawn last
+    MAX_PAGES = 64
+
+    def __init__(self, df: pl.DataFrame | pl.LazyFrame, page_size: int, total_rows: int | None = None):
+        import polars as pl
+
+        self.df = df
+        self.page_size = page_size
+        if total_rows is None:
+            total_rows = df.select(pl.len()).collect().item() if isinstance(df, pl.LazyFrame) else len(df)
+        self.total_rows = total_rows
+        self.total_pages = (self.total_rows + page_size - 1) // page_size
+        self.pages: OrderedDict[tuple[int, int], str] = OrderedDict()
+        self.frames: OrderedDict[int, pl.DataFrame] = OrderedDict()
+
+    def rows(self, page: int) -> pl.DataFrame:
+        """Return the rows of page (1-based), collecting them on first use"""
+        import polars as pl
+
+        if page in self.frames:
+            self.frames.move_to_end(page)
+            return self.frames[page]
+        frame = self.df.slice((page - 1) * self.page_size, self.page_size)
+        if isinstance(frame, pl.LazyFrame):
+            frame = frame.collect()
+        self.frames[page] = frame
+        if len(self.frames) > self.MAX_PAGES:
+            self.frames.popitem(last=False)
+        return frame
+
+    def row(self, number: int) -> dict:
+        """Return result number (1-based) as a dict"""
+        page, offset = divmod(number - 1, self.page_size)
+        return self.rows(page + 1).row(offset, named=True)
+
+    def render(self, page: int, width: int) -> str:
+        """Return the screen text of page (1-based) for a terminal width"""
+        key = (page, width)
+        if key in self.pages:
+            self.pages.move_to_end(key)
+            return self.pages[key]
+        text = self._render(page, width)
+        self.pages[key] = text
+        if len(self.pages) > self.MAX_PAGES:
+            self.pages.popitem(last=False)
+        return text
+
+    def _render(self, page: int, width: int) -> str:
+        import polars as pl
+
+        start_idx = (page - 1) * self.page_size
+        end_idx = min(start_idx + self.page_size, self.total_rows)
         
         # Add sequential row numbers starting from the global position
+        page_data = self.rows(page)
         page_data_with_numbers = page_data.with_columns([
             pl.Series("No.", range(start_idx + 1, start_idx + len(page_data) + 1))
         ]).select([
             "No.", "Package", "Item", "Title", "Rows", "Cols"
         ])
         
-        # Get terminal width for separator lines
-        try:
-            terminal_width = shutil.get_terminal_size().columns
-            separator_width = min(terminal_width, 80)
-        except:
-            separator_width = 80
-        
-        # Display page header
-        typer.echo(f"Page {current_page} of {total_pages} (showing {start_idx + 1}-{end_idx} of {total_rows} results)")
-        typer.echo("=" * separator_width)
-        
-        # Display the data
-        formatted_output = format_dataframe_output(page_data_with_numbers)
-        typer.echo(formatted_output)
-        
-        # Display navigation options
-        typer.echo("\n" + "=" * separator_width)
+        separator = "=" * min(width, 80)
         nav_options = []
-        if current_page > 1:
+        if page > 1:
             nav_options.append("p) Previous page")
-        if current_page < total_pages:
+        if page < self.total_pages:
             nav_options.append("n) Next page")
         nav_options.extend(["q) Quit", "g) Go to page", "NUMBER) Show documentation"])
         
-        typer.echo("Navigation: " + " | ".join(nav_options))
-        
-        # Get user input
+        return "\n".join([
+            f"Page {page} of {self.total_pages} (showing {start_idx + 1}-{end_idx} of {self.total_rows} results)",
+            separator,
+            format_dataframe_output(page_data_with_numbers, width),
+            "\n" + separator,
+            "Navigation: " + " | ".join(nav_options),
+        ])
+
+def paginate_results(df: pl.DataFrame | pl.LazyFrame, original_df: pl.DataFrame | pl.LazyFrame,
+                     page_size: int | None = None, total_rows: int | None = None):
+    """
+    Display results with pagination using screen clearing like less.
+
+    original_df holds the same rows as df with every column (df may be
+    original_df itself). Either may be a LazyFrame, collected one page at a
+    time; total_rows saves counting its rows.
+    """
+    from .prefetch import DocumentationPrefetcher
+
+    # Calculate adaptive page size based on terminal height
+    if page_size is None:
         try:
-            choice = input("\nEnter your choice: ").strip().lower()
-        except (KeyboardInterrupt, EOFError):
-            typer.echo("\nExiting...")
-            break
-        
-        if choice == 'q':
-            break
-        elif choice == 'n' and current_page < total_pages:
-            current_page += 1
-        elif choice == 'p' and current_page > 1:
-            current_page -= 1
-        elif choice == 'g':
+            terminal_height = shutil.get_terminal_size().lines
+            # Reserve space for header (3 lines), navigation (4 lines), and some buffer (3 lines)
+            available_lines = terminal_height - 10
+            # Minimum 10 rows, maximum 30 rows
+            page_size = max(10, min(available_lines, 30))
+        except:
+            page_size = 30  # fallback
+    
+    renderer = PageRenderer(df, page_size, total_rows)
+    total_pages = renderer.total_pages
+    total_rows = renderer.total_rows
+    # Documentation URLs and downloads come from the rows with every column
+    details = renderer if original_df is df else PageRenderer(original_df, page_size, total_rows)
+    current_page = 1
+    
+    # Fetch the documentation of the visible datasets in the background
+    with DocumentationPrefetcher() as prefetcher:
+        while True:
+            prefetcher.prefetch(details.rows(current_page)["Doc"].to_list())
+            
+            # Pages already seen at this width are not formatted again
+            width = terminal_width()
+            separator_width = min(width, 80)
+            clear_screen()
+            typer.echo(renderer.render(current_page, width))
+            
+            # Get user input
             try:
-                page_num = int(input(f"Enter page number (1-{total_pages}): "))
-                if 1 <= page_num <= total_pages:
-                    current_page = page_num
+                choice = input("\nEnter your choice: ").strip().lower()
+            except (KeyboardInterrupt, EOFError):
+                typer.echo("\nExiting...")
+                break
+            
+            if choice == 'q':
+                break
+            elif choice == 'n' and current_page < total_pages:
+                current_page += 1
+            elif choice == 'p' and current_page > 1:
+                current_page -= 1
+            elif choice == 'g':
+                try:
+                    page_num = int(input(f"Enter page number (1-{total_pages}): "))
+                    if 1 <= page_num <= total_pages:
+                        current_page = page_num
+                    else:
+                        typer.echo(f"Invalid page number. Please enter a number between 1 and {total_pages}.")
+                        input("Press Enter to continue...")
+                except ValueError:
+                    typer.echo("Invalid input. Please enter a valid page number.")
+                    input("Press Enter to continue...")
+            elif choice.isdigit():
+                # User entered a number to view documentation
+                row_num = int(choice)
+                if 1 <= row_num <= total_rows:
+                    # Get the documentation URL for this row
+                    dataset_row = details.row(row_num)
+                    doc_url = dataset_row["Doc"]
+                    
+                    # Show loading message
+                    clear_screen()
+                    typer.echo(f"Fetching documentation for dataset #{row_num}...")
+                    typer.echo("=" * separator_width)
+                    
+                    # Use the prefetched documentation when it is ready
+                    doc_content = prefetcher.get(doc_url)
+                    
+                    # Display documentation with navigation
+                    nav_result = display_documentation_with_navigation(doc_content, row_num, dataset_row)
+                    if nav_result == 'q':
+                        break
+                    # If nav_result == 'back', continue to show the table
                 else:
-                    typer.echo(f"Invalid page number. Please enter a number between 1 and {total_pages}.")
+                    typer.echo(f"Invalid dataset number. Please enter a number between 1 and {total_rows}.")
                     input("Press Enter to continue...")
-            except ValueError:
-                typer.echo("Invalid input. Please enter a valid page number.")
-                input("Press Enter to continue...")
-        elif choice.isdigit():
-            # User entered a number to view documentation
-            row_num = int(choice)
-            if 1 <= row_num <= len(original_df):
-                # Get the documentation URL for this row
-                doc_url = original_df.row(row_num - 1, named=True)["Doc"]
-                
-                # Show loading message
-                clear_screen()
-                typer.echo(f"Fetching documentation for dataset #{row_num}...")
-                typer.echo("=" * separator_width)
-                
-                # Fetch and display documentation
-                doc_content = fetch_documentation(doc_url)
-                
-                # Display documentation with navigation
-                nav_result = display_documentation_with_navigation(doc_content, row_num, original_df)
-                if nav_result == 'q':
-                    break
-                # If nav_result == 'back', continue to show the table
             else:
-                typer.echo(f"Invalid dataset number. Please enter a number between 1 and {len(original_df)}.")
+                typer.echo("Invalid choice. Please try again.")
                 input("Press Enter to continue...")
+
+def write_output(df: pl.DataFrame | bytes, output_format: str):
+    """
+    Stream df to stdout in a machine-readable format. Bytes, as answered by
+    the daemon, are already in that format.
+    """
+    from .output import write
+
+    sys.stdout.flush()
+    stream = sys.stdout.buffer
+    try:
+        if isinstance(df, bytes):
+            stream.write(df)
+            stream.flush()
         else:
-            typer.echo("Invalid choice. Please try again.")
-            input("Press Enter to continue...")
+            write(df, output_format, stream)
+    except BrokenPipeError:
+        # The reader (e.g. head) exited early; silence the flush at exit
+        try:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), stream.fileno())
+        except (AttributeError, OSError, ValueError):
+            pass
+
+def daemon_result(op: str, **params) -> pl.DataFrame | None:
+    """Return a query answered by a running daemon, or None if there is none"""
+    from . import daemon
+
+    payload = daemon.query(op, format="arrow", **params)
+    if payload is None:
+        return None
+    import io
+    import polars as pl
+    return pl.read_ipc_stream(io.BytesIO(payload))
 
 @app.command()
 def having(
-    filters: List[str] = typer.Argument(..., help="Filter arguments (e.g., 'binary', 'rows > 100')")
+    filters: List[str] = typer.Argument(..., help="Filter arguments (e.g., 'binary', 'rows > 100')"),
+    output_format: str = typer.Option("table", "--format", help="Output format: table, json, ndjson, csv or arrow"),
+    interactive: bool = typer.Option(True, "--interactive/--no-interactive", help="Page through the table; --no-interactive prints it all"),
+    sort: str = typer.Option(None, "--sort", help="Sort by rows, cols, package, item or a data type / n_* column"),
+    descending: bool = typer.Option(False, "--desc", help="Sort in descending order"),
+    limit: int = typer.Option(None, "--limit", "-n", help="Keep only the first LIMIT datasets"),
 ):
     """
     Filter R datasets based on data types and size criteria.
@@ -332,36 +372,193 @@ def having(
     r-data having binary "rows > 100" numeric
     
     r-data having "cols == 5" character
+    
+    r-data having "var: age" factor
+    
+    r-data having "binary OR (factor AND rows > 500)"
+    
+    r-data having factor --sort rows --desc --limit 20
+    
+    r-data having binary --format csv > binary.csv
     """
+    from . import daemon
+    from .output import FORMATS
+
+    if output_format != "table" and output_format not in FORMATS:
+        typer.echo(f"Error: Unknown format: {output_format}. Expected table, {', '.join(FORMATS)}", err=True)
+        raise typer.Exit(1)
+
     try:
-        # Call the data_having function with the provided filters
-        result = data_having(*filters)
+        if output_format != "table":
+            # Every column of every match, without summary or pagination;
+            # a running daemon answers in the format directly
+            ordering = dict(sort=sort, descending=descending, limit=limit)
+            result = daemon.query("having", filters=list(filters), format=output_format, **ordering)
+            if result is None:
+                from .search import data_having
+                result = data_having(*filters, **ordering)
+            write_output(result, output_format)
+            return
+        
+        import polars as pl
+        from .search import order_results
+        result = daemon_result("having", filters=list(filters))
+        if result is None:
+            from .search import data_having
+            result = data_having(*filters)
+        
+        # A sort without a limit stays lazy: pages are sorted as far as they are shown
+        ordered = order_results(result, sort, descending, limit, lazy=True)
+        shown = len(result) if limit is None else min(limit, len(result))
         
         if len(result) == 0:
             typer.echo("No datasets found matching the specified criteria.")
             return
         
-        # Hide CSV, Doc, and n_* columns from display
-        display_result = result.select([
-            "Package", "Item", "Title", "Rows", "Cols"
-        ])
-        
         # Display summary
         typer.echo(f"Found {len(result)} datasets matching the criteria:")
         
-        # Show some basic statistics
-        total_rows = result.select(pl.col("Rows").sum()).item()
-        avg_rows = result.select(pl.col("Rows").mean()).item()
-        total_cols = result.select(pl.col("Cols").sum()).item()
-        avg_cols = result.select(pl.col("Cols").mean()).item()
+        # Show some basic statistics, computed in one pass
+        totals = result.select(
+            pl.col("Rows").sum().alias("total_rows"),
+            pl.col("Rows").mean().alias("avg_rows"),
+            pl.col("Cols").sum().alias("total_cols"),
+            pl.col("Cols").mean().alias("avg_cols"),
+        ).row(0, named=True)
         
         typer.echo(f"Total datasets: {len(result)}")
-        typer.echo(f"Total rows across all datasets: {total_rows:,}")
-        typer.echo(f"Average rows per dataset: {avg_rows:.1f}")
-        typer.echo(f"Total columns across all datasets: {total_cols:,}")
-        typer.echo(f"Average columns per dataset: {avg_cols:.1f}")
+        typer.echo(f"Total rows across all datasets: {totals['total_rows']:,}")
+        typer.echo(f"Average rows per dataset: {totals['avg_rows']:.1f}")
+        typer.echo(f"Total columns across all datasets: {totals['total_cols']:,}")
+        typer.echo(f"Average columns per dataset: {totals['avg_cols']:.1f}")
+        typer.echo("For quantiles, packages and type mixes, run 'r-data stats' with the same filters")
+        if sort is not None or limit is not None:
+            order = f" by {sort.lower()}{' (descending)' if descending else ''}" if sort else ""
+            typer.echo(f"Showing {shown} of them{order}")
+        if shown == 0:
+            return
+        
+        if interactive:
+            # Use pagination to display results; CSV, Doc and n_* columns are not drawn
+            paginate_results(ordered, ordered, total_rows=shown)
+        else:
+            # Hide CSV, Doc, and n_* columns from display
+            display_result = ordered.select(["Package", "Item", "Title", "Rows", "Cols"])
+            if isinstance(display_result, pl.LazyFrame):
+                display_result = display_result.collect()
+            typer.echo(format_dataframe_output(display_result))
+        
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    except Exception as e:
+        typer.echo(f"Unexpected error: {e}", err=True)
+        raise typer.Exit(1)
+
+@app.command()
+def stats(
+    filters: List[str] = typer.Argument(None, help="Filter arguments, as for 'having' (default: the whole catalog)"),
+    output_format: str = typer.Option("table", "--format", help="Output format: table or json"),
+    top: int = typer.Option(10, "--top", "-n", help="Number of packages, type mixes and largest datasets to list"),
+):
+    """
+    Summarize the datasets matching the filters: sizes, quantiles, column
+    types, packages and the largest datasets.
+    
+    Examples:
+    
+    r-data stats
+    
+    r-data stats binary "rows > 1000"
+    
+    r-data stats factor --format json
+    """
+    import json
+    from .search import data_having
+    from .summary import summarize
+
+    if output_format not in ("table", "json"):
+        typer.echo(f"Error: Unknown format: {output_format}. Expected table or json", err=True)
+        raise typer.Exit(1)
+    if top < 0:
+        typer.echo(f"Error: Invalid --top: {top}. Expected a number of entries >= 0", err=True)
+        raise typer.Exit(1)
+
+    try:
+        result = data_having(*(filters or []))
+        summary = summarize(result, top=top)
+        if output_format == "json":
+            typer.echo(json.dumps(summary.to_dict(), indent=2))
+        else:
+            typer.echo(format_summary(summary, top))
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    except Exception as e:
+        typer.echo(f"Unexpected error: {e}", err=True)
+        raise typer.Exit(1)
+
+def format_summary(summary, top: int) -> str:
+    """Format a CatalogSummary as text tables"""
+    import polars as pl
+
+    overview = summary.overview
+    lines = [f"Datasets: {overview['datasets']:,} in {overview['packages']:,} packages"]
+    if overview["datasets"] == 0:
+        return lines[0]
+    
+    def number(value) -> str:
+        return f"{value:,.1f}" if isinstance(value, float) and not value.is_integer() else f"{value:,.0f}"
+
+    distribution = pl.DataFrame({
+        "": list(overview["rows"]),
+        "Rows": [number(value) for value in overview["rows"].values()],
+        "Cols": [number(value) for value in overview["cols"].values()],
+    })
+    sections = [
+        ("Size", distribution),
+        ("Column types", summary.types),
+        ("Type mixes", summary.mixes.head(top)),
+        (f"Top {top} packages by datasets", summary.packages),
+        (f"Top {top} largest datasets", summary.largest),
+    ]
+    for title, df in sections:
+        lines += ["", title, format_dataframe_output(df)]
+    return "\n".join(lines)
+
+@app.command("search")
+def search_command(
+    terms: List[str] = typer.Argument(..., help="Words to look for in package, item and title"),
+    filters: List[str] = typer.Option(None, "--filter", "-f", help="Filter results like 'having' (e.g., 'binary', 'rows > 100'); repeatable"),
+    limit: int | None = typer.Option(None, "--limit", "-n", help="Show at most this many results"),
+):
+    """
+    Search R datasets by words in their package, name and title, best match first.
+    
+    Examples:
+    
+    r-data search wage
+    
+    r-data search survival --filter "rows > 100"
+    
+    r-data search lung cancer -f binary -f numeric
+    """
+    try:
+        result = daemon_result("search", query=" ".join(terms), filters=list(filters or []), limit=limit)
+        if result is None:
+            from .search import data_search
+            result = data_search(" ".join(terms), *(filters or []), limit=limit)
         
-        # Use pagination to display results
+        if len(result) == 0:
+            typer.echo("No datasets found matching the search terms.")
+            return
+        
+        typer.echo(f"Found {len(result)} datasets matching '{' '.join(terms)}':")
+        
+        # Results are already ordered by relevance
+        display_result = result.select([
+            "Package", "Item", "Title", "Rows", "Cols"
+        ])
         paginate_results(display_result, result)
         
     except ValueError as e:
@@ -371,6 +568,314 @@ def having(
         typer.echo(f"Unexpected error: {e}", err=True)
         raise typer.Exit(1)
 
+@app.command()
+def show(
+    name: str = typer.Argument(..., help="Dataset name: PACKAGE/ITEM, or ITEM if only one package has it"),
+    output_format: str = typer.Option("text", "--format", help="Output format: text, json, ndjson, csv or arrow"),
+    doc: bool = typer.Option(True, "--doc/--no-doc", help="Print the documentation after the catalog entry"),
+):
+    """
+    Show a dataset by name: its catalog entry and documentation.
+    Unknown names are answered with the closest ones.
+
+    Examples:
+
+    r-data show MASS/Boston
+
+    r-data show mtcars --no-doc
+
+    r-data show AER/Affairs --format json
+    """
+    from . import daemon
+    from .output import FORMATS
+
+    if output_format != "text" and output_format not in FORMATS:
+        typer.echo(f"Error: Unknown format: {output_format}. Expected text, {', '.join(FORMATS)}", err=True)
+        raise typer.Exit(1)
+
+    def lookup_locally():
+        from .search import get_index
+        index = get_index()
+        return index.catalog.slice(index.lookup(name.strip()), 1)
+
+    try:
+        if output_format != "text":
+            result = daemon.query("show", name=name, format=output_format)
+            write_output(lookup_locally() if result is None else result, output_format)
+            return
+
+        result = daemon_result("show", name=name)
+        row = (lookup_locally() if result is None else result).row(0, named=True)
+
+        types = ", ".join(f"{col[2:]} {row[col]}" for col in row if col.startswith("n_") and row[col])
+        typer.echo(f"{row['Package']}/{row['Item']}: {row['Title']}")
+        typer.echo(f"Rows: {row['Rows']}, Cols: {row['Cols']}")
+        typer.echo(f"Column types: {types or 'none'}")
+        typer.echo(f"CSV: {row['CSV']}")
+        typer.echo(f"Doc: {row['Doc']}")
+        if doc:
+            typer.echo("=" * min(terminal_width(), 80))
+            typer.echo(fetch_documentation(row["Doc"]))
+
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    except Exception as e:
+        typer.echo(f"Unexpected error: {e}", err=True)
+        raise typer.Exit(1)
+
+@app.command()
+def fetch(
+    filters: List[str] = typer.Argument(..., help="Filter arguments, as for 'having' (e.g., 'binary', 'rows > 100')"),
+    dest: Path = typer.Option(Path("."), "--dest", "-d", help="Directory to download the CSV files into"),
+    jobs: int = typer.Option(4, "--jobs", "-j", help="Number of parallel downloads"),
+    retries: int = typer.Option(3, "--retries", help="Retries per file for transient network errors"),
+    store: bool = typer.Option(False, "--store", help="Add the datasets to the local Parquet store instead of DEST"),
+):
+    """
+    Download the CSV of every dataset matching the filters, without prompting.
+    
+    Files already present in DEST and unchanged on the server are skipped.
+    With --store, datasets are converted to Parquet in the local store
+    (see rdatasets_search.store.load) and datasets already stored are skipped.
+    
+    Examples:
+    
+    r-data fetch binary "rows > 1000" --dest data/
+    
+    r-data fetch factor --dest data/ --jobs 8
+    
+    r-data fetch "rows > 10000" --store
+    """
+    from .download import fetch_many
+    from .search import data_having
+
+    try:
+        result = data_having(*filters)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    
+    if len(result) == 0:
+        typer.echo("No datasets found matching the specified criteria.")
+        return
+    
+    def report(filename, status, error):
+        if error is not None:
+            typer.echo(f"  failed      {filename}: {error}", err=True)
+        else:
+            typer.echo(f"  {status:<11} {filename}")
+    
+    if store:
+        from .store import add_many, store_dir
+        datasets = result.select(["Package", "Item", "CSV"]).rows()
+        typer.echo(f"Fetching {len(datasets)} datasets into the store at {store_dir()} ({jobs} at a time)...")
+        results = add_many(datasets, jobs=jobs, retries=retries, on_result=report)
+    else:
+        files = [
+            (row["CSV"], f"{row['Package']}_{row['Item']}.csv")
+            for row in result.select(["CSV", "Package", "Item"]).iter_rows(named=True)
+        ]
+        typer.echo(f"Fetching {len(files)} datasets into {dest} ({jobs} at a time)...")
+        try:
+            results = fetch_many(files, dest, jobs=jobs, retries=retries, on_result=report)
+        except OSError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(1)
+    
+    counts = {status: list(results.values()).count(status) for status in ("downloaded", "skipped", "failed")}
+    typer.echo(f"Done: {counts['downloaded']} downloaded, {counts['skipped']} unchanged, {counts['failed']} failed")
+    if counts["failed"]:
+        raise typer.Exit(1)
+
+@app.command("index-variables")
+def index_variables(
+    jobs: int = typer.Option(8, "--jobs", "-j", help="Number of documentation pages fetched in parallel"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Fetch every page again instead of only new datasets"),
+):
+    """
+    Build the offline index of documented variables used by "var: ..." filters.
+    
+    Every dataset's documentation page is fetched and its variable names and
+    descriptions are indexed. Re-runs only fetch datasets not indexed yet.
+    
+    Examples:
+    
+    r-data index-variables --jobs 16
+    
+    r-data having "var: income"
+    """
+    from .search import get_catalog, set_variable_index
+    from .variables import build
+
+    catalog = get_catalog()
+    done = 0
+    
+    def report(key, error):
+        nonlocal done
+        done += 1
+        if error is not None:
+            typer.echo(f"\n  failed {key}: {error}", err=True)
+        typer.echo(f"\r  {done} pages indexed", nl=False)
+    
+    typer.echo(f"Indexing the documented variables of {len(catalog)} datasets ({jobs} at a time)...")
+    try:
+        index, failed = build(catalog, jobs=jobs, rebuild=rebuild, on_result=report)
+    except OSError as e:
+        typer.echo(f"\nError: {e}", err=True)
+        raise typer.Exit(1)
+    if done:
+        typer.echo()
+    set_variable_index(index)
+    
+    typer.echo(f"Done: {len(index)} datasets indexed, {len(index.postings)} terms, {len(failed)} failed")
+    if failed:
+        typer.echo("Run the command again to retry the failed pages.")
+
+@app.command()
+def profile(
+    sources: List[Path] = typer.Option([], "--from", help="Directory of mirrored or downloaded CSVs (repeatable)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Number of worker processes (default: one per CPU)"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Profile every dataset again, even if unchanged"),
+):
+    """
+    Profile the locally available datasets into the statistics catalog.
+    
+    Datasets are read from the Parquet store, the --from directories and
+    the mirror (RDATASETS_MIRROR). Their column statistics enable filters
+    such as "missing > 20" and "numeric distinct > 1000".
+    
+    Examples:
+    
+    r-data profile --from data/
+    
+    r-data having "numeric distinct > 1000" "missing > 20"
+    """
+    from .profiling import StatsIndex, build
+    from .search import get_catalog, set_stats_index
+
+    catalog = get_catalog()
+    counts = {"profiled": 0, "unchanged": 0, "missing": 0, "failed": 0}
+    
+    def report(name, status, error):
+        counts[status] += 1
+        if error is not None:
+            typer.echo(f"\n  failed {name}: {error}", err=True)
+        typer.echo(f"\r  {counts['profiled']} profiled, {counts['unchanged']} unchanged", nl=False)
+    
+    typer.echo(f"Profiling the local copies of {len(catalog)} datasets...")
+    try:
+        stats, _ = build(catalog, sources=sources, jobs=jobs, rebuild=rebuild, on_result=report)
+    except OSError as e:
+        typer.echo(f"\nError: {e}", err=True)
+        raise typer.Exit(1)
+    typer.echo()
+    set_stats_index(StatsIndex(stats))
+    
+    typer.echo(
+        f"Done: {counts['profiled']} profiled, {counts['unchanged']} unchanged, "
+        f"{counts['failed']} failed, {counts['missing']} not available locally"
+    )
+    if counts["missing"]:
+        typer.echo("Download datasets with 'r-data fetch --store' or 'r-data mirror --csv' to profile them.")
+
+@app.command()
+def mirror(
+    directory: Path = typer.Argument(..., help="Directory to mirror into"),
+    csv: bool = typer.Option(False, "--csv", help="Also mirror every dataset's CSV file"),
+    jobs: int = typer.Option(8, "--jobs", "-j", help="Number of parallel downloads"),
+    retries: int = typer.Option(3, "--retries", help="Retries per file for transient network errors"),
+):
+    """
+    Mirror the index and all documentation pages (and CSVs) into a directory.
+    
+    Re-runs only download files that changed on the server. Set
+    RDATASETS_MIRROR to the directory to use the mirror without network.
+    
+    Examples:
+    
+    r-data mirror ~/rdatasets
+    
+    r-data mirror ~/rdatasets --csv --jobs 16
+    
+    RDATASETS_MIRROR=~/rdatasets r-data having binary
+    """
+    from .mirror import mirror_dir, sync
+    from .search import csv_index
+
+    if mirror_dir() is not None:
+        typer.echo("Error: RDATASETS_MIRROR is set, so network access is disabled. Unset it to sync the mirror.", err=True)
+        raise typer.Exit(1)
+    
+    counts = {"downloaded": 0, "skipped": 0, "failed": 0}
+    
+    def report(filename, status, error):
+        counts[status] += 1
+        if error is not None:
+            typer.echo(f"\n  failed {filename}: {error}", err=True)
+        typer.echo(
+            f"\r  {counts['downloaded']} downloaded, {counts['skipped']} unchanged, {counts['failed']} failed",
+            nl=False,
+        )
+    
+    what = "index, documentation and CSV files" if csv else "index and documentation pages"
+    typer.echo(f"Mirroring the {what} into {directory} ({jobs} at a time)...")
+    try:
+        sync(directory, csv_index, csv=csv, jobs=jobs, retries=retries, on_result=report)
+    except (OSError, ValueError) as e:
+        typer.echo(f"\nError: {e}", err=True)
+        raise typer.Exit(1)
+    typer.echo()
+    
+    typer.echo(f"Done: {counts['downloaded']} downloaded, {counts['skipped']} unchanged, {counts['failed']} failed")
+    if counts["failed"]:
+        raise typer.Exit(1)
+    typer.echo(f"Use it offline with: RDATASETS_MIRROR={directory} r-data ...")
+
+@app.command()
+def serve(
+    socket: Path | None = typer.Option(None, "--socket", help="Socket path (default: RDATASETS_SOCKET or daemon.sock in the cache directory)"),
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon"),
+    status: bool = typer.Option(False, "--status", help="Report whether a daemon is running"),
+):
+    """
+    Keep the catalog and its indexes loaded, answering queries over a Unix
+    socket. While it runs, having and search use it automatically.
+    
+    Examples:
+    
+    r-data serve &
+    
+    r-data serve --status
+    
+    r-data serve --stop
+    """
+    from . import daemon
+
+    path = socket or daemon.socket_path()
+    if stop or status:
+        try:
+            answer = daemon.request("shutdown" if stop else "ping", path)
+        except (daemon.DaemonError, ValueError) as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(1)
+        if answer is None:
+            typer.echo(f"No daemon is running on {path}")
+            raise typer.Exit(1)
+        typer.echo("Daemon stopped." if stop else f"Daemon running on {path} (pid {answer[0]['pid']})")
+        return
+
+    def ready(server):
+        typer.echo(f"Serving queries on {path} (stop with Ctrl+C or 'r-data serve --stop')")
+
+    try:
+        daemon.serve(path, on_ready=ready)
+    except KeyboardInterrupt:
+        typer.echo("\nStopped.")
+    except (RuntimeError, ValueError, OSError) as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+
 @app.command()
 def info():
     """
@@ -400,6 +905,48 @@ def info():
     typer.echo("  cols == N  - Datasets with exactly N columns")
     typer.echo("  cols != N  - Datasets with not exactly N columns")
     
+    typer.echo("\n🏷️  Variable Filters (after 'r-data index-variables'):")
+    typer.echo("  var: WORDS - Datasets with a documented variable named or described by WORDS")
+    
+    typer.echo("\n🧮 Column Statistics (after 'r-data profile'):")
+    typer.echo("  missing > P            - Datasets with a column more than P% missing")
+    typer.echo("  distinct > N           - Datasets with a column of more than N distinct values")
+    typer.echo("  min < X, max > X       - Datasets with a numeric column below/above X")
+    typer.echo("  numeric|character|logical MEASURE OP VALUE - Only consider columns of that type")
+    
+    typer.echo("\n🔀 Boolean Queries:")
+    typer.echo("  A OR B, A AND B, NOT A, ( ... ) - Combine filters in one argument (AND binds tighter)")
+    typer.echo("  100 <= rows <= 1000            - Ranges")
+    typer.echo("  numeric >= 3                   - Compare the number of columns of a type")
+    typer.echo("  var:\"WORDS\"                    - Variable filters inside a boolean query")
+    
+    typer.echo("\n🔎 Text Search:")
+    typer.echo("  r-data search WORDS           - Rank datasets by words in package, item and title")
+    typer.echo("  r-data search WORDS -f FILTER - Restrict matches with any of the filters above")
+    typer.echo("  r-data show PACKAGE/ITEM      - One dataset's entry and documentation (suggests close names)")
+    
+    typer.echo("\n🧾 Scripting:")
+    typer.echo("  r-data having FILTERS --format json|ndjson|csv|arrow - Stream all matches to stdout")
+    typer.echo("  r-data having FILTERS --no-interactive            - Print the table without paging")
+    typer.echo("  r-data having FILTERS --sort rows --desc --limit K - The K largest matches (also cols, package, ...)")
+    
+    typer.echo("\n⚡ Daemon:")
+    typer.echo("  r-data serve          - Keep the catalog loaded; having and search use it automatically")
+    typer.echo("  r-data serve --stop   - Stop the daemon (RDATASETS_DAEMON=off ignores it)")
+    
+    typer.echo("\n📈 Summary Statistics:")
+    typer.echo("  r-data stats FILTERS [--format json] - Quantiles, column types, packages, largest datasets")
+    
+    typer.echo("\n💾 Bulk Download:")
+    typer.echo("  r-data fetch FILTERS --dest DIR --jobs N - Download every matching CSV")
+    
+    typer.echo("\n🗄️  Offline Mirror:")
+    typer.echo("  r-data mirror DIR [--csv]       - Sync the index, docs (and CSVs) into DIR")
+    typer.echo("  RDATASETS_MIRROR=DIR r-data ... - Serve everything from DIR, without network")
+    
+    typer.echo("\n🗃️  SQLite Backend:")
+    typer.echo("  RDATASETS_BACKEND=sqlite r-data ... - Query an indexed on-disk catalog instead of memory")
+    
     typer.echo("\n💡 Notes:")
     typer.echo("  - All arguments are case-insensitive")
     typer.echo("  - Whitespace around operators is flexible")
@@ -411,6 +958,10 @@ def info():
     typer.echo("  r-data having \"rows > 100\"")
     typer.echo("  r-data having binary \"rows > 100\" numeric")
     typer.echo("  r-data having \"cols == 5\" character")
+    typer.echo("  r-data search survival -f \"rows > 100\"")
+    typer.echo("  r-data having \"var: income\" \"rows > 500\"")
+    typer.echo("  r-data having \"numeric distinct > 1000\" \"missing > 20\"")
+    typer.echo("  r-data having \"binary OR (factor AND rows > 500)\"")
 
 if __name__ == "__main__":
     app()
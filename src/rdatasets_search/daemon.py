@@ -0,0 +1,284 @@
+"""
+Resident query daemon.
+
+`r-data serve` loads the catalog and its derived indexes once and answers
+queries over a Unix socket, so a query costs only the filter itself: no
+interpreter start-up, no polars import, no index load. CLI commands use a
+running daemon automatically and fall back to answering locally when
+there is none.
+
+Protocol: each request is one line of JSON; each response is one line of
+JSON followed by `length` bytes of payload. A connection may carry any
+number of requests.
+
+    {"op": "ping"}
+        -> {"ok": true, "pid": 123, "protocol": 3, "length": 0}
+    {"op": "having", "filters": ["binary", "rows > 100"], "format": "ndjson"}
+        -> {"ok": true, "rows": 42, "protocol": 3, "length": 1234} + the rows in that format
+    {"op": "having", "filters": ["factor"], "sort": "rows", "descending": true, "limit": 20}
+        -> as above, the first 20 rows in that order
+    {"op": "search", "query": "wage", "filters": [], "limit": 10, "format": "arrow"}
+        -> as for having, ranked, with a Score column
+    {"op": "show", "name": "MASS/Boston", "format": "json"}
+        -> as for having, the one catalog row of the dataset
+    {"op": "shutdown"}
+        -> {"ok": true, "length": 0}, then the daemon exits
+
+Formats are those of output.FORMATS (default: arrow). Errors are reported
+as {"ok": false, "error": "...", "kind": "ValueError", "length": 0}.
+Answers from a daemon speaking another protocol version are not used.
+
+The daemon reloads the catalog once per RDATASETS_CACHE_TTL, revalidating
+the cached index as the CLI would.
+
+Environment variables:
+  - RDATASETS_SOCKET: socket path (default: <cache directory>/daemon.sock)
+  - RDATASETS_DAEMON: set to "off" to never use a running daemon
+"""
+
+import io
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+PROTOCOL = 3
+
+SOCKET_NAME = "daemon.sock"
+
+# Seconds to wait for a daemon to accept a connection
+CONNECT_TIMEOUT = 0.5
+
+# Seconds to wait for an answer
+REQUEST_TIMEOUT = 60
+
+
+def socket_path() -> Path:
+    """Return the daemon socket path, honouring RDATASETS_SOCKET"""
+    override = os.environ.get("RDATASETS_SOCKET")
+    if override:
+        return Path(override).expanduser()
+    from .cache import cache_dir
+    return cache_dir() / SOCKET_NAME
+
+
+def enabled() -> bool:
+    """Whether CLI commands may use a running daemon"""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    return os.environ.get("RDATASETS_DAEMON", "").lower() not in ("off", "0", "no", "false")
+
+
+class DaemonError(Exception):
+    """The daemon could not answer a request"""
+
+
+def _connect(path: Path) -> socket.socket | None:
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        # A stale socket file left by a daemon that died
+        sock.close()
+        return None
+    return sock
+
+
+def _exchange(sock: socket.socket, request: dict) -> tuple[dict, bytes]:
+    sock.settimeout(REQUEST_TIMEOUT)
+    sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    with sock.makefile("rb") as stream:
+        header = json.loads(stream.readline())
+        payload = stream.read(header.get("length", 0))
+    return header, payload
+
+
+def request(op: str, path: Path | None = None, **params) -> tuple[dict, bytes] | None:
+    """
+    Send one request to the daemon and return its (header, payload), or
+    None if no daemon is running.
+    Raises ValueError for invalid queries and DaemonError for other failures.
+    """
+    if path is None:
+        path = socket_path()
+    sock = _connect(path)
+    if sock is None:
+        return None
+    with sock:
+        try:
+            header, payload = _exchange(sock, {"op": op, **params})
+        except (OSError, ValueError) as e:
+            raise DaemonError(f"No answer from the daemon at {path}: {e}")
+    if not header.get("ok"):
+        if header.get("kind") == "ValueError":
+            raise ValueError(header.get("error"))
+        raise DaemonError(header.get("error"))
+    return header, payload
+
+
+def query(op: str, **params) -> bytes | None:
+    """
+    Return the payload of a query answered by a running daemon, or None if
+    there is none (or daemons are disabled), so that the caller answers it
+    locally.
+    """
+    if not enabled():
+        return None
+    try:
+        answer = request(op, **params)
+    except DaemonError:
+        return None
+    if answer is None or answer[0].get("protocol") != PROTOCOL:
+        # e.g. a daemon started before an upgrade, unaware of newer parameters
+        return None
+    return answer[1]
+
+
+def is_running(path: Path | None = None) -> bool:
+    """Return whether a daemon answers on path"""
+    try:
+        return request("ping", path) is not None
+    except (DaemonError, ValueError):
+        return False
+
+
+def _limit(message: dict) -> int | None:
+    """Return the request's limit, rejecting anything but a count of datasets"""
+    limit = message.get("limit")
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 0):
+        raise ValueError(f"Invalid limit: {limit!r}. Expected a number of datasets >= 0")
+    return limit
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """Answer the requests of one connection, in order"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            op = None
+            try:
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    raise ValueError("A request must be a JSON object")
+                op = message.get("op")
+                header, payload = self.server.answer(message)
+                header["ok"] = True
+            except Exception as e:
+                # Subclasses such as lookup.UnknownDataset are raised as ValueError
+                kind = "ValueError" if isinstance(e, ValueError) else type(e).__name__
+                header = {"ok": False, "error": str(e), "kind": kind}
+                payload = b""
+            header["protocol"] = PROTOCOL
+            header["length"] = len(payload)
+            try:
+                self.wfile.write(json.dumps(header).encode("utf-8") + b"\n" + payload)
+                self.wfile.flush()
+            except OSError:
+                return
+            if op == "shutdown":
+                # shutdown() waits for serve_forever, so call it from another thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class QueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server holding the warm catalog"""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # Queries share the module-level catalog and query cache
+        self.lock = threading.Lock()
+        self.loaded = 0.0
+        self.warm()
+        super().__init__(str(self.path), QueryHandler)
+        os.chmod(self.path, 0o600)
+
+    def warm(self) -> None:
+        """Load the catalog and build its indexes"""
+        from . import search
+
+        if search.use_database():
+            search.get_database()
+        else:
+            search.get_index()
+            search.get_fulltext_index()
+        self.loaded = time.time()
+
+    def refresh(self) -> None:
+        """Reload the catalog when the cache TTL has passed"""
+        from . import search
+        from .cache import cache_ttl
+
+        if time.time() - self.loaded >= cache_ttl():
+            search.set_catalog(None)
+            self.warm()
+
+    def answer(self, message: dict) -> tuple[dict, bytes]:
+        """Return the header and payload answering one request"""
+        from . import output, search
+
+        op = message.get("op")
+        if op == "ping":
+            return {"pid": os.getpid()}, b""
+        if op == "shutdown":
+            return {}, b""
+
+        output_format = message.get("format", "arrow")
+        if output_format not in output.FORMATS:
+            raise ValueError(f"Unknown format: {output_format}. Expected one of: {', '.join(output.FORMATS)}")
+        filters = message.get("filters") or []
+        if not isinstance(filters, list) or not all(isinstance(f, str) for f in filters):
+            raise ValueError("filters must be a list of strings")
+
+        with self.lock:
+            self.refresh()
+            if op == "having":
+                result = search.data_having(
+                    *filters, sort=message.get("sort"), descending=bool(message.get("descending")),
+                    limit=_limit(message),
+                )
+            elif op == "search":
+                result = search.data_search(str(message.get("query", "")), *filters, limit=_limit(message))
+            elif op == "show":
+                index = search.get_index()
+                result = index.catalog.slice(index.lookup(str(message.get("name", "")).strip()), 1)
+            else:
+                raise ValueError(f"Unknown op: {op}")
+
+        buffer = io.BytesIO()
+        output.write(result, output_format, buffer)
+        return {"rows": len(result)}, buffer.getvalue()
+
+
+def serve(path: Path | None = None, on_ready=None) -> None:
+    """
+    Serve queries on path until a shutdown request or KeyboardInterrupt.
+    Raises RuntimeError if a daemon already answers there.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("The daemon needs Unix domain sockets, which this platform does not support")
+    if path is None:
+        path = socket_path()
+    if is_running(path):
+        raise RuntimeError(f"A daemon is already running on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+
+    server = QueryServer(path)
+    try:
+        if on_ready:
+            on_ready(server)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
@@ -0,0 +1,274 @@
+"""
+Optional SQLite backend for the dataset catalog.
+
+With RDATASETS_BACKEND=sqlite the catalog is kept in a SQLite database in
+the cache directory instead of being loaded into a polars DataFrame on
+every start. The database holds
+  - the table `datasets`: the catalog, in catalog order (rowid)
+  - B-tree indexes on Rows, Cols and every n_* column
+  - the FTS5 table `titles` over Package, Item and Title, for data_search
+
+data_having compiles all its predicates into one SQL query, so a command
+opens the file and reads only the matching rows. Memory use does not grow
+with the catalog, and several processes can read the same database.
+
+The database is checked against the index cache (or mirror) once per
+RDATASETS_CACHE_TTL, and rebuilt when the catalog changed. Rebuilds write a
+new file and rename it over the old one, so readers are never blocked.
+
+Environment variables:
+  - RDATASETS_BACKEND: "polars" (default) or "sqlite"
+"""
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+from .cache import catalog_fingerprint, temp_path
+from .index import Predicate
+
+BACKENDS = ("polars", "sqlite")
+
+DATABASE_NAME = "catalog.sqlite"
+
+# Bump when the database layout changes
+FORMAT_VERSION = 1
+
+SQL_TYPES = {"Int64": "INTEGER", "Float64": "REAL", "String": "TEXT"}
+
+SQL_OPERATORS = {'>': '>', '<': '<', '>=': '>=', '<=': '<=', '==': '=', '!=': '!='}
+
+SEARCH_FIELDS = ("Package", "Item", "Title")
+
+
+def backend() -> str:
+    """Return the catalog backend chosen with RDATASETS_BACKEND"""
+    value = os.environ.get("RDATASETS_BACKEND") or "polars"
+    if value.lower() not in BACKENDS:
+        raise ValueError(f"Invalid RDATASETS_BACKEND: {value!r}. Expected one of: {', '.join(BACKENDS)}")
+    return value.lower()
+
+
+def database_path(directory: Path | None = None) -> Path:
+    if directory is None:
+        from .cache import cache_dir
+        directory = cache_dir()
+    return directory / DATABASE_NAME
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def build(catalog: pl.DataFrame, path: Path) -> None:
+    """Write catalog to a new SQLite database at path, replacing any old one"""
+    columns = [(name, str(dtype)) for name, dtype in catalog.schema.items()]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_path(path)
+    try:
+        _write(catalog, columns, tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _write(catalog: pl.DataFrame, columns: list[tuple[str, str]], tmp: Path) -> None:
+    connection = sqlite3.connect(tmp)
+    try:
+        definitions = ", ".join(f"{_quote(name)} {SQL_TYPES.get(dtype, 'TEXT')}" for name, dtype in columns)
+        connection.execute(f"CREATE TABLE datasets ({definitions})")
+        placeholders = ", ".join("?" for _ in columns)
+        connection.executemany(
+            f"INSERT INTO datasets (rowid, {', '.join(_quote(name) for name, _ in columns)}) VALUES (?, {placeholders})",
+            ((row, *values) for row, values in enumerate(catalog.iter_rows(), 1)),
+        )
+
+        for name, _ in columns:
+            if name in ("Rows", "Cols") or name.startswith("n_"):
+                connection.execute(f"CREATE INDEX {_quote('idx_' + name)} ON datasets ({_quote(name)})")
+
+        fields = [name for name in SEARCH_FIELDS if name in catalog.columns]
+        if fields:
+            connection.execute(
+                f"CREATE VIRTUAL TABLE titles USING fts5({', '.join(fields)},"
+                " content='datasets', content_rowid='rowid')"
+            )
+            connection.execute("INSERT INTO titles (titles) VALUES ('rebuild')")
+
+        connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("version", str(FORMAT_VERSION)),
+            ("fingerprint", catalog_fingerprint(catalog)),
+            ("checked", str(time.time())),
+            ("columns", json.dumps(columns)),
+        ])
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def matching_keys(predicate: Predicate) -> list[str]:
+    """Return the "Package/Item" keys matching a var: or column statistics predicate"""
+    from .search import get_stats_index, get_variable_index
+
+    col_name, operator, value = predicate
+    if col_name == 'var':
+        return sorted(get_variable_index().datasets_matching(value))
+    *kind, measure = col_name.split(':')[1:]
+    return sorted(get_stats_index().datasets_matching(kind[0] if kind else None, measure, operator, value))
+
+
+class CatalogDatabase:
+    """A read-only connection to the SQLite catalog"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # Read-only, so that many processes can share the file
+        self.connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+        self.version = int(meta["version"])
+        self.fingerprint = meta["fingerprint"]
+        self.checked = float(meta["checked"])
+        self.schema = {name: getattr(pl, dtype, pl.String) for name, dtype in json.loads(meta["columns"])}
+        self.has_titles = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'titles'"
+        ).fetchone() is not None
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _frame(self, sql: str, params=(), extra: dict | None = None) -> pl.DataFrame:
+        schema = {**self.schema, **(extra or {})}
+        rows = self.connection.execute(sql, params).fetchall()
+        # Building columns is much faster than letting polars read rows
+        columns = zip(*rows) if rows else [[] for _ in schema]
+        return pl.DataFrame(
+            [pl.Series(name, values, dtype=dtype) for (name, dtype), values in zip(schema.items(), columns)]
+        )
+
+    def _where(self, predicates) -> tuple[str, list]:
+        clauses, params = [], []
+        for predicate in predicates:
+            clause, values = self.compile(predicate)
+            clauses.append(clause)
+            params.extend(values)
+        return " AND ".join(clauses) or "1", params
+
+    def compile(self, predicate: Predicate) -> tuple[str, list]:
+        """Translate a parsed predicate into a SQL condition and its parameters"""
+        col_name, operator, value = predicate
+        if col_name in ('and', 'or', 'not'):
+            # A boolean query tree becomes one nested condition
+            compiled = [self.compile(child) for child in value]
+            params = [param for _, child_params in compiled for param in child_params]
+            if col_name == 'not':
+                return f"NOT ({compiled[0][0]})", params
+            joiner = f" {col_name.upper()} "
+            return "(" + joiner.join(f"({sql})" for sql, _ in compiled) + ")", params
+        if col_name == 'var' or col_name.startswith('stats:'):
+            # Answered from the variable index or the statistics catalog
+            keys = matching_keys(predicate)
+            return "(Package || '/' || Item) IN (SELECT value FROM json_each(?))", [json.dumps(keys)]
+        if col_name not in self.schema:
+            raise ValueError(f"Unknown column name: {col_name}")
+        if operator not in SQL_OPERATORS:
+            raise ValueError(f"Unknown operator: {operator}")
+        return f"{_quote(col_name)} {SQL_OPERATORS[operator]} ?", [value]
+
+    def catalog(self) -> pl.DataFrame:
+        """Return the whole catalog as a DataFrame"""
+        return self._frame("SELECT * FROM datasets ORDER BY rowid")
+
+    def filter(self, predicates) -> pl.DataFrame:
+        """Return the rows matching every predicate, in catalog order, with one query"""
+        where, params = self._where(predicates)
+        return self._frame(f"SELECT * FROM datasets WHERE {where} ORDER BY rowid", params)
+
+    def search(self, query: str, predicates=(), limit: int | None = None) -> pl.DataFrame:
+        """
+        Return the rows matching any word of query, best match first (FTS5
+        BM25), with a Score column. The last word also matches as a prefix.
+        """
+        from .fulltext import tokenize
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        extra = {"Score": pl.Float64}
+        if not terms or not self.has_titles:
+            return pl.DataFrame(schema={**self.schema, **extra})
+        last = tokenize(query)[-1]
+        match = " OR ".join([f'"{term}"' for term in terms if term != last] + [f'"{last}"*'])
+
+        where, params = self._where(predicates)
+        columns = ", ".join(f"datasets.{_quote(name)}" for name in self.schema)
+        sql = (
+            f"SELECT {columns}, -bm25(titles) AS Score FROM titles"
+            " JOIN datasets ON datasets.rowid = titles.rowid"
+            f" WHERE titles MATCH ? AND {where}"
+            " ORDER BY bm25(titles), datasets.rowid"
+        )
+        params = [match, *params]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._frame(sql, params, extra)
+
+
+def _touch(path: Path) -> None:
+    """Record that the database was checked against the catalog just now"""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("UPDATE meta SET value = ? WHERE key = 'checked'", (str(time.time()),))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def _open(path: Path) -> CatalogDatabase | None:
+    if not path.exists():
+        return None
+    try:
+        database = CatalogDatabase(path)
+    except (sqlite3.Error, KeyError, ValueError):
+        return None
+    if database.version != FORMAT_VERSION:
+        database.close()
+        return None
+    return database
+
+
+def open_database(
+    load_catalog: Callable[[], pl.DataFrame],
+    directory: Path | None = None,
+    ttl: float | None = None,
+) -> CatalogDatabase:
+    """
+    Open the SQLite catalog. When it is missing, outdated or older than ttl
+    (default: RDATASETS_CACHE_TTL), load_catalog() is called and the
+    database is rebuilt if the catalog changed.
+    """
+    if ttl is None:
+        from .cache import cache_ttl
+        ttl = cache_ttl()
+    path = database_path(directory)
+
+    database = _open(path)
+    if database is not None and time.time() - database.checked < ttl:
+        return database
+
+    catalog = load_catalog()
+    if database is not None and database.fingerprint == catalog_fingerprint(catalog):
+        try:
+            _touch(path)
+        except sqlite3.Error:
+            pass
+        return database
+
+    if database is not None:
+        database.close()
+    build(catalog, path)
+    return CatalogDatabase(path)
@@ -0,0 +1,314 @@
+"""
+Fast extraction of the sections shown for a dataset's documentation.
+
+Rdatasets documentation pages are generated by R's Rd2HTML and share one
+layout: a <title>, then inside <body> an <h3>Description</h3> followed by
+paragraphs, and an <h3>Format</h3> (or Variables) followed by paragraphs and
+a <dl> of variable names and descriptions.
+
+extract_sections() reads that layout in a single forward pass over the
+stdlib HTML tokenizer, without building a tree, and stops as soon as the
+Description and Format sections are complete. It reproduces what the
+BeautifulSoup extraction in docs.py returns, including its handling of
+whitespace-only text, and raises UnsupportedLayout for pages it cannot
+read the same way, so that callers fall back to BeautifulSoup.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+
+class DocSections(NamedTuple):
+    """The parts of a documentation page that are displayed"""
+
+    # Text of the <title> element, or None if there is none
+    title: str | None
+    # Whether the page has a body to extract sections from
+    has_content: bool
+    # Paragraphs following the Description heading
+    description: list[str]
+    # Whether a Format (or Variables) heading was found
+    has_format: bool
+    # Paragraphs between the Format heading and its definition list
+    format_description: list[str]
+    # (name, description) pairs of the definition list
+    variables: list[tuple[str, str]]
+
+
+class UnsupportedLayout(Exception):
+    """The page does not follow the layout the fast parser understands"""
+
+
+# Elements BeautifulSoup treats as empty (never pushed on the stack)
+EMPTY_ELEMENTS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+])
+
+# Elements whose whitespace-only text is kept verbatim
+PRESERVE_WHITESPACE = frozenset(["pre", "textarea"])
+
+# Elements whose text BeautifulSoup leaves out of get_text()
+HIDDEN_TEXT = frozenset(["script", "style", "template", "rt", "rp"])
+
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+# BeautifulSoup would prefer such a container over <body>
+_main_container = re.compile(rb"<div\b[^>]*\bmain\b", re.IGNORECASE)
+
+_declared_charset = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?([^>\s\"';/]+)", re.IGNORECASE)
+
+
+class _Done(Exception):
+    """Raised inside the tokenizer once every needed section is collected"""
+
+
+class _Capture:
+    """Text of an element and its descendants, like Tag.get_text()"""
+
+    def __init__(self, depth: int):
+        self.depth = depth
+        self.parts: list[str] = []
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+class _Section:
+    """Siblings following a section heading, until the parent element closes"""
+
+    def __init__(self, depth: int):
+        # Stack depth of the heading's parent; siblings start at this depth
+        self.depth = depth
+        self.paragraphs: list[_Capture] = []
+        # Still collecting paragraphs (until an h3, or a dl for Format)
+        self.collecting = True
+        self.finished = False
+        # Format only: the definition list and its dt/dd captures
+        self.dl_depth: int | None = None
+        self.terms: list[_Capture] = []
+        self.definitions: list[_Capture] = []
+        self.dl_done = False
+
+
+class _SectionParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: list[str] = []
+        self.pending: list[str] = []
+        self.captures: list[_Capture] = []
+        self.skip_depth = 0  # open elements whose text is hidden
+
+        self.title: _Capture | None = None
+        self.title_done = False
+        self.seen_body = False
+        self.in_body = False
+
+        self.heading: _Capture | None = None
+
+        self.description: _Section | None = None
+        self.format: _Section | None = None
+        self.format_is_variables = False
+
+    # Text nodes -----------------------------------------------------------
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def _flush(self):
+        """End the current text node, as BeautifulSoup's endData() does"""
+        if not self.pending:
+            return
+        text = "".join(self.pending)
+        self.pending = []
+        if not text.strip(ASCII_SPACES) and not any(tag in PRESERVE_WHITESPACE for tag in self.stack):
+            text = "\n" if "\n" in text else " "
+        if self.skip_depth:
+            return
+        for capture in self.captures:
+            capture.parts.append(text)
+
+    def handle_comment(self, data):
+        self._flush()
+        self._check_heading()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        # CDATA sections become text in BeautifulSoup; not worth replicating
+        raise UnsupportedLayout("page has a CDATA section")
+
+    # Elements -------------------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        depth = len(self.stack)
+
+        self._check_heading()
+
+        if tag == "body" and not self.seen_body:
+            self.seen_body = True
+            self.in_body = True
+            self.body_depth = depth + 1
+        elif tag == "title" and self.title is None:
+            self.title = _Capture(depth + 1)
+            self.captures.append(self.title)
+
+        if tag in HIDDEN_TEXT:
+            self.skip_depth += 1
+
+        if self.in_body:
+            self._sibling(tag, depth)
+            if tag == "h3" and self.heading is None:
+                self.heading = _Capture(depth + 1)
+                self.captures.append(self.heading)
+            elif tag in ("dt", "dd"):
+                section = self.format
+                if section is not None and section.dl_depth is not None and not section.dl_done:
+                    capture = _Capture(depth + 1)
+                    (section.terms if tag == "dt" else section.definitions).append(capture)
+                    self.captures.append(capture)
+
+        if tag in EMPTY_ELEMENTS:
+            self._close(depth)
+        else:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <tag/> is closed immediately, whatever the tag
+        self.handle_starttag(tag, attrs)
+        if tag not in EMPTY_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i] == tag:
+                break
+        else:
+            return
+        closed = self.stack[i:]
+        del self.stack[i:]
+        self.skip_depth -= sum(1 for name in closed if name in HIDDEN_TEXT)
+        self._close(len(self.stack))
+
+    def _sibling(self, tag: str, depth: int):
+        """Feed a start tag at the given depth to the open sections"""
+        for section, is_format in ((self.description, False), (self.format, True)):
+            if section is None or section.finished or depth != section.depth:
+                continue
+            if section.collecting:
+                if tag == "h3" or (is_format and tag == "dl"):
+                    section.collecting = False
+                elif tag == "p":
+                    capture = _Capture(depth + 1)
+                    section.paragraphs.append(capture)
+                    self.captures.append(capture)
+            if is_format and tag == "dl" and section.dl_depth is None:
+                section.dl_depth = depth + 1
+            if not is_format and not section.collecting:
+                section.finished = True
+
+    def _close(self, depth: int):
+        """Finish everything nested deeper than depth"""
+        self.captures = [c for c in self.captures if c.depth <= depth]
+
+        if self.title is not None and not self.title_done and self.title.depth > depth:
+            self.title_done = True
+
+        if self.in_body and depth < self.body_depth:
+            self.in_body = False
+
+        if self.heading is not None and self.heading.depth > depth:
+            self._heading_closed(self.heading, self.heading.depth - 1)
+            self.heading = None
+
+        for section in (self.description, self.format):
+            if section is None or section.finished:
+                continue
+            if section.dl_depth is not None and section.dl_depth > depth:
+                section.dl_done = True
+            if depth < section.depth:
+                # The parent element closed: no more siblings
+                section.collecting = False
+                section.finished = True
+            elif section is self.format and section.dl_done:
+                section.finished = True
+
+        if (
+            self.title_done
+            and self.description is not None and self.description.finished
+            and self.format is not None and self.format.finished
+            and not self.format_is_variables
+        ):
+            raise _Done
+
+    def _check_heading(self):
+        if self.heading is not None:
+            # Matching h3 by its .string is only simple for a lone text node
+            raise UnsupportedLayout("section heading with nested markup")
+
+    def _heading_closed(self, heading: _Capture, depth: int):
+        text = heading.text()
+        if text == "Description" and self.description is None:
+            self.description = _Section(depth)
+        elif text == "Format" and (self.format is None or self.format_is_variables):
+            self.format = _Section(depth)
+            self.format_is_variables = False
+        elif text == "Variables" and self.format is None:
+            self.format = _Section(depth)
+            self.format_is_variables = True
+
+
+def extract_sections(content: bytes) -> DocSections:
+    """
+    Extract the displayed sections of an Rd HTML page in one pass.
+
+    Raises UnsupportedLayout if the page needs the BeautifulSoup path.
+    """
+    if _main_container.search(content):
+        raise UnsupportedLayout("page has a main content container")
+    declared = _declared_charset.search(content)
+    if declared and declared.group(1).lower() not in (b"utf-8", b"utf8"):
+        raise UnsupportedLayout("page declares a non-UTF-8 charset")
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise UnsupportedLayout("page is not UTF-8")
+
+    parser = _SectionParser()
+    try:
+        parser.feed(text)
+        parser.close()
+        parser._flush()
+        # Elements left open at the end of the page are closed there
+        parser._close(0)
+    except _Done:
+        pass
+
+    if not parser.seen_body:
+        raise UnsupportedLayout("page has no body")
+
+    title = parser.title.text().strip() if parser.title else None
+    description = [c.text().strip() for c in parser.description.paragraphs] if parser.description else []
+    section = parser.format
+    if section is None:
+        return DocSections(title, True, description, False, [], [])
+    return DocSections(
+        title=title,
+        has_content=True,
+        description=description,
+        has_format=True,
+        format_description=[c.text().strip() for c in section.paragraphs],
+        variables=[
+            (dt.text().strip(), dd.text().strip())
+            for dt, dd in zip(section.terms, section.definitions)
+        ],
+    )
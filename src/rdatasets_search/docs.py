@@ -0,0 +1,479 @@
+"""
+Fetching, parsing and caching of dataset documentation pages.
+
+Documentation is cached at two levels, keyed by the Doc URL:
+  - in process: the formatted text of recently viewed pages
+  - on disk: the raw HTML, the formatted text and the HTTP validators,
+    under the user cache directory, bounded in size with LRU eviction
+
+Environment variables:
+  - RDATASETS_DOC_CACHE_BYTES: size cap of the on-disk store (default: 64 MiB)
+  - RDATASETS_DOC_CACHE_TTL: seconds before a stored page is revalidated
+    with the server (default: never)
+
+Pages are read with the single-pass parser in docparse, falling back to
+BeautifulSoup for layouts it does not handle. When a mirror is configured
+(RDATASETS_MIRROR), pages are read from it and never downloaded.
+
+requests and bs4 are imported inside the functions that use them, so that
+importing this module stays cheap.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .cache import write_atomic
+
+if TYPE_CHECKING:
+    from .docparse import DocSections
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Number of formatted pages kept in process
+MEMORY_ENTRIES = 256
+
+# Eviction frees space down to this share of the size cap, so that it runs
+# once per that much new data instead of on every put
+EVICT_TO = 0.9
+
+
+def _env_number(name: str, default: float | None) -> float | None:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value!r}. Expected a number")
+
+
+class DocumentationCache:
+    """
+    Two-level cache of documentation pages.
+
+    Each page is stored on disk as <key>.html (raw), <key>.txt (formatted)
+    and <key>.json (URL, validators, fetch time). The .json file's
+    modification time records the last access and drives LRU eviction.
+    The bytes used on disk are counted by one directory scan, when the first
+    page is stored, and kept up to date by put(); the directory is scanned
+    again only to evict. Pages in memory keep their fetch time, so that
+    they are served from there while fresh.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float | None = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # url -> (formatted text, fetch time)
+        self.memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        # Pages may be fetched from prefetch threads
+        self.lock = threading.Lock()
+        # Guards the files on disk and total
+        self.disk_lock = threading.Lock()
+        self.total: int | None = None
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, url: str) -> tuple[Path, Path, Path]:
+        key = self._key(url)
+        return (
+            self.directory / f"{key}.html",
+            self.directory / f"{key}.txt",
+            self.directory / f"{key}.json",
+        )
+
+    def _remember(self, url: str, text: str, fetched: float) -> None:
+        with self.lock:
+            self.memory[url] = (text, fetched)
+            self.memory.move_to_end(url)
+            while len(self.memory) > MEMORY_ENTRIES:
+                self.memory.popitem(last=False)
+
+    def meta(self, url: str) -> dict | None:
+        """Return the stored metadata for url, or None if it is not on disk"""
+        _, _, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, meta: dict) -> bool:
+        """Return whether a stored page can be served without revalidation"""
+        return self._is_fresh(meta.get("fetched", 0))
+
+    def _is_fresh(self, fetched: float) -> bool:
+        return self.ttl is None or time.time() - fetched < self.ttl
+
+    def get_text(self, url: str, allow_stale: bool = False) -> str | None:
+        """
+        Return the formatted documentation for url from memory or disk,
+        or None if it is missing (or stale, unless allow_stale is set).
+        """
+        with self.lock:
+            if url in self.memory:
+                text, fetched = self.memory[url]
+                if allow_stale or self._is_fresh(fetched):
+                    self.memory.move_to_end(url)
+                    return text
+
+        meta = self.meta(url)
+        if meta is None or (not allow_stale and not self.is_fresh(meta)):
+            return None
+
+        _, text_path, meta_path = self._paths(url)
+        try:
+            text = text_path.read_text(encoding="utf-8")
+            os.utime(meta_path)
+        except OSError:
+            return None
+        self._remember(url, text, meta.get("fetched", 0))
+        return text
+
+    def get_html(self, url: str) -> bytes | None:
+        """Return the stored raw HTML for url, or None"""
+        html_path, _, _ = self._paths(url)
+        try:
+            return html_path.read_bytes()
+        except OSError:
+            return None
+
+    def put(self, url: str, html: bytes, text: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Store a page in memory and on disk, then enforce the size cap"""
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "fetched": time.time()}
+        self._remember(url, text, meta["fetched"])
+        paths = self._paths(url)
+        data = (html, text.encode("utf-8"), json.dumps(meta).encode("utf-8"))
+        with self.disk_lock:
+            if self.total is None:
+                self.total = self.size()
+            replaced = _stored_bytes(paths)
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                for path, content in zip(paths, data):
+                    write_atomic(path, content)
+            except OSError:
+                self.total = None
+                return
+            self.total += sum(len(content) for content in data) - replaced
+            if self.total > self.max_bytes:
+                self._evict()
+
+    def touch(self, url: str) -> None:
+        """Mark a stored page as just revalidated"""
+        meta = self.meta(url)
+        if meta is None:
+            return
+        meta["fetched"] = time.time()
+        with self.lock:
+            if url in self.memory:
+                self.memory[url] = (self.memory[url][0], meta["fetched"])
+        _, _, meta_path = self._paths(url)
+        data = json.dumps(meta).encode("utf-8")
+        with self.disk_lock:
+            replaced = _stored_bytes([meta_path])
+            try:
+                write_atomic(meta_path, data)
+            except OSError:
+                return
+            if self.total is not None:
+                self.total += len(data) - replaced
+
+    def size(self) -> int:
+        """Return the number of bytes used on disk"""
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self) -> list[tuple[float, int, list[Path]]]:
+        """Return (last access, bytes, files) for every stored page"""
+        entries = []
+        try:
+            meta_files = list(self.directory.glob("*.json"))
+        except OSError:
+            return entries
+        for meta_path in meta_files:
+            key = meta_path.stem
+            files = [meta_path, self.directory / f"{key}.html", self.directory / f"{key}.txt"]
+            try:
+                accessed = meta_path.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((accessed, _stored_bytes(files), files))
+        return entries
+
+    def evict(self) -> None:
+        """Remove least recently used pages until the store fits in EVICT_TO of max_bytes"""
+        with self.disk_lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, files in entries:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            for path in files:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+        self.total = total
+
+    def clear(self) -> None:
+        """Remove every stored page"""
+        with self.lock:
+            self.memory.clear()
+        with self.disk_lock:
+            for _, _, files in self._entries():
+                for path in files:
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+            self.total = None
+
+
+def _stored_bytes(paths) -> int:
+    size = 0
+    for path in paths:
+        try:
+            size += path.stat().st_size
+        except OSError:
+            pass
+    return size
+
+
+_doc_cache: DocumentationCache | None = None
+
+
+def get_doc_cache() -> DocumentationCache:
+    """Return the process-wide documentation cache, configured from the environment"""
+    global _doc_cache
+    if _doc_cache is None:
+        from .cache import cache_dir
+        _doc_cache = DocumentationCache(
+            cache_dir() / "docs",
+            max_bytes=int(_env_number("RDATASETS_DOC_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+            ttl=_env_number("RDATASETS_DOC_CACHE_TTL", None),
+        )
+    return _doc_cache
+
+
+def extract_sections_bs4(content: bytes) -> "DocSections":
+    """
+    Extract the displayed sections of an Rd HTML page with BeautifulSoup
+    """
+    from bs4 import BeautifulSoup, Tag
+    from .docparse import DocSections
+
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Extract title
+    title = soup.find('title')
+    title_text = title.get_text().strip() if title else None
+    
+    # Extract main content
+    main_content = soup.find('div', {'id': 'main'}) or soup.find('div', class_='main') or soup.body
+    
+    if not main_content:
+        return DocSections(title_text, False, [], False, [], [])
+    
+    # Remove script and style elements
+    if main_content and isinstance(main_content, Tag):
+        for script in main_content.find_all(["script", "style"]):
+            script.decompose()
+    
+    # Extract description section
+    desc_content = []
+    description_section = main_content.find('h3', string='Description')
+    if description_section:
+        for sibling in description_section.find_next_siblings():
+            if sibling.name == 'h3':
+                break
+            if sibling.name == 'p':
+                desc_content.append(sibling.get_text().strip())
+    
+    # Extract format/variables section
+    format_section = main_content.find('h3', string='Format') or main_content.find('h3', string='Variables')
+    if not format_section:
+        return DocSections(title_text, True, desc_content, False, [], [])
+    
+    # Get description before the definition list
+    format_desc = []
+    for sibling in format_section.find_next_siblings():
+        if sibling.name == 'h3':
+            break
+        if sibling.name == 'p':
+            format_desc.append(sibling.get_text().strip())
+        elif sibling.name == 'dl':
+            break
+    
+    # Extract definition list (dt/dd pairs)
+    dl = format_section.find_next_sibling('dl')
+    if not dl:
+        # Look for dl in subsequent siblings
+        for sibling in format_section.find_next_siblings():
+            if sibling.name == 'dl':
+                dl = sibling
+                break
+            elif sibling.name == 'h3':
+                break
+    
+    variables = []
+    if dl:
+        dt_elements = dl.find_all('dt')
+        dd_elements = dl.find_all('dd')
+        
+        for dt, dd in zip(dt_elements, dd_elements):
+            variables.append((dt.get_text().strip(), dd.get_text().strip()))
+    
+    return DocSections(title_text, True, desc_content, True, format_desc, variables)
+
+
+def extract_sections(content: bytes) -> "DocSections":
+    """
+    Extract the displayed sections of an Rd HTML page.
+
+    The single-pass parser in docparse handles the usual Rd2HTML layout;
+    other pages are parsed with BeautifulSoup.
+    """
+    from .docparse import UnsupportedLayout, extract_sections as extract_fast
+
+    try:
+        return extract_fast(content)
+    except UnsupportedLayout:
+        return extract_sections_bs4(content)
+
+
+def format_documentation(sections: "DocSections", doc_url: str) -> str:
+    """
+    Format extracted documentation sections as plain text
+    """
+    title_text = sections.title if sections.title is not None else "Documentation"
+    
+    # Remove " R Documentation" suffix if present
+    title_text = re.sub(r'\s*R Documentation$', '', title_text)
+    
+    if not sections.has_content:
+        return f"Title: {title_text}\nURL: {doc_url}\n\nCould not extract main content from the documentation."
+    
+    result = f"Title: {title_text}\nURL: {doc_url}\n\n"
+    
+    if sections.description:
+        result += '\n'.join(sections.description) + '\n\n'
+    
+    if sections.has_format:
+        result += "## Variables\n\n"
+        
+        if sections.format_description:
+            result += '\n'.join(sections.format_description) + '\n\n'
+        
+        for dt_text, dd_text in sections.variables:
+            result += f"{dt_text} : {dd_text}\n"
+    
+    # Limit total length
+    if len(result) > 3000:
+        result = result[:3000] + "...\n\n[Content truncated - visit URL for full documentation]"
+    
+    return result
+
+
+def parse_documentation(content: bytes, doc_url: str) -> str:
+    """
+    Format the Rd HTML page content as plain text
+    """
+    return format_documentation(extract_sections(content), doc_url)
+
+
+def fetch_sections(doc_url: str) -> "DocSections":
+    """
+    Return the extracted sections of a documentation page, reading the
+    mirrored or stored page when there is one. Raises
+    requests.RequestException if the page cannot be downloaded.
+    """
+    from . import mirror, net
+
+    if mirror.mirror_dir() is not None:
+        return extract_sections(mirror.read(doc_url))
+
+    content = get_doc_cache().get_html(doc_url)
+    if content is None:
+        response = net.get(doc_url, timeout_default=10)
+        response.raise_for_status()
+        content = response.content
+    return extract_sections(content)
+
+
+# fetch_documentation reports failures as text starting with one of these
+FETCH_ERRORS = ("Error fetching documentation:", "Error parsing documentation:")
+
+
+def is_fetch_error(text: str) -> bool:
+    """Return whether text is a failure reported by fetch_documentation"""
+    return text.startswith(FETCH_ERRORS)
+
+
+def fetch_documentation(doc_url: str) -> str:
+    """
+    Fetch and format documentation from the given URL, using the cache
+    or the local mirror
+    """
+    import requests
+    from . import mirror, net
+
+    if mirror.mirror_dir() is not None:
+        try:
+            content = mirror.read(doc_url)
+        except OSError as e:
+            return f"Error fetching documentation: {e}\nURL: {doc_url}"
+        try:
+            return parse_documentation(content, doc_url)
+        except Exception as e:
+            return f"Error parsing documentation: {e}\nURL: {doc_url}"
+
+    cache = get_doc_cache()
+    text = cache.get_text(doc_url)
+    if text is not None:
+        return text
+
+    # Missing or due for revalidation
+    stale = cache.get_text(doc_url, allow_stale=True)
+    meta = cache.meta(doc_url) if stale is not None else None
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = net.get(doc_url, timeout_default=10, headers=headers)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        if stale is not None:
+            return stale
+        return f"Error fetching documentation: {e}\nURL: {doc_url}"
+
+    if response.status_code == 304:
+        cache.touch(doc_url)
+        return stale
+
+    try:
+        text = parse_documentation(response.content, doc_url)
+    except Exception as e:
+        return f"Error parsing documentation: {e}\nURL: {doc_url}"
+
+    cache.put(
+        doc_url, response.content, text,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+    return text
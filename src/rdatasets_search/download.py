@@ -0,0 +1,343 @@
+"""
+Streaming, resumable downloads.
+
+Files are streamed to disk in chunks through a "<name>.part" file and moved
+into place with an atomic rename once complete, so the destination never
+holds a half-written file. If a transfer is interrupted, the .part file is
+kept and the next attempt resumes it with an HTTP Range request.
+
+fetch_many() downloads many files concurrently with bounded parallelism and
+retries, skipping files that are present and unchanged on the server
+according to a manifest kept in the destination directory.
+
+Requests go through the shared session in the net module, which is
+imported inside the functions that use it, so that importing this module
+stays cheap. When a mirror is configured (RDATASETS_MIRROR), files are
+copied from the mirror instead.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+CHUNK_SIZE = 64 * 1024
+
+# progress(bytes_done, bytes_total or None)
+ProgressCallback = Callable[[int, int | None], None]
+
+
+class ChecksumError(ValueError):
+    """The downloaded file does not match the expected checksum"""
+
+
+def part_path(dest: Path) -> Path:
+    """Return the temporary path a download to dest is written to"""
+    return dest.with_name(dest.name + ".part")
+
+
+def _part_meta_path(part: Path) -> Path:
+    # The validators of the response a .part file was started from
+    return part.with_name(part.name + ".json")
+
+
+def _read_part_meta(part: Path, url: str) -> dict:
+    try:
+        with open(_part_meta_path(part), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) and meta.get("url") == url else {}
+
+
+def _write_part_meta(part: Path, url: str, response) -> None:
+    meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    with open(_part_meta_path(part), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _discard_part(part: Path) -> None:
+    part.unlink(missing_ok=True)
+    _part_meta_path(part).unlink(missing_ok=True)
+
+
+def _if_range(meta: dict) -> str | None:
+    """Return the validator a resumed Range request is made conditional on"""
+    etag = meta.get("etag")
+    if etag and not etag.startswith("W/"):
+        # Weak ETags may not be used with If-Range
+        return etag
+    return meta.get("last_modified")
+
+
+def _complete_length(response) -> int | None:
+    """Return N from a 416 reply's 'Content-Range: bytes */N'"""
+    _, _, total = response.headers.get("Content-Range", "").rpartition("/")
+    return int(total) if total.isdigit() else None
+
+
+def file_digest(path: Path, algorithm: str = "sha256") -> str:
+    """Return the hex digest of a file, read in chunks"""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_checksum(checksum: str) -> tuple[str, str]:
+    """Split 'algorithm:hexdigest' (sha256 by default) into its parts"""
+    algorithm, _, expected = checksum.rpartition(":")
+    algorithm = algorithm.lower() or "sha256"
+    if algorithm not in hashlib.algorithms_available:
+        raise ValueError(f"Unknown checksum algorithm: {algorithm}")
+    return algorithm, expected.lower()
+
+
+def stream_download(
+    url: str,
+    dest: str | Path,
+    *,
+    checksum: str | None = None,
+    progress: ProgressCallback | None = None,
+    timeout: float | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    validators: dict | None = None,
+    session=None,
+) -> Path:
+    """
+    Download url to dest without holding the body in memory.
+
+    An existing dest.part is resumed with a Range request when the server
+    supports it, conditional (If-Range) on the ETag or Last-Modified of the
+    response it was started from: if the file changed since, or there is no
+    validator to check, the download starts over. checksum, if given as 'sha256:<hex>' (or any hashlib
+    algorithm), is verified before the file is moved into place; on mismatch
+    the partial file is removed and ChecksumError is raised.
+
+    If a validators dict is passed, it receives the response's ETag and
+    Last-Modified headers. session defaults to the shared net session.
+    """
+    from . import mirror, net
+
+    dest = Path(dest)
+    part = part_path(dest)
+    if checksum is not None:
+        # Reject an unknown algorithm before downloading anything
+        _parse_checksum(checksum)
+
+    if mirror.mirror_dir() is not None:
+        _copy_from_mirror(mirror.find(url), part, progress, chunk_size)
+        return _finish(part, dest, url, checksum)
+
+    if timeout is None:
+        timeout = net.timeout()
+    # A second attempt follows only when an unusable .part file was discarded
+    for _ in range(2):
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {}
+        if offset:
+            validator = _if_range(_read_part_meta(part, url))
+            if validator is None:
+                # Nothing tells whether the partial file is still current
+                _discard_part(part)
+                offset = 0
+            else:
+                headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+
+        with net.get(url, headers=headers, stream=True, timeout=timeout, session=session) as response:
+            if response.status_code == 416 and offset:
+                # No bytes after the .part file: complete only if it has them all
+                if _complete_length(response) == offset:
+                    break
+                _discard_part(part)
+                continue
+            response.raise_for_status()
+            if validators is not None:
+                validators["etag"] = response.headers.get("ETag")
+                validators["last_modified"] = response.headers.get("Last-Modified")
+            if response.status_code != 206:
+                # Range not honoured, or the file changed: start over
+                offset = 0
+                _write_part_meta(part, url, response)
+            length = response.headers.get("Content-Length")
+            total = offset + int(length) if length is not None else None
+
+            done = offset
+            if progress:
+                progress(done, total)
+            with open(part, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, total)
+                f.flush()
+                os.fsync(f.fileno())
+            break
+
+    return _finish(part, dest, url, checksum)
+
+
+def _copy_from_mirror(source: Path, part: Path, progress: ProgressCallback | None, chunk_size: int) -> None:
+    """Copy a mirrored file to the .part file, reporting progress"""
+    total = source.stat().st_size
+    done = 0
+    if progress:
+        progress(done, total)
+    with open(source, "rb") as src, open(part, "wb") as f:
+        for chunk in iter(lambda: src.read(chunk_size), b""):
+            f.write(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _finish(part: Path, dest: Path, url: str, checksum: str | None) -> Path:
+    """Verify the checksum of a complete .part file and move it into place"""
+    if checksum is not None:
+        algorithm, expected = _parse_checksum(checksum)
+        if file_digest(part, algorithm) != expected:
+            _discard_part(part)
+            raise ChecksumError(f"Checksum mismatch for {url}: expected {checksum}")
+
+    os.replace(part, dest)
+    _part_meta_path(part).unlink(missing_ok=True)
+    return dest
+
+
+MANIFEST_NAME = ".rdatasets-manifest.json"
+
+# HTTP statuses worth retrying; other client errors fail immediately
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+def _load_manifest(directory: Path) -> dict:
+    try:
+        with open(directory / MANIFEST_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(directory: Path, manifest: dict) -> None:
+    from .cache import write_atomic
+
+    write_atomic(directory / MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+
+
+def is_unchanged(url: str, path: Path, entry: dict | None, session=None) -> bool:
+    """
+    Return whether path holds the current version of url, comparing the
+    manifest entry with the server's validators in a HEAD request.
+    """
+    from . import mirror, net
+
+    if entry is None or entry.get("url") != url or not path.exists():
+        return False
+    if path.stat().st_size != entry.get("size"):
+        return False
+
+    if mirror.mirror_dir() is not None:
+        return entry["size"] == mirror.find(url).stat().st_size
+
+    response = net.head(url, session=session)
+    response.raise_for_status()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag and entry.get("etag"):
+        return etag == entry["etag"]
+    if last_modified and entry.get("last_modified"):
+        return last_modified == entry["last_modified"]
+    length = response.headers.get("Content-Length")
+    return length is not None and int(length) == entry["size"]
+
+
+def retrying(func, retries: int, backoff: float):
+    """Call func, retrying transient network errors with exponential backoff"""
+    import requests
+
+    for attempt in range(retries + 1):
+        try:
+            return func()
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status not in RETRY_STATUSES or attempt == retries:
+                raise
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_many(
+    files,
+    dest: str | Path,
+    *,
+    jobs: int = 4,
+    retries: int = 3,
+    backoff: float = 1.0,
+    on_result: Callable[[str, str, Exception | None], None] | None = None,
+) -> dict[str, str]:
+    """
+    Download many (url, filename) pairs into dest, at most `jobs` at a time.
+
+    Files already present and unchanged on the server are skipped.
+    Transient failures are retried `retries` times with exponential backoff;
+    interrupted transfers resume from their .part file. Requests go through
+    a session that does not retry by itself, so `retries` is the only retry
+    layer.
+
+    Returns {filename: "downloaded" | "skipped" | "failed"}. on_result, if
+    given, is called as on_result(filename, status, error) as files finish.
+    """
+    from . import net
+
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(dest)
+    lock = threading.Lock()
+    session = net.create_session(pool_size=max(1, jobs), retries=0)
+
+    def fetch_one(url: str, filename: str) -> str:
+        path = dest / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with lock:
+            entry = manifest.get(filename)
+        if retrying(lambda: is_unchanged(url, path, entry, session), retries, backoff):
+            return "skipped"
+
+        validators: dict = {}
+        retrying(lambda: stream_download(url, path, validators=validators, session=session), retries, backoff)
+        with lock:
+            manifest[filename] = {"url": url, "size": path.stat().st_size, **validators}
+        return "downloaded"
+
+    results: dict[str, str] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = {
+                executor.submit(fetch_one, url, filename): filename
+                for url, filename in files
+            }
+            for future in as_completed(futures):
+                filename = futures[future]
+                error = future.exception()
+                results[filename] = "failed" if error else future.result()
+                if on_result:
+                    on_result(filename, results[filename], error)
+    finally:
+        session.close()
+        with lock:
+            _save_manifest(dest, manifest)
+    return results
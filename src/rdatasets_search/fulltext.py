@@ -0,0 +1,156 @@
+"""
+Ranked full-text search over the Package, Item and Title columns.
+
+An inverted index maps every term to the catalog rows that contain it.
+Ranking uses Okapi BM25; since a term's BM25 weight in a row depends only
+on the catalog, the weights are computed when the index is built and a
+query only sums them. The last query term also matches as a prefix, so
+partial words typed interactively already find results.
+
+The index is built once per catalog and pickled next to the cached index
+snapshot, keyed by a fingerprint of the catalog contents.
+"""
+
+import heapq
+import math
+import pickle
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import polars as pl
+
+from .cache import catalog_fingerprint, temp_path
+
+FIELDS = ("Package", "Item", "Title")
+
+INDEX_NAME = "fulltext.pickle"
+
+# Bump when the pickled layout changes
+FORMAT_VERSION = 2
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_token_pattern = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric terms"""
+    return _token_pattern.findall(text.lower())
+
+
+class FullTextIndex:
+    """Inverted index with BM25 ranking"""
+
+    def __init__(self, catalog: pl.DataFrame):
+        self.fingerprint = catalog_fingerprint(catalog)
+        frequencies: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        doc_lengths: list[int] = []
+
+        columns = [catalog[col].fill_null("").cast(pl.String) for col in FIELDS if col in catalog.columns]
+        for row, values in enumerate(zip(*columns)):
+            terms = tokenize(" ".join(values))
+            doc_lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                frequencies[term].append((row, count))
+
+        n = len(doc_lengths)
+        avg_length = sum(doc_lengths) / n if n else 0.0
+
+        # term -> [(row, BM25 weight of the term in that row)]
+        self.postings: dict[str, list[tuple[int, float]]] = {}
+        for term, rows in frequencies.items():
+            idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            self.postings[term] = [
+                (row, idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_lengths[row] / avg_length)))
+                for row, tf in rows
+            ]
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, term: str) -> list[str]:
+        """Return the vocabulary terms starting with term"""
+        start = bisect_left(self.vocabulary, term)
+        end = bisect_left(self.vocabulary, term + "\uffff")
+        return self.vocabulary[start:end]
+
+    def search(self, query: str, limit: int | None = None) -> list[tuple[int, float]]:
+        """
+        Return (row, score) pairs for the rows matching any query term,
+        best match first.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        scores: dict[int, float] = defaultdict(float)
+        for term in dict.fromkeys(terms):
+            if term == terms[-1]:
+                candidates = self._expand(term)
+            else:
+                candidates = [term] if term in self.postings else []
+
+            if len(candidates) == 1:
+                for row, weight in self.postings[candidates[0]]:
+                    scores[row] += weight
+                continue
+
+            # A prefix may expand to several terms; count the best one per row
+            best: dict[int, float] = {}
+            for candidate in candidates:
+                for row, weight in self.postings[candidate]:
+                    if weight > best.get(row, 0.0):
+                        best[row] = weight
+            for row, weight in best.items():
+                scores[row] += weight
+
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def save(self, path: Path) -> None:
+        """Pickle the index to path"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path(path)
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump((FORMAT_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @staticmethod
+    def load(path: Path) -> "FullTextIndex | None":
+        """Load a pickled index, or return None if it is missing or outdated"""
+        try:
+            with open(path, "rb") as f:
+                version, index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+            return None
+        if version != FORMAT_VERSION:
+            return None
+        return index
+
+
+def load_or_build(catalog: pl.DataFrame, directory: Path | None = None) -> FullTextIndex:
+    """
+    Return the full-text index for catalog, reusing the persisted one when
+    it was built from the same catalog.
+    """
+    if directory is None:
+        from .cache import cache_dir
+        directory = cache_dir()
+    path = directory / INDEX_NAME
+
+    index = FullTextIndex.load(path)
+    if index is not None and index.fingerprint == catalog_fingerprint(catalog):
+        return index
+
+    index = FullTextIndex(catalog)
+    try:
+        index.save(path)
+    except OSError:
+        pass
+    return index
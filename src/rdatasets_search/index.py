@@ -0,0 +1,187 @@
+"""
+Secondary indexes over the dataset catalog.
+
+Built once per catalog, a CatalogIndex holds:
+  - a bitmap (boolean Series) for every n_* "has type" flag
+  - on large catalogs, a sorted permutation of Rows and Cols, so that range
+    comparisons are answered with a binary search instead of a column scan
+  - a hash index from "PACKAGE/ITEM" names to rows, for direct lookups
+
+Turning a range into a bitmap costs time proportional to the number of
+matching rows, so ranges that match a large share of the catalog are
+evaluated with a vectorized comparison instead. Below MIN_SORTED_HEIGHT
+rows the comparison is faster for every range (benchmarks/bench_index.py),
+so small catalogs have no sorted permutations.
+
+Predicates are answered as bitmaps and combined with a bitmap AND.
+"""
+
+from functools import reduce
+from operator import and_
+
+import polars as pl
+
+# (column, operator, value), as produced by search.parse_filter; boolean
+# queries are ('and' | 'or' | 'not', 'of', (child predicates...))
+Predicate = tuple[str, str, int | float | str | tuple]
+
+SORTED_COLUMNS = ("Rows", "Cols")
+
+# Ranges matching more than this share of rows are not built from positions
+SCATTER_FRACTION = 0.1
+
+# Catalogs with fewer rows evaluate ranges with a vectorized comparison
+MIN_SORTED_HEIGHT = 1_000_000
+
+
+class SortedColumn:
+    """A column's non-null values in ascending order, with their row positions"""
+
+    def __init__(self, column: pl.Series):
+        order = column.arg_sort(nulls_last=True)
+        non_null = len(column) - column.null_count()
+        self.positions = order.head(non_null)
+        self.values = column.gather(self.positions)
+
+    def positions_for(self, operator: str, value: int, limit: int | None = None) -> pl.Series | None:
+        """
+        Return the row positions whose value satisfies `operator value`, or
+        None if there are more than limit of them
+        """
+        def left():
+            return self.values.search_sorted(value, side="left")
+
+        def right():
+            return self.values.search_sorted(value, side="right")
+
+        end = len(self.values)
+        if operator == '>':
+            spans = [(right(), end)]
+        elif operator == '>=':
+            spans = [(left(), end)]
+        elif operator == '<':
+            spans = [(0, left())]
+        elif operator == '<=':
+            spans = [(0, right())]
+        elif operator == '==':
+            spans = [(left(), right())]
+        elif operator == '!=':
+            spans = [(0, left()), (right(), end)]
+        else:
+            raise ValueError(f"Unknown operator: {operator}")
+        # Counted from the bounds, so unselective ranges build nothing
+        if limit is not None and sum(stop - start for start, stop in spans) > limit:
+            return None
+        parts = [self.positions.slice(start, stop - start) for start, stop in spans]
+        return parts[0] if len(parts) == 1 else pl.concat(parts)
+
+
+class CatalogIndex:
+    """Bitmaps and sorted permutations for the type and size predicates"""
+
+    def __init__(self, catalog: pl.DataFrame):
+        self.catalog = catalog
+        self.height = catalog.height
+        self.flags = {
+            col: (catalog[col] > 0).fill_null(False)
+            for col in catalog.columns
+            if col.startswith("n_")
+        }
+        self.sorted = {
+            col: SortedColumn(catalog[col])
+            for col in SORTED_COLUMNS
+            if col in catalog.columns and self.height >= MIN_SORTED_HEIGHT
+        }
+        self._empty = pl.Series([False] * self.height, dtype=pl.Boolean)
+        # "PACKAGE/ITEM" -> row; the first row wins if a name repeats
+        self.names: list[str] = []
+        if "Package" in catalog.columns and "Item" in catalog.columns:
+            self.names = catalog.select(
+                pl.concat_str([pl.col("Package"), pl.col("Item")], separator="/").fill_null("")
+            ).to_series().to_list()
+        self.rows_by_name = dict(zip(reversed(self.names), range(self.height - 1, -1, -1)))
+        self._name_index = None
+
+    def lookup(self, name: str) -> int:
+        """
+        Return the row of the dataset called name ("PACKAGE/ITEM", or ITEM
+        alone if only one package has it; case-insensitive).
+        Raises lookup.UnknownDataset, with the closest names, if there is none.
+        """
+        row = self.rows_by_name.get(name)
+        if row is not None:
+            return row
+        from .lookup import UnknownDataset
+
+        rows = self.name_index().resolve(name)
+        if len(rows) == 1:
+            return rows[0]
+        if rows:
+            raise UnknownDataset(name, [self.names[r] for r in rows], ambiguous=True)
+        raise UnknownDataset(name, self.name_index().suggest(name))
+
+    def name_index(self):
+        """Return the lookup.NameIndex of the catalog, building it on first use"""
+        if self._name_index is None:
+            from .lookup import NameIndex
+            self._name_index = NameIndex(self.names)
+        return self._name_index
+
+    def _bitmap(self, positions: pl.Series) -> pl.Series:
+        bitmap = self._empty.clone()
+        if len(positions):
+            bitmap.scatter(positions, True)
+        return bitmap
+
+    def _indexed_mask(self, predicate: Predicate) -> pl.Series | None:
+        """Return the bitmap of a predicate the indexes answer, else None"""
+        col_name, operator, value = predicate
+        if operator == '>' and value == 0 and col_name in self.flags:
+            return self.flags[col_name]
+        if col_name in self.sorted:
+            positions = self.sorted[col_name].positions_for(operator, value, limit=int(self.height * SCATTER_FRACTION))
+            if positions is not None:
+                return self._bitmap(positions)
+        # Not indexed or not selective
+        return None
+
+    def _split(self, predicates) -> tuple[list[pl.Series], list[Predicate]]:
+        """Return the bitmaps of the predicates the indexes answer, and the other predicates"""
+        masks, rest = [], []
+        for predicate in predicates:
+            indexed = self._indexed_mask(predicate)
+            if indexed is None:
+                rest.append(predicate)
+            else:
+                masks.append(indexed)
+        return masks, rest
+
+    def _expr_mask(self, predicates) -> pl.Series:
+        """Evaluate predicates the indexes do not answer in one pass over the catalog"""
+        from .search import predicate_expr
+        expr = pl.all_horizontal([predicate_expr(p) for p in predicates]).fill_null(False)
+        return self.catalog.select(expr).to_series()
+
+    def mask(self, predicate: Predicate) -> pl.Series:
+        """Return the bitmap of rows matching a single predicate"""
+        indexed = self._indexed_mask(predicate)
+        return indexed if indexed is not None else self._expr_mask([predicate])
+
+    def mask_all(self, predicates) -> pl.Series:
+        """Return the bitmap of rows matching every predicate"""
+        masks, rest = self._split(predicates)
+        if rest:
+            masks.append(self._expr_mask(rest))
+        if not masks:
+            return ~self._empty
+        return reduce(and_, masks)
+
+    def filter(self, predicates) -> pl.DataFrame:
+        """Return the catalog rows matching every predicate, in catalog order"""
+        predicates = list(predicates)
+        if not predicates:
+            return self.catalog
+        from .search import predicate_expr
+        # Bitmaps and expressions in one filter, so unindexed predicates cost no extra pass
+        masks, rest = self._split(predicates)
+        return self.catalog.filter(*masks, *[predicate_expr(p) for p in rest])
@@ -0,0 +1,95 @@
+"""
+Dataset lookup by name, with suggestions for names that do not exist.
+
+Exact "PACKAGE/ITEM" names are answered by the hash index CatalogIndex
+builds with the catalog. A NameIndex, built on the first lookup that
+misses, resolves the rest:
+  - names differing only in case ("mass/boston")
+  - an item without its package ("Boston"), when only one package has it
+  - otherwise, the closest names by shared character trigrams (Dice
+    coefficient), e.g. "MASS/Bostn" suggests "MASS/Boston"; an item given
+    alone is compared with the items, so "Bostn" suggests it too
+"""
+
+import heapq
+from collections import Counter, defaultdict
+
+# Length of the character n-grams compared
+NGRAM = 3
+
+# Suggestions below this similarity (0 to 1) are not offered
+MIN_SIMILARITY = 0.3
+
+SUGGESTIONS = 5
+
+
+def ngrams(text: str) -> set[str]:
+    """Return the character n-grams of text, padded so that short names have some"""
+    padded = f" {text.lower()} "
+    return {padded[i:i + NGRAM] for i in range(max(len(padded) - NGRAM + 1, 1))}
+
+
+class UnknownDataset(ValueError):
+    """No dataset has the name; suggestions holds the closest names"""
+
+    def __init__(self, name: str, suggestions: list[str], ambiguous: bool = False):
+        self.name = name
+        self.suggestions = suggestions
+        if ambiguous:
+            message = f"Ambiguous dataset name: {name}. Matches: {', '.join(suggestions)}"
+        else:
+            message = f"Unknown dataset: {name}"
+            if suggestions:
+                message += f". Did you mean: {', '.join(suggestions)}?"
+        super().__init__(message)
+
+
+class NameIndex:
+    """Case-folded names, items and trigram indexes over "PACKAGE/ITEM" names and items"""
+
+    def __init__(self, names: list[str]):
+        self.names = names
+        self.folded: dict[str, list[int]] = defaultdict(list)
+        self.items: dict[str, list[int]] = defaultdict(list)
+        self.postings: dict[str, list[int]] = defaultdict(list)
+        self.sizes: list[int] = []
+        self.item_postings: dict[str, list[int]] = defaultdict(list)
+        self.item_sizes: list[int] = []
+        for row, name in enumerate(names):
+            item = name.split("/", 1)[-1]
+            self.folded[name.lower()].append(row)
+            self.items[item.lower()].append(row)
+            grams = ngrams(name)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(row)
+            grams = ngrams(item)
+            self.item_sizes.append(len(grams))
+            for gram in grams:
+                self.item_postings[gram].append(row)
+
+    def resolve(self, name: str) -> list[int]:
+        """Return the rows a name may refer to, ignoring case; an item may omit its package"""
+        key = name.strip().lower()
+        if "/" in key:
+            return self.folded.get(key, [])
+        return self.items.get(key, [])
+
+    def suggest(self, name: str, limit: int = SUGGESTIONS) -> list[str]:
+        """
+        Return the names most similar to name, best first. A name without a
+        package is compared with the items only.
+        """
+        name = name.strip()
+        if "/" in name:
+            postings, sizes = self.postings, self.sizes
+        else:
+            postings, sizes = self.item_postings, self.item_sizes
+        grams = ngrams(name)
+        shared = Counter(row for gram in grams for row in postings.get(gram, ()))
+        scored = (
+            (2 * count / (len(grams) + sizes[row]), row)
+            for row, count in shared.items()
+        )
+        best = heapq.nlargest(limit, ((score, -row) for score, row in scored if score >= MIN_SIMILARITY))
+        return [self.names[-row] for _, row in best]
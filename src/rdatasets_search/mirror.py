@@ -0,0 +1,113 @@
+"""
+Local mirror of the Rdatasets index, documentation pages and CSV files.
+
+sync() copies the remote files into a directory, laid out by URL like
+`wget --mirror` (DIR/<host>/<path>). Re-runs are incremental: the manifest
+kept by download.fetch_many records each file's ETag and Last-Modified, and
+files the server reports as unchanged are not downloaded again.
+
+When RDATASETS_MIRROR names a mirror directory, the catalog, documentation
+pages and CSV downloads are served from it and every network request is
+refused, so the tool works on machines without network access.
+
+Environment variables:
+  - RDATASETS_MIRROR: mirror directory to serve from, with no network access
+"""
+
+import os
+from pathlib import Path
+from typing import Callable
+from urllib.parse import unquote, urlsplit
+
+
+def mirror_dir() -> Path | None:
+    """Return the mirror directory from RDATASETS_MIRROR, or None if unset"""
+    value = os.environ.get("RDATASETS_MIRROR")
+    if not value:
+        return None
+    return Path(value).expanduser()
+
+
+def relative_path(url: str) -> str:
+    """Return where url is stored inside a mirror, as <host>/<path>"""
+    parts = urlsplit(url)
+    path = unquote(parts.path).lstrip("/")
+    segments = [parts.netloc] + [s for s in path.split("/") if s]
+    if any(s in (".", "..") for s in segments) or not parts.netloc:
+        raise ValueError(f"Cannot mirror URL: {url}")
+    return "/".join(segments)
+
+
+def local_path(url: str, directory: Path | None = None) -> Path:
+    """
+    Return the mirrored copy of url in directory (default: RDATASETS_MIRROR).
+    The file may not exist.
+    """
+    if directory is None:
+        directory = mirror_dir()
+        if directory is None:
+            raise ValueError("No mirror configured. Set RDATASETS_MIRROR to a directory created with 'r-data mirror'")
+    return directory / relative_path(url)
+
+
+def find(url: str) -> Path:
+    """
+    Return the mirrored copy of url.
+    Raises FileNotFoundError if the mirror does not have it.
+    """
+    path = local_path(url)
+    if not path.is_file():
+        raise FileNotFoundError(f"Not in the mirror: {url} (expected {path})")
+    return path
+
+
+def read(url: str) -> bytes:
+    """Return the mirrored content of url"""
+    return find(url).read_bytes()
+
+
+def load_catalog(url: str):
+    """Read the mirrored index at url into a DataFrame"""
+    import polars as pl
+
+    path = local_path(url)
+    if not path.exists():
+        raise FileNotFoundError(f"The mirror has no index: {path}. Run 'r-data mirror' to create it")
+    return pl.read_csv(path)
+
+
+def sync(
+    directory: str | Path,
+    index_url: str,
+    *,
+    csv: bool = False,
+    jobs: int = 8,
+    retries: int = 3,
+    on_result: Callable[[str, str, Exception | None], None] | None = None,
+) -> dict[str, str]:
+    """
+    Mirror the index at index_url, every documentation page it lists and,
+    if csv is set, every CSV file into directory.
+
+    Returns {relative path: "downloaded" | "skipped" | "failed"}; on_result
+    is called as each file finishes, as for download.fetch_many.
+    """
+    import polars as pl
+    from .download import fetch_many
+
+    directory = Path(directory)
+    index_file = relative_path(index_url)
+    results = fetch_many([(index_url, index_file)], directory, jobs=1, retries=retries, on_result=on_result)
+    if results[index_file] == "failed" and not (directory / index_file).exists():
+        return results
+
+    catalog = pl.read_csv(directory / index_file)
+    columns = ["Doc", "CSV"] if csv else ["Doc"]
+    urls = [
+        url
+        for column in columns if column in catalog.columns
+        for url in catalog[column].drop_nulls().unique(maintain_order=True).to_list()
+    ]
+    files = [(url, relative_path(url)) for url in urls]
+    results.update(fetch_many(files, directory, jobs=jobs, retries=retries, on_result=on_result))
+    return results
@@ -0,0 +1,152 @@
+"""
+Shared HTTP client for all network I/O.
+
+The index loader, the documentation fetcher and the downloaders use one
+requests.Session, so connections to the same host are kept alive and reused
+instead of paying a new TCP/TLS handshake per request. Connection errors and
+transient HTTP statuses are retried by the connection pool.
+download.fetch_many retries each file itself, so it passes a session created
+with retries=0 instead.
+
+Environment variables:
+  - RDATASETS_HTTP_POOL_SIZE: connections kept per host (default: 10)
+  - RDATASETS_HTTP_TIMEOUT: timeout in seconds for every request; by default
+    each caller uses its own (e.g. 10 seconds for documentation pages)
+  - RDATASETS_HTTP_RETRIES: retries for connection errors and 429/5xx (default: 3)
+
+While a mirror is configured (RDATASETS_MIRROR), every request is refused
+with NetworkDisabled.
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 30
+
+# Seconds; retries wait 0.5, 1, 2, ... seconds
+BACKOFF_FACTOR = 0.5
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class NetworkDisabled(requests.ConnectionError):
+    """A request was made while serving from a local mirror"""
+
+
+_session: requests.Session | None = None
+_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value!r}. Expected an integer")
+
+
+def timeout(default: float = DEFAULT_TIMEOUT) -> float:
+    """Return the request timeout: RDATASETS_HTTP_TIMEOUT if set, else default"""
+    value = os.environ.get("RDATASETS_HTTP_TIMEOUT")
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid RDATASETS_HTTP_TIMEOUT: {value!r}. Expected a number of seconds")
+
+
+def create_session(pool_size: int | None = None, retries: int | None = None) -> requests.Session:
+    """Create a session with keep-alive connection pooling and retries"""
+    if pool_size is None:
+        pool_size = _env_int("RDATASETS_HTTP_POOL_SIZE", DEFAULT_POOL_SIZE)
+    if retries is None:
+        retries = _env_int("RDATASETS_HTTP_RETRIES", DEFAULT_RETRIES)
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=("GET", "HEAD"),
+        # Hand the final response to the caller's raise_for_status()
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = "rdatasets-search"
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def reset_session() -> None:
+    """Close the shared session; the next request creates a new one"""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def _check_network(url: str) -> None:
+    from .mirror import mirror_dir
+
+    if mirror_dir() is not None:
+        raise NetworkDisabled(f"Network access is disabled while serving from the mirror (RDATASETS_MIRROR): {url}")
+
+
+def get(url: str, timeout_default: float = DEFAULT_TIMEOUT, session: requests.Session | None = None,
+        **kwargs) -> requests.Response:
+    """GET url through session, by default the shared one"""
+    _check_network(url)
+    kwargs.setdefault("timeout", timeout(timeout_default))
+    return (session or get_session()).get(url, **kwargs)
+
+
+def head(url: str, timeout_default: float = DEFAULT_TIMEOUT, session: requests.Session | None = None,
+         **kwargs) -> requests.Response:
+    """HEAD url through session, by default the shared one, following redirects"""
+    _check_network(url)
+    kwargs.setdefault("timeout", timeout(timeout_default))
+    kwargs.setdefault("allow_redirects", True)
+    return (session or get_session()).head(url, **kwargs)
+
+
+def stats() -> dict[str, int]:
+    """
+    Return connection counters for the shared session:
+    requests sent, connections opened and connections reused.
+    """
+    total_requests = 0
+    connections = 0
+    session = _session
+    if session is not None:
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                total_requests += pool.num_requests
+                connections += pool.num_connections
+    return {
+        "requests": total_requests,
+        "connections": connections,
+        "reused": max(0, total_requests - connections),
+    }
@@ -0,0 +1,60 @@
+"""
+Machine-readable output of query results.
+
+write() streams a DataFrame to a binary stream in one of FORMATS:
+  - csv:    a header line, then one line per dataset
+  - json:   one JSON array of objects
+  - ndjson: one JSON object per line
+  - arrow:  an Arrow IPC stream, written straight from the frame's buffers
+
+Text formats are written in slices of BATCH_ROWS rows, so the first rows
+reach a pipeline before the last ones are serialized and memory use is
+bounded by a slice. Arrow IPC is written by polars without converting rows
+to Python objects.
+"""
+
+import io
+from typing import TYPE_CHECKING, BinaryIO
+
+# polars is not needed to import FORMATS, e.g. when a daemon answers the query
+if TYPE_CHECKING:
+    import polars as pl
+
+FORMATS = ("csv", "json", "ndjson", "arrow")
+
+BATCH_ROWS = 10_000
+
+
+def write(df: "pl.DataFrame", output_format: str, stream: BinaryIO, batch_rows: int = BATCH_ROWS) -> None:
+    """Write df to stream in output_format"""
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown format: {output_format}. Expected one of: {', '.join(FORMATS)}")
+
+    if output_format == "arrow":
+        df.write_ipc_stream(stream)
+        stream.flush()
+        return
+
+    if output_format == "json":
+        stream.write(b"[")
+    first = True
+    for batch in df.iter_slices(n_rows=batch_rows):
+        buffer = io.BytesIO()
+        if output_format == "csv":
+            batch.write_csv(buffer, include_header=first)
+        else:
+            batch.write_ndjson(buffer)
+        data = buffer.getvalue()
+        if output_format == "json":
+            # The NDJSON lines become the elements of one array
+            data = (b"" if first else b",\n") + data.rstrip(b"\n").replace(b"\n", b",\n")
+        stream.write(data)
+        stream.flush()
+        first = False
+
+    if first and output_format == "csv":
+        # An empty result still has a header
+        df.write_csv(stream)
+    if output_format == "json":
+        stream.write(b"]\n")
+    stream.flush()
@@ -0,0 +1,82 @@
+"""
+Background prefetching of documentation pages.
+
+While a page of results is on screen, the documentation of every dataset on
+it is fetched and parsed in a small thread pool, so that opening one of them
+is served from the documentation cache instead of the network.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+
+
+class PrefetchFailed(Exception):
+    """A background fetch returned an error report instead of documentation"""
+
+
+class DocumentationPrefetcher:
+    """Fetch documentation for the visible datasets in background threads"""
+
+    def __init__(self, fetch=None, max_workers: int = DEFAULT_WORKERS):
+        if fetch is None:
+            from .docs import fetch_documentation
+            fetch = fetch_documentation
+        self.fetch = fetch
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="doc-prefetch")
+        self.futures: dict[str, Future] = {}
+
+    def _fetch(self, url: str) -> str:
+        from .docs import is_fetch_error
+
+        text = self.fetch(url)
+        if is_fetch_error(text):
+            # Not kept as the answer: get() and later prefetches fetch it again
+            raise PrefetchFailed(text)
+        return text
+
+    def prefetch(self, urls) -> None:
+        """
+        Start fetching urls, cancelling queued work for pages no longer shown
+        and retrying fetches that failed. Fetches that already started are
+        left to finish and fill the cache, and are forgotten once done.
+        """
+        wanted = list(dict.fromkeys(urls))
+        for url, future in list(self.futures.items()):
+            if url not in wanted and (future.cancel() or future.done()):
+                del self.futures[url]
+        for url in wanted:
+            future = self.futures.get(url)
+            if future is None or future.cancelled() or (future.done() and future.exception() is not None):
+                self.futures[url] = self.executor.submit(self._fetch, url)
+
+    def get(self, url: str) -> str:
+        """
+        Return the documentation for url, reusing a prefetched or in-flight
+        fetch when there is one, and fetching it again if that failed.
+        """
+        future = self.futures.pop(url, None)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except Exception:
+                pass
+        return self.fetch(url)
+
+    def ready(self, url: str) -> bool:
+        """Return whether the documentation for url has been prefetched"""
+        future = self.futures.get(url)
+        return (
+            future is not None and future.done() and not future.cancelled() and future.exception() is None
+        )
+
+    def close(self) -> None:
+        """Stop the workers, dropping queued fetches"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.futures.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
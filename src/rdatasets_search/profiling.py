@@ -0,0 +1,258 @@
+"""
+Content profiles of the datasets, collected into a statistics catalog.
+
+build() reads every dataset available locally (in the Parquet store, a
+mirror or a directory of downloaded CSVs) in a process pool and records,
+for every column: its type, null count, number of distinct values and,
+for numeric columns, the minimum and maximum. The results are written to
+one Parquet file, the statistics catalog, in the cache directory.
+
+Filters such as having "missing > 20" or "numeric distinct > 1000" are
+answered from the statistics catalog alone and never read the data files.
+The Rdatasets row-name column ("rownames") is not profiled.
+
+Rebuilding only profiles datasets whose source file changed.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+from .cache import temp_path
+from .store import NULL_VALUES
+
+STATS_NAME = "stats.parquet"
+
+SKIPPED_COLUMNS = {"rownames"}
+
+SCHEMA = {
+    "Package": pl.String,
+    "Item": pl.String,
+    "column": pl.String,
+    "kind": pl.String,
+    "dtype": pl.String,
+    "rows": pl.Int64,
+    "nulls": pl.Int64,
+    "missing": pl.Float64,
+    "distinct": pl.Int64,
+    "min": pl.Float64,
+    "max": pl.Float64,
+    "source_size": pl.Int64,
+    "source_mtime": pl.Float64,
+}
+
+
+def column_kind(dtype: pl.DataType) -> str:
+    """Return the kind of a polars dtype: numeric, character, logical or other"""
+    if dtype.is_numeric():
+        return "numeric"
+    if dtype == pl.Boolean:
+        return "logical"
+    if dtype == pl.String or dtype == pl.Categorical:
+        return "character"
+    return "other"
+
+
+def read_source(path: str | Path) -> pl.DataFrame:
+    """Read a dataset file, Parquet or CSV, inferring types from the whole file"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pl.read_parquet(path)
+    return pl.read_csv(path, infer_schema_length=None, null_values=NULL_VALUES)
+
+
+def profile_file(path: str | Path) -> list[tuple]:
+    """
+    Return one (column, kind, dtype, rows, nulls, missing %, distinct, min, max)
+    tuple per column of a dataset file.
+    """
+    df = read_source(path)
+    columns = [name for name in df.columns if name not in SKIPPED_COLUMNS]
+    if not columns:
+        return []
+
+    numeric = [name for name in columns if df.schema[name].is_numeric()]
+    # One pass computing every measure of every column
+    exprs = [pl.col(name).null_count().alias(f"nulls:{name}") for name in columns]
+    exprs += [pl.col(name).n_unique().alias(f"distinct:{name}") for name in columns]
+    exprs += [pl.col(name).min().cast(pl.Float64).alias(f"min:{name}") for name in numeric]
+    exprs += [pl.col(name).max().cast(pl.Float64).alias(f"max:{name}") for name in numeric]
+    measures = df.select(exprs).row(0, named=True)
+
+    rows = df.height
+    profile = []
+    for name in columns:
+        nulls = measures[f"nulls:{name}"]
+        profile.append((
+            name,
+            column_kind(df.schema[name]),
+            str(df.schema[name]),
+            rows,
+            nulls,
+            100.0 * nulls / rows if rows else 0.0,
+            # Distinct non-null values
+            measures[f"distinct:{name}"] - (1 if nulls else 0),
+            measures.get(f"min:{name}"),
+            measures.get(f"max:{name}"),
+        ))
+    return profile
+
+
+def find_source(package: str, item: str, csv_url: str | None, directories=()) -> Path | None:
+    """
+    Return a local file with the contents of a dataset: the Parquet store,
+    then each directory (as a mirror, or as `r-data fetch` output), then the
+    configured mirror.
+    """
+    from . import mirror, store
+
+    try:
+        stored = store.path_for(package, item)
+    except ValueError:
+        return None
+    if stored.exists():
+        return stored
+
+    candidates = []
+    for directory in directories:
+        directory = Path(directory)
+        if csv_url:
+            try:
+                candidates.append(directory / mirror.relative_path(csv_url))
+            except ValueError:
+                pass
+        candidates.append(directory / f"{package}_{item}.csv")
+    if csv_url and mirror.mirror_dir() is not None:
+        try:
+            candidates.append(mirror.local_path(csv_url))
+        except ValueError:
+            pass
+    return next((path for path in candidates if path.is_file()), None)
+
+
+def stats_path(directory: Path | None = None) -> Path:
+    if directory is None:
+        from .cache import cache_dir
+        directory = cache_dir()
+    return directory / STATS_NAME
+
+
+def load(directory: Path | None = None) -> pl.DataFrame | None:
+    """Return the statistics catalog, or None if it was never built"""
+    path = stats_path(directory)
+    if not path.exists():
+        return None
+    return pl.read_parquet(path)
+
+
+def build(
+    catalog: pl.DataFrame,
+    *,
+    sources=(),
+    jobs: int | None = None,
+    rebuild: bool = False,
+    directory: Path | None = None,
+    on_result: Callable[[str, str, Exception | None], None] | None = None,
+) -> tuple[pl.DataFrame, dict[str, str]]:
+    """
+    Profile every dataset of catalog available locally and write the
+    statistics catalog.
+
+    sources are extra directories holding mirrored or downloaded CSVs.
+    Datasets whose source file is unchanged since the last build keep their
+    statistics unless rebuild is set. Files are profiled in a pool of `jobs`
+    processes (default: one per CPU).
+
+    Returns the statistics catalog and {"Package/Item": "profiled" |
+    "unchanged" | "missing" | "failed"}; on_result(name, status, error) is
+    called as each dataset finishes.
+    """
+    path = stats_path(directory)
+    previous = None if rebuild else load(directory)
+    kept = {}
+    if previous is not None:
+        for (package, item), group in previous.group_by(["Package", "Item"]):
+            kept[(package, item)] = group
+
+    results: dict[str, str] = {}
+    frames = []
+    todo = {}
+    for package, item, csv_url in catalog.select(["Package", "Item", "CSV"]).iter_rows():
+        name = f"{package}/{item}"
+        source = find_source(package, item, csv_url, sources)
+        if source is None:
+            results[name] = "missing"
+            if on_result:
+                on_result(name, "missing", None)
+            continue
+        stat = source.stat()
+        signature = (stat.st_size, stat.st_mtime)
+        old = kept.get((package, item))
+        if old is not None and (old["source_size"][0], old["source_mtime"][0]) == signature:
+            frames.append(old)
+            results[name] = "unchanged"
+            if on_result:
+                on_result(name, "unchanged", None)
+            continue
+        todo[(package, item)] = (source, signature)
+
+    def collect(key, profile):
+        package, item = key
+        _, (size, mtime) = todo[key]
+        frames.append(pl.DataFrame(
+            [(package, item, *column, size, mtime) for column in profile],
+            schema=SCHEMA,
+            orient="row",
+        ))
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    # polars' thread pool does not survive fork(), so workers are spawned
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(todo) or 1)), mp_context=context) as executor:
+        futures = {executor.submit(profile_file, str(source)): key for key, (source, _) in todo.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            name = "/".join(key)
+            error = future.exception()
+            if error is None:
+                collect(key, future.result())
+            results[name] = "failed" if error else "profiled"
+            if on_result:
+                on_result(name, results[name], error)
+
+    stats = pl.concat(frames) if frames else pl.DataFrame(schema=SCHEMA)
+    stats = stats.sort(["Package", "Item"], maintain_order=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = temp_path(path)
+    try:
+        stats.write_parquet(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return stats, results
+
+
+class StatsIndex:
+    """The statistics catalog, prepared for answering column predicates"""
+
+    def __init__(self, stats: pl.DataFrame):
+        self.stats = stats.with_columns(
+            pl.concat_str([pl.col("Package"), pl.col("Item")], separator="/").alias("dataset")
+        )
+
+    def datasets_matching(self, kind: str | None, measure: str, operator: str, value: float) -> list[str]:
+        """
+        Return the keys of the datasets with at least one column (of kind,
+        if given) whose measure satisfies `operator value`.
+        """
+        from .search import comparison
+
+        stats = self.stats
+        if kind is not None:
+            stats = stats.filter(pl.col("kind") == kind)
+        return stats.filter(comparison(pl.col(measure), operator, value))["dataset"].unique().to_list()
@@ -0,0 +1,237 @@
+"""
+Boolean filter queries.
+
+A data_having argument may combine filters with AND, OR, NOT and
+parentheses, compare ranges and compare the number of columns of a type:
+
+    binary OR factor
+    NOT (character OR logical)
+    100 <= rows <= 1000
+    numeric >= 3 AND (rows > 1000 OR cols > 20)
+    var:"household income" OR missing > 20
+
+Grammar (keywords and names are case-insensitive; AND may be omitted):
+
+    query   := and ("OR" and)*
+    and     := unary ("AND"? unary)*
+    unary   := "NOT" unary | "(" query ")" | term
+    term    := NUMBER OP column OP NUMBER      range, e.g. 100 <= rows <= 1000
+             | column OP NUMBER | NUMBER OP column
+             | [KIND] MEASURE OP NUMBER        column statistics, e.g. numeric distinct > 1000
+             | var:WORD | var:"WORDS"          documented variables
+             | TYPE                            has a column of the type, e.g. binary
+    column  := rows | cols | TYPE | n_TYPE     TYPE columns count the columns of the type
+
+A query parses into a tree whose leaves are the (column, operator, value)
+predicates of search.parse_filter and whose inner nodes are
+("and" | "or" | "not", "of", children). search.predicate_expr compiles a
+tree into one polars expression, evaluated in a single pass over the
+catalog. Parsed trees are cached by query text.
+"""
+
+import re
+from functools import lru_cache
+
+from .index import Predicate
+
+BOOLEAN_NODES = ("and", "or", "not")
+
+# Number of parsed queries kept
+PLAN_CACHE_SIZE = 256
+
+OPERATORS = (">=", "<=", "==", "!=", ">", "<")
+
+# The comparison that holds with its operands swapped
+FLIPPED = {">": "<", "<": ">", ">=": "<=", "<=": ">=", "==": "==", "!=": "!="}
+
+KINDS = ("numeric", "character", "logical")
+MEASURES = ("missing", "distinct", "min", "max")
+
+_token_pattern = re.compile(
+    r'\s*(?:'
+    r'(?P<paren>[()])'
+    r'|(?P<op>>=|<=|==|!=|>|<)'
+    r'|(?P<number>-?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)(?![\w.])'
+    r'|(?P<var>var\s*:\s*(?:"[^"]*"|[^\s()"]+))'
+    r'|(?P<word>[A-Za-z_]\w*)'
+    r')'
+)
+
+# Arguments using any of these are parsed as boolean queries
+_boolean_syntax = re.compile(r'[()"]|\b(?:and|or|not)\b', re.IGNORECASE)
+
+
+def is_boolean_query(text: str) -> bool:
+    """Whether a data_having argument uses parentheses, quotes, AND, OR or NOT"""
+    return bool(_boolean_syntax.search(text))
+
+
+def and_node(children) -> Predicate:
+    return ("and", "of", tuple(children))
+
+
+def tokenize(text: str) -> list[tuple[str, str, int]]:
+    """Split a query into (kind, text, position) tokens"""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _token_pattern.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Invalid query: {text}. Unexpected character at position {position}: {text[position]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind), match.start(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid query: {self.text}. {message}")
+
+    def peek(self, offset: int = 0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None, len(self.text))
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def keyword(self, word: str) -> bool:
+        kind, text, _ = self.peek()
+        if kind == "word" and text.lower() == word:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> Predicate:
+        if not self.tokens:
+            raise self.error("The query is empty")
+        node = self.query()
+        kind, text, position = self.peek()
+        if kind is not None:
+            raise self.error(f"Unexpected {text!r} at position {position}")
+        return node
+
+    def query(self) -> Predicate:
+        children = [self.conjunction()]
+        while self.keyword("or"):
+            children.append(self.conjunction())
+        return children[0] if len(children) == 1 else ("or", "of", tuple(children))
+
+    def conjunction(self) -> Predicate:
+        children = [self.unary()]
+        while True:
+            kind, text, _ = self.peek()
+            if self.keyword("and"):
+                children.append(self.unary())
+            elif kind is None or text == ")" or (kind == "word" and text.lower() == "or"):
+                break
+            else:
+                # Terms written side by side are ANDed
+                children.append(self.unary())
+        return children[0] if len(children) == 1 else and_node(children)
+
+    def unary(self) -> Predicate:
+        if self.keyword("not"):
+            return ("not", "of", (self.unary(),))
+        kind, text, position = self.peek()
+        if text == "(":
+            self.take()
+            node = self.query()
+            if self.take()[1] != ")":
+                raise self.error(f"Missing ')' for the '(' at position {position}")
+            return node
+        return self.term()
+
+    def number(self):
+        kind, text, position = self.take()
+        if kind != "number":
+            raise self.error(f"Expected a number at position {position}")
+        return int(text) if re.fullmatch(r"-?\d+", text) else float(text)
+
+    def operator(self) -> str:
+        kind, text, position = self.take()
+        if kind != "op":
+            raise self.error(f"Expected a comparison operator at position {position}")
+        return text
+
+    def column(self) -> str:
+        from .search import comparison_columns, data_type_columns
+
+        kind, text, position = self.take()
+        name = (text or "").lower()
+        if kind == "word":
+            if name in comparison_columns:
+                return comparison_columns[name]
+            if name in data_type_columns:
+                return data_type_columns[name]
+            if name in data_type_columns.values():
+                return name
+        raise self.error(
+            f"Unknown column name at position {position}: {text!r}. "
+            "Supported: rows, cols and the column types (e.g., numeric, n_numeric)"
+        )
+
+    def term(self) -> Predicate:
+        from .fulltext import tokenize as words
+        from .search import data_type_columns
+
+        kind, text, position = self.peek()
+        if kind is None:
+            raise self.error("The query ends too early")
+        if kind == "var":
+            self.take()
+            terms = words(text.split(":", 1)[1])
+            if not terms:
+                raise self.error(f"Expected words after 'var:' at position {position}")
+            return ("var", "has", " ".join(terms))
+        if kind == "number":
+            # NUMBER OP column [OP NUMBER]
+            low = self.number()
+            low_operator = self.operator()
+            column = self.column()
+            lower = (column, FLIPPED[low_operator], low)
+            if self.peek()[0] != "op":
+                return lower
+            high_operator = self.operator()
+            return and_node([lower, (column, high_operator, self.number())])
+        if kind == "word":
+            name = text.lower()
+            next_text = (self.peek(1)[1] or "").lower()
+            if name in MEASURES or (name in KINDS and next_text in MEASURES):
+                return self.statistic()
+            if name in data_type_columns and self.peek(1)[0] != "op":
+                self.take()
+                return (data_type_columns[name], ">", 0)
+            column = self.column()
+            return (column, self.operator(), self.number())
+        raise self.error(f"Unexpected {text!r} at position {position}")
+
+    def statistic(self) -> Predicate:
+        kind = None
+        if self.peek()[1].lower() in KINDS:
+            kind = self.take()[1].lower()
+        measure = self.take()[1].lower()
+        operator = self.operator()
+        column = ":".join(["stats", kind, measure] if kind else ["stats", measure])
+        return (column, operator, float(self.number()))
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def parse_query(text: str) -> Predicate:
+    """Parse a boolean query into a predicate tree, remembering recent queries"""
+    return _Parser(text.strip()).parse()
+
+
+def flatten_and(predicate: Predicate) -> list[Predicate]:
+    """Return the operands of a top-level AND, or [predicate]"""
+    if predicate[0] == "and":
+        return [leaf for child in predicate[2] for leaf in flatten_and(child)]
+    return [predicate]
@@ -1,75 +1,498 @@
 import polars as pl
 import re
+from collections import OrderedDict
+from functools import reduce
+from operator import and_
+from .index import CatalogIndex, Predicate
 
 csv_index = "https://raw.githubusercontent.com/vincentarelbundock/Rdatasets/master/datasets.csv"
-rdatasets = pl.read_csv(csv_index)
 
-def data_having(*args):
+# The catalog is loaded on first access, not at import time
+_catalog: pl.DataFrame | None = None
+_index: CatalogIndex | None = None
+_fulltext = None
+_variables = None
+_stats = None
+_database = None
+# Whether _catalog was read from the SQLite database rather than injected
+_catalog_from_database = False
+
+def load_catalog() -> pl.DataFrame:
+    """
+    Read the dataset catalog from the index cache, or from the local mirror
+    if RDATASETS_MIRROR is set.
+    """
+    from .mirror import load_catalog, mirror_dir
+    if mirror_dir() is not None:
+        return load_catalog(csv_index)
+    from .cache import load_index
+    return load_index(csv_index)
+
+def get_catalog() -> pl.DataFrame:
+    """
+    Return the dataset catalog, loading it on first use (from the SQLite
+    database, with RDATASETS_BACKEND=sqlite).
+    """
+    global _catalog_from_database
+    if _catalog is None:
+        if use_database():
+            set_catalog(get_database().catalog())
+            _catalog_from_database = True
+        else:
+            set_catalog(load_catalog())
+    return _catalog
+
+def get_database():
+    """
+    Return the SQLite catalog, building or refreshing it from the index
+    cache when needed.
+    """
+    global _database
+    if _database is None:
+        from .database import open_database
+        _database = open_database(load_catalog)
+    return _database
+
+def use_database() -> bool:
+    """
+    Whether queries go to the SQLite catalog: RDATASETS_BACKEND=sqlite and
+    no catalog was installed with set_catalog().
+    """
+    from .database import backend
+    return backend() == "sqlite" and (_catalog is None or _catalog_from_database)
+
+def get_index() -> CatalogIndex:
+    """
+    Return the secondary indexes built when the catalog was loaded.
+    """
+    get_catalog()
+    return _index
+
+def set_catalog(df: pl.DataFrame | None) -> None:
+    """
+    Replace the dataset catalog, e.g. with a local or synthetic one.
+    Passing None makes the next access load the index again.
+    """
+    global _catalog, _index, _fulltext, _database, _catalog_from_database
+    _catalog = df
+    _catalog_from_database = False
+    if df is None and _database is not None:
+        _database.close()
+        _database = None
+    _index = CatalogIndex(df) if df is not None else None
+    _fulltext = None
+    clear_query_cache()
+
+def get_fulltext_index():
+    """
+    Return the full-text index of the catalog, loading the persisted one or
+    building it on first use.
+    """
+    global _fulltext
+    catalog = get_catalog()
+    if _fulltext is None:
+        from .fulltext import load_or_build
+        _fulltext = load_or_build(catalog)
+    return _fulltext
+
+def get_variable_index():
+    """
+    Return the persisted index of documented variables.
+    Raises ValueError if it has not been built yet.
+    """
+    global _variables
+    if _variables is None:
+        from .variables import load
+        _variables = load()
+        if _variables is None:
+            raise ValueError("The variable index has not been built yet. Run 'r-data index-variables' first")
+    return _variables
+
+def set_variable_index(index) -> None:
+    """
+    Replace the variable index, e.g. after rebuilding it.
+    Passing None makes the next access load the persisted one again.
+    """
+    global _variables
+    _variables = index
+    clear_query_cache()
+
+def get_stats_index():
+    """
+    Return the statistics catalog built by profiling the datasets.
+    Raises ValueError if it has not been built yet.
+    """
+    global _stats
+    if _stats is None:
+        from .profiling import StatsIndex, load
+        stats = load()
+        if stats is None:
+            raise ValueError("The statistics catalog has not been built yet. Run 'r-data profile' first")
+        _stats = StatsIndex(stats)
+    return _stats
+
+def set_stats_index(index) -> None:
+    """
+    Replace the statistics index, e.g. after profiling again.
+    Passing None makes the next access load the persisted one again.
+    """
+    global _stats
+    _stats = index
+    clear_query_cache()
+
+def __getattr__(name):
+    # Keep `search.rdatasets` working as a lazily loaded attribute
+    if name == "rdatasets":
+        return get_catalog()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Define mapping for data type arguments to column names
+data_type_columns = {
+    'binary': 'n_binary',
+    'character': 'n_character', 
+    'factor': 'n_factor',
+    'logical': 'n_logical',
+    'numeric': 'n_numeric'
+}
+
+# Define mapping for comparison column names
+comparison_columns = {
+    'rows': 'Rows',
+    'cols': 'Cols'
+}
+
+# Pattern: column_name operator value
+# Supports: >, <, >=, <=, ==, !=
+comparison_pattern = re.compile(r'(\w+)\s*(>=|<=|==|!=|>|<)\s*(-?\d+)')
+
+# Pattern: var: words (documented variable names and descriptions)
+variable_pattern = re.compile(r'var\s*:\s*(.*)', re.IGNORECASE)
+
+# Pattern: [kind] measure operator value, answered from the statistics catalog
+# e.g. "missing > 20" (percent), "numeric distinct > 1000", "numeric max >= 1e6"
+stats_pattern = re.compile(
+    r'(?:(numeric|character|logical)\s+)?(missing|distinct|min|max)\s*(>=|<=|==|!=|>|<)\s*'
+    r'(-?(?:\d+(?:\.\d*)?|\.\d+)(?:e[+-]?\d+)?)',
+    re.IGNORECASE,
+)
+
+def parse_filter(arg: str) -> Predicate:
+    """
+    Parse a single data_having argument into a normalized predicate.
+
+    Data type names become ('n_<type>', '>', 0), comparisons are mapped to
+    their catalog column, "var: words" becomes ('var', 'has', 'words') and
+    column statistics such as "numeric distinct > 1000" become
+    ('stats:numeric:distinct', '>', 1000.0). Names are case-insensitive.
+
+    Boolean queries such as "binary OR (factor AND rows > 100)",
+    "100 <= rows <= 1000" or "numeric >= 3" become a predicate tree (see
+    query.parse_query).
+    """
+    from .query import is_boolean_query, parse_query
+
+    arg = arg.strip()
+    
+    # "var: a and b" searches for the words; quote them inside a boolean query
+    if is_boolean_query(arg) and not (variable_pattern.fullmatch(arg) and '"' not in arg):
+        return parse_query(arg)
+    
+    try:
+        return _parse_simple_filter(arg)
+    except ValueError:
+        # Comparisons of type counts and ranges, e.g. "numeric >= 3", "100 <= rows"
+        try:
+            return parse_query(arg)
+        except ValueError:
+            pass
+        raise
+
+def _parse_simple_filter(arg: str) -> Predicate:
+    # Check if it's a data type filter
+    if arg.lower() in data_type_columns:
+        return (data_type_columns[arg.lower()], '>', 0)
+    
+    # Check if it's a variable filter
+    match = variable_pattern.fullmatch(arg)
+    if match:
+        from .fulltext import tokenize
+        terms = tokenize(match.group(1))
+        if not terms:
+            raise ValueError(f"Invalid argument format: {arg}. Expected a variable name or words after 'var:' (e.g., 'var: income')")
+        return ('var', 'has', ' '.join(terms))
+    
+    # Check if it's a column statistics filter
+    match = stats_pattern.fullmatch(arg)
+    if match:
+        kind, measure, operator, value_str = match.groups()
+        column = ':'.join(['stats', kind.lower(), measure.lower()] if kind else ['stats', measure.lower()])
+        return (column, operator, float(value_str))
+    
+    match = comparison_pattern.fullmatch(arg)
+    if not match:
+        raise ValueError(f"Invalid argument format: {arg}. Expected format: 'column operator value' (e.g., 'rows > 100') or data type name (e.g., 'binary')")
+    
+    col_name_key, operator, value_str = match.groups()
+    
+    # Map to actual column name (case insensitive)
+    if col_name_key.lower() not in comparison_columns:
+        raise ValueError(f"Unknown column name: {col_name_key}. Supported: rows, cols")
+    
+    return (comparison_columns[col_name_key.lower()], operator, int(value_str))
+
+def comparison(column: pl.Expr, operator: str, value) -> pl.Expr:
+    """Build `column operator value` as a polars expression"""
+    if operator == '>':
+        return column > value
+    elif operator == '<':
+        return column < value
+    elif operator == '>=':
+        return column >= value
+    elif operator == '<=':
+        return column <= value
+    elif operator == '==':
+        return column == value
+    elif operator == '!=':
+        return column != value
+    raise ValueError(f"Unknown operator: {operator}")
+
+def predicate_expr(predicate: Predicate) -> pl.Expr:
+    """
+    Build the polars expression for a parsed predicate.
+    A boolean query tree becomes one expression, evaluated in a single pass.
+    """
+    col_name, operator, value = predicate
+    if col_name in ('and', 'or', 'not'):
+        children = [predicate_expr(child) for child in value]
+        if col_name == 'not':
+            return ~children[0]
+        return pl.all_horizontal(children) if col_name == 'and' else pl.any_horizontal(children)
+    dataset = pl.concat_str([pl.col("Package"), pl.col("Item")], separator="/")
+    if col_name == 'var':
+        # Datasets whose documented variables mention every word
+        keys = get_variable_index().datasets_matching(value)
+        return dataset.is_in(sorted(keys))
+    if col_name.startswith('stats:'):
+        # Datasets with a column whose statistics match
+        *kind, measure = col_name.split(':')[1:]
+        keys = get_stats_index().datasets_matching(kind[0] if kind else None, measure, operator, value)
+        return dataset.is_in(sorted(keys))
+    return comparison(pl.col(col_name), operator, value)
+
+def query_key(*args) -> frozenset[Predicate]:
+    """
+    Normalize query arguments into an order-independent, case-folded key.
+    The operands of a top-level AND are separate predicates, so
+    "binary AND rows > 100" shares cached results with binary "rows > 100".
+    """
+    from .query import flatten_and
+    return frozenset(p for arg in args for p in flatten_and(parse_filter(arg)))
+
+# LRU cache of query results, keyed by query_key(); cleared when the catalog changes
+QUERY_CACHE_SIZE = 128
+_query_cache: OrderedDict[frozenset[Predicate], pl.DataFrame] = OrderedDict()
+
+def clear_query_cache() -> None:
+    """Drop all memoized data_having results"""
+    _query_cache.clear()
+
+def _closest_cached(key: frozenset[Predicate]) -> tuple[frozenset[Predicate], pl.DataFrame] | None:
+    """Return the smallest cached result whose predicates are a subset of key"""
+    best = None
+    for cached_key, cached_df in _query_cache.items():
+        if cached_key <= key and (best is None or len(cached_df) < len(best[1])):
+            best = (cached_key, cached_df)
+    return best
+
+# Sort keys accepted by data_having(sort=...), besides the n_* columns and
+# the data type names; ties keep catalog order
+sort_columns = {
+    'rows': ['Rows'],
+    'cols': ['Cols'],
+    'package': ['Package', 'Item'],
+    'item': ['Item'],
+}
+
+def sort_by(name: str) -> list[str]:
+    """Return the columns a sort key orders by (case-insensitive)"""
+    name = name.strip().lower()
+    if name in sort_columns:
+        return sort_columns[name]
+    if name in data_type_columns:
+        return [data_type_columns[name]]
+    if name in data_type_columns.values():
+        return [name]
+    raise ValueError(f"Unknown sort column: {name}. Supported: rows, cols, package, item, a data type or n_<type>")
+
+def top_k(df: pl.DataFrame, by: list[str], k: int, descending: bool = False) -> pl.DataFrame:
+    """
+    Return the first k rows of df in the order of a stable sort by the
+    columns in by, without sorting df: the k-th value of the first column
+    bounds the candidates, and only those are sorted. Nulls sort last.
+    """
+    first = pl.col(by[0])
+    kth = df.select((first.top_k(k).min() if descending else first.bottom_k(k).max())).item()
+    if kth is None:
+        candidates = df.head(0)
+    else:
+        candidates = df.filter(first >= kth if descending else first <= kth)
+    result = candidates.sort(by, descending=descending, nulls_last=True, maintain_order=True).head(k)
+    if len(result) < k:
+        # Rows with no first key come last, ordered by the other keys
+        nulls = df.filter(first.is_null()).sort(by, descending=descending, nulls_last=True, maintain_order=True)
+        result = pl.concat([result, nulls.head(k - len(result))])
+    return result
+
+def order_results(df: pl.DataFrame, sort: str | None = None, descending: bool = False,
+                  limit: int | None = None, lazy: bool = False) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Sort df by a sort key (see sort_by) and keep the first limit rows.
+
+    With a limit, the rows are chosen by top_k instead of a full sort. With
+    lazy=True and no limit, the sort is returned as a LazyFrame, so that
+    collecting a slice of it (a page) sorts only as far as that slice.
+    """
+    if limit is not None and limit < 0:
+        raise ValueError(f"Invalid limit: {limit}. Expected a number of datasets >= 0")
+    if sort is None:
+        return df if limit is None else df.head(limit)
+    by = sort_by(sort)
+    if limit is not None:
+        return top_k(df, by, limit, descending)
+    ordered = df.lazy().sort(by, descending=descending, nulls_last=True, maintain_order=True)
+    return ordered if lazy else ordered.collect()
+
+def data_having(*args, sort: str | None = None, descending: bool = False, limit: int | None = None):
     """
     Allowed arguments:
       - binary, character, factor, logical, numeric
       - rows > 100, cols == 5, etc.
+      - var: income (needs the variable index, see variables.build)
+      - missing > 20, numeric distinct > 1000, etc. (needs the statistics
+        catalog, see profiling.build)
+      - boolean queries: binary OR factor, NOT (rows > 1000),
+        100 <= rows <= 1000, numeric >= 3 (see query)
 
     Filters with the given query arguments and returns the subset.
+
+    Results are in catalog order, or sorted by sort (rows, cols, package,
+    item, a data type or an n_* column), descending if asked. limit keeps
+    the first rows only, e.g. the 20 largest datasets with factors:
+
+        data_having("factor", sort="rows", descending=True, limit=20)
+
+    Results are memoized. A query that refines a cached one (e.g. binary
+    "rows > 100" after binary) only filters the cached subset.
     """
+    if sort is not None or limit is not None:
+        return order_results(data_having(*args), sort, descending, limit)
     
-    # Start with the full dataset
-    filtered_data = rdatasets
+    key = query_key(*args)
     
-    # Define mapping for data type arguments to column names
-    data_type_columns = {
-        'binary': 'n_binary',
-        'character': 'n_character', 
-        'factor': 'n_factor',
-        'logical': 'n_logical',
-        'numeric': 'n_numeric'
-    }
+    if key in _query_cache:
+        _query_cache.move_to_end(key)
+        return _query_cache[key]
     
-    # Define mapping for comparison column names
-    comparison_columns = {
-        'rows': 'Rows',
-        'cols': 'Cols'
-    }
+    # Start from the closest cached subset, or answer from the catalog indexes
+    base = _closest_cached(key)
+    if base is None and use_database():
+        # One indexed SQL query over the on-disk catalog
+        filtered_data = get_database().filter(sorted(key))
+    elif base is None:
+        filtered_data = get_index().filter(sorted(key))
+    else:
+        base_key, filtered_data = base
+        remaining = sorted(key - base_key)
+        if remaining:
+            filtered_data = filtered_data.filter(*[predicate_expr(p) for p in remaining])
     
-    for arg in args:
-        arg = arg.strip()
+    _query_cache[key] = filtered_data
+    if len(_query_cache) > QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+    
+    return filtered_data
+
+def data_having_many(queries):
+    """
+    Evaluate many data_having queries at once.
+
+    Each query is a sequence of data_having arguments, e.g.
+    [("binary",), ("binary", "rows > 100"), ("numeric", "cols == 5")].
+
+    Every distinct predicate is evaluated once against the catalog indexes,
+    and the resulting bitmaps are combined per query.
+    Returns one DataFrame per query, in order.
+    """
+    keys = [query_key(*query) for query in queries]
+    
+    # Predicates needed by queries that are not memoized yet
+    missing = [key for key in keys if key not in _query_cache]
+    predicates = sorted(set().union(*missing)) if missing else []
+    
+    if missing and use_database():
+        database = get_database()
+        for key in dict.fromkeys(missing):
+            _query_cache[key] = database.filter(sorted(key))
+    elif missing:
+        index = get_index()
+        catalog = index.catalog
+        mask_of = {p: index.mask(p) for p in predicates}
         
-        # Check if it's a data type filter
-        if arg.lower() in data_type_columns:
-            col_name = data_type_columns[arg.lower()]
-            filtered_data = filtered_data.filter(pl.col(col_name) > 0)
-            
-        else:
-            # Parse comparison expression
-            # Pattern: column_name operator value
-            # Supports: >, <, >=, <=, ==, !=
-            pattern = r'(\w+)\s*(>=|<=|==|!=|>|<)\s*(-?\d+)'
-            match = re.match(pattern, arg)
-            
-            if match:
-                col_name_key, operator, value_str = match.groups()
-                
-                # Map to actual column name (case insensitive)
-                if col_name_key.lower() in comparison_columns:
-                    actual_col_name = comparison_columns[col_name_key.lower()]
-                    value = int(value_str)
-                    
-                    # Apply the filter based on operator
-                    if operator == '>':
-                        filtered_data = filtered_data.filter(pl.col(actual_col_name) > value)
-                    elif operator == '<':
-                        filtered_data = filtered_data.filter(pl.col(actual_col_name) < value)
-                    elif operator == '>=':
-                        filtered_data = filtered_data.filter(pl.col(actual_col_name) >= value)
-                    elif operator == '<=':
-                        filtered_data = filtered_data.filter(pl.col(actual_col_name) <= value)
-                    elif operator == '==':
-                        filtered_data = filtered_data.filter(pl.col(actual_col_name) == value)
-                    elif operator == '!=':
-                        filtered_data = filtered_data.filter(pl.col(actual_col_name) != value)
-                else:
-                    raise ValueError(f"Unknown column name: {col_name_key}. Supported: rows, cols")
+        for key in dict.fromkeys(missing):
+            if key:
+                mask = reduce(and_, (mask_of[p] for p in sorted(key)))
+                _query_cache[key] = catalog.filter(mask)
             else:
-                raise ValueError(f"Invalid argument format: {arg}. Expected format: 'column operator value' (e.g., 'rows > 100') or data type name (e.g., 'binary')")
+                _query_cache[key] = catalog
     
-    return filtered_data
+    results = []
+    for key in keys:
+        _query_cache.move_to_end(key)
+        results.append(_query_cache[key])
+    
+    while len(_query_cache) > QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+    
+    return results
+
+def data_lookup(name: str) -> dict:
+    """
+    Return the catalog row of a dataset as a dict, e.g.
+    data_lookup("MASS/Boston")["CSV"].
+
+    name is "PACKAGE/ITEM", or ITEM alone if only one package has it; case
+    does not matter. Exact names are a hash lookup. Raises
+    lookup.UnknownDataset (a ValueError) listing the closest names if no
+    dataset has the name.
+    """
+    index = get_index()
+    return index.catalog.row(index.lookup(name.strip()), named=True)
+
+def data_search(query: str, *filters, limit: int | None = None) -> pl.DataFrame:
+    """
+    Search Package, Item and Title for the words in query.
+
+    Results are ranked by relevance (BM25) and returned with a Score column,
+    best match first. Optional data_having arguments (e.g. "binary",
+    "rows > 100") restrict the matches, and limit keeps the best ones.
+    With RDATASETS_BACKEND=sqlite the search runs on the database's FTS5
+    table, whose scores are on a different scale.
+    """
+    if limit is not None and limit < 0:
+        raise ValueError(f"Invalid limit: {limit}. Expected a number of datasets >= 0")
+    predicates = sorted(query_key(*filters))
+    if use_database():
+        return get_database().search(query, predicates, limit=limit)
+    catalog = get_catalog()
+    hits = get_fulltext_index().search(query, limit=None if predicates else limit)
+
+    if predicates:
+        mask = get_index().mask_all(predicates)
+        hits = [(row, score) for row, score in hits if mask[row]]
+        if limit is not None:
+            hits = hits[:limit]
+    
+    rows = [row for row, _ in hits]
+    return catalog.select(pl.all().gather(rows)).with_columns(
+        pl.Series("Score", [score for _, score in hits], dtype=pl.Float64)
+    )
@@ -0,0 +1,178 @@
+"""
+Managed local store of datasets as compressed Parquet files.
+
+load(package, item) returns a polars LazyFrame over the stored file, so
+filters and column selections are pushed down into the Parquet reader. A
+dataset missing from the store is downloaded once (from the mirror, if one
+is configured), parsed with full-file type inference and written as
+zstd-compressed Parquet; later loads never parse the CSV again.
+
+Files are stored as <store>/<Package>/<Item>.parquet.
+
+Environment variables:
+  - RDATASETS_STORE_DIR: store directory (default: <cache directory>/store)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+PARQUET_COMPRESSION = "zstd"
+
+# Rdatasets writes missing values as NA
+NULL_VALUES = ["NA"]
+
+
+def store_dir() -> Path:
+    """Return the store directory, honouring RDATASETS_STORE_DIR"""
+    override = os.environ.get("RDATASETS_STORE_DIR")
+    if override:
+        return Path(override).expanduser()
+    from .cache import cache_dir
+    return cache_dir() / "store"
+
+
+def _check_name(name: str) -> str:
+    if not name or name in (".", "..") or "/" in name or "\\" in name:
+        raise ValueError(f"Invalid dataset name: {name!r}")
+    return name
+
+
+def path_for(package: str, item: str, directory: Path | None = None) -> Path:
+    """Return where a dataset is stored; the file may not exist"""
+    if directory is None:
+        directory = store_dir()
+    return directory / _check_name(package) / f"{_check_name(item)}.parquet"
+
+
+def convert_csv(csv_path: str | Path, dest: str | Path) -> Path:
+    """
+    Convert a CSV file to compressed Parquet at dest, streaming it so that
+    large files are not held in memory. Column types are inferred from the
+    whole file.
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    from .cache import temp_path
+
+    tmp = temp_path(dest)
+    try:
+        (
+            pl.scan_csv(csv_path, infer_schema_length=None, null_values=NULL_VALUES)
+            .sink_parquet(tmp, compression=PARQUET_COMPRESSION)
+        )
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return dest
+
+
+def csv_url(package: str, item: str) -> str:
+    """Return the CSV URL of a dataset from the catalog"""
+    from .lookup import UnknownDataset
+    from .search import get_index
+    from .variables import dataset_key
+
+    index = get_index()
+    name = dataset_key(package, item)
+    row = index.rows_by_name.get(name)
+    if row is None:
+        raise UnknownDataset(name, index.name_index().suggest(name))
+    return index.catalog["CSV"][row]
+
+
+def add(package: str, item: str, url: str | None = None, *, refresh: bool = False, directory: Path | None = None,
+        session=None) -> Path:
+    """
+    Download a dataset into the store unless it is already there, and
+    return its Parquet path. url defaults to the catalog's CSV URL; the
+    download goes through session, by default the shared one.
+    """
+    from .download import part_path, stream_download
+
+    path = path_for(package, item, directory)
+    if path.exists() and not refresh:
+        return path
+    if url is None:
+        url = csv_url(package, item)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    csv_path = path.with_suffix(".csv")
+    # An interrupted download resumes from the .part file
+    stream_download(url, csv_path, session=session)
+    try:
+        convert_csv(csv_path, path)
+    finally:
+        csv_path.unlink(missing_ok=True)
+        part_path(csv_path).unlink(missing_ok=True)
+    return path
+
+
+def add_many(
+    datasets,
+    *,
+    jobs: int = 4,
+    retries: int = 3,
+    backoff: float = 1.0,
+    on_result: Callable[[str, str, Exception | None], None] | None = None,
+) -> dict[str, str]:
+    """
+    Add many (package, item, url) datasets to the store, `jobs` at a time.
+
+    Transient failures are retried `retries` times with exponential backoff,
+    as in download.fetch_many; interrupted transfers resume from their .part
+    file.
+
+    Returns {"Package/Item": "downloaded" | "skipped" | "failed"}; on_result,
+    if given, is called as on_result(name, status, error) as datasets finish.
+    """
+    from . import net
+    from .download import retrying
+
+    session = net.create_session(pool_size=max(1, jobs), retries=0)
+
+    def add_one(package: str, item: str, url: str) -> str:
+        if path_for(package, item).exists():
+            return "skipped"
+        retrying(lambda: add(package, item, url, session=session), retries, backoff)
+        return "downloaded"
+
+    results: dict[str, str] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = {
+                executor.submit(add_one, package, item, url): f"{package}/{item}"
+                for package, item, url in datasets
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                error = future.exception()
+                results[name] = "failed" if error else future.result()
+                if on_result:
+                    on_result(name, results[name], error)
+    finally:
+        session.close()
+    return results
+
+
+def load(package: str, item: str, *, refresh: bool = False) -> pl.LazyFrame:
+    """
+    Return a dataset as a LazyFrame, downloading it into the store first
+    if needed.
+
+    Example:
+        load("AER", "Affairs").filter(pl.col("age") > 30).select("affairs").collect()
+    """
+    return pl.scan_parquet(add(package, item, refresh=refresh))
+
+
+def remove(package: str, item: str) -> bool:
+    """Delete a stored dataset; return whether it was stored"""
+    path = path_for(package, item)
+    if not path.exists():
+        return False
+    path.unlink()
+    return True
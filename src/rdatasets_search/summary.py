@@ -0,0 +1,126 @@
+"""
+Summary statistics of a set of datasets, e.g. the result of data_having.
+
+summarize() describes the datasets with
+  - an overview: number of datasets and packages, and the total, mean and
+    quantiles of Rows and Cols
+  - the column types: how many datasets have each type, and how many
+    columns of it there are
+  - the type mixes: how many datasets have each combination of types
+  - the packages with the most datasets
+  - the largest datasets by number of rows
+
+Every part is a query over the same LazyFrame; they are collected together
+with pl.collect_all, so polars reads the input once and runs the
+aggregations in parallel.
+"""
+
+from typing import NamedTuple
+
+import polars as pl
+
+QUANTILES = {"p25": 0.25, "median": 0.5, "p75": 0.75, "p90": 0.9, "p99": 0.99}
+
+# Label of datasets with no column of any counted type
+NO_TYPES = "(none)"
+
+
+class CatalogSummary(NamedTuple):
+    overview: dict
+    types: pl.DataFrame
+    mixes: pl.DataFrame
+    packages: pl.DataFrame
+    largest: pl.DataFrame
+
+    def to_dict(self) -> dict:
+        """Return the summary as plain Python values, e.g. for JSON output"""
+        return {
+            "overview": self.overview,
+            "types": self.types.to_dicts(),
+            "type_mixes": self.mixes.to_dicts(),
+            "packages": self.packages.to_dicts(),
+            "largest": self.largest.to_dicts(),
+        }
+
+
+def _distribution(column: str) -> list[pl.Expr]:
+    col = pl.col(column)
+    exprs = [
+        col.sum().alias(f"{column}:total"),
+        col.mean().alias(f"{column}:mean"),
+        col.min().alias(f"{column}:min"),
+    ]
+    exprs += [col.quantile(q, interpolation="nearest").alias(f"{column}:{name}") for name, q in QUANTILES.items()]
+    exprs.append(col.max().alias(f"{column}:max"))
+    return exprs
+
+
+def summarize(df: pl.DataFrame, top: int = 10) -> CatalogSummary:
+    """Summarize the datasets in df, listing `top` packages and datasets"""
+    from .search import data_type_columns
+
+    types = {name: column for name, column in data_type_columns.items() if column in df.columns}
+    lazy = df.lazy()
+
+    overview = lazy.select([
+        pl.len().alias("datasets"),
+        pl.col("Package").n_unique().alias("packages"),
+        *_distribution("Rows"),
+        *_distribution("Cols"),
+    ])
+    type_counts = lazy.select([
+        expr
+        for name, column in types.items()
+        for expr in (
+            (pl.col(column) > 0).sum().alias(f"{name}:datasets"),
+            pl.col(column).sum().alias(f"{name}:columns"),
+        )
+    ])
+    mix = pl.concat_str(
+        [pl.when(pl.col(column) > 0).then(pl.lit(name)) for name, column in types.items()],
+        separator="+",
+        ignore_nulls=True,
+    )
+    mixes = (
+        lazy.group_by(mix.alias("mix"))
+        .agg(pl.len().alias("datasets"))
+        .with_columns(pl.col("mix").replace("", NO_TYPES).fill_null(NO_TYPES))
+        .sort(["datasets", "mix"], descending=[True, False])
+    )
+    packages = (
+        lazy.group_by("Package")
+        .agg(
+            pl.len().alias("datasets"),
+            pl.col("Rows").sum().alias("rows"),
+            pl.col("Cols").sum().alias("cols"),
+        )
+        .sort(["datasets", "rows", "Package"], descending=[True, True, False])
+        .head(top)
+    )
+    largest = (
+        lazy.select(["Package", "Item", "Rows", "Cols"])
+        .top_k(top, by=["Rows", "Cols"])
+        .sort(["Rows", "Cols", "Package", "Item"], descending=[True, True, False, False])
+    )
+
+    overview_df, type_df, mixes_df, packages_df, largest_df = pl.collect_all(
+        [overview, type_counts, mixes, packages, largest]
+    )
+
+    measures = overview_df.row(0, named=True)
+    summary = {"datasets": measures["datasets"], "packages": measures["packages"]}
+    for column in ("Rows", "Cols"):
+        summary[column.lower()] = {
+            key.split(":")[1]: value for key, value in measures.items() if key.startswith(f"{column}:")
+        }
+
+    counts = type_df.row(0, named=True) if types else {}
+    type_rows = pl.DataFrame(
+        {
+            "type": list(types),
+            "datasets": [counts.get(f"{name}:datasets") or 0 for name in types],
+            "columns": [counts.get(f"{name}:columns") or 0 for name in types],
+        },
+        schema={"type": pl.String, "datasets": pl.Int64, "columns": pl.Int64},
+    )
+    return CatalogSummary(summary, type_rows, mixes_df, packages_df, largest_df)
@@ -0,0 +1,150 @@
+"""
+Offline index of the variables documented for every dataset.
+
+The variable names and descriptions listed in each documentation page are
+collected once by build(), which fetches and parses the pages in parallel,
+and stored as an inverted index from terms to datasets. Queries such as
+having "var: income" are then answered without any network access.
+
+The index is pickled in the cache directory. Datasets are keyed by
+"Package/Item", so the index survives catalog updates; rebuilding only
+fetches the pages of datasets that are not indexed yet.
+"""
+
+import pickle
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+from .fulltext import tokenize
+
+INDEX_NAME = "variables.pickle"
+
+# Bump when the pickled layout changes
+FORMAT_VERSION = 1
+
+
+def dataset_key(package: str, item: str) -> str:
+    """Return the key identifying a dataset in the variable index"""
+    return f"{package}/{item}"
+
+
+class VariableIndex:
+    """Inverted index from variable name and description terms to datasets"""
+
+    def __init__(self, variables: dict[str, list[tuple[str, str]]]):
+        # dataset key -> [(variable name, description)]
+        self.variables = variables
+        self.postings: dict[str, set[str]] = defaultdict(set)
+        for key, entries in variables.items():
+            for name, description in entries:
+                for term in tokenize(name) + tokenize(description):
+                    self.postings[term].add(key)
+        self.postings = dict(self.postings)
+
+    def __len__(self) -> int:
+        return len(self.variables)
+
+    def datasets_matching(self, query: str) -> set[str]:
+        """
+        Return the keys of the datasets whose variable names or descriptions
+        contain every term of query.
+        """
+        terms = tokenize(query)
+        if not terms:
+            raise ValueError("Empty variable query. Expected e.g. 'var: income'")
+        keys = None
+        for term in sorted(set(terms), key=lambda t: len(self.postings.get(t, ()))):
+            matching = self.postings.get(term, set())
+            keys = matching if keys is None else keys & matching
+            if not keys:
+                return set()
+        return set(keys)
+
+    def save(self, path: Path) -> None:
+        """Pickle the index to path"""
+        from .cache import temp_path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path(path)
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump((FORMAT_VERSION, self.variables), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp.replace(path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @staticmethod
+    def load(path: Path) -> "VariableIndex | None":
+        """Load a pickled index, or return None if it is missing or outdated"""
+        try:
+            with open(path, "rb") as f:
+                version, variables = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+            return None
+        if version != FORMAT_VERSION:
+            return None
+        return VariableIndex(variables)
+
+
+def index_path(directory: Path | None = None) -> Path:
+    if directory is None:
+        from .cache import cache_dir
+        directory = cache_dir()
+    return directory / INDEX_NAME
+
+
+def load(directory: Path | None = None) -> VariableIndex | None:
+    """Return the persisted variable index, or None if it was never built"""
+    return VariableIndex.load(index_path(directory))
+
+
+def build(
+    catalog,
+    *,
+    jobs: int = 8,
+    rebuild: bool = False,
+    directory: Path | None = None,
+    on_result: Callable[[str, Exception | None], None] | None = None,
+) -> tuple[VariableIndex, list[str]]:
+    """
+    Index the documented variables of every dataset in catalog and persist
+    the index. Returns the index and the keys whose page could not be read.
+
+    Datasets already in the persisted index are kept without fetching their
+    page again, unless rebuild is set. Pages are fetched and parsed by `jobs`
+    worker threads; on_result(key, error) is called as each one finishes.
+    """
+    from .docs import fetch_sections
+
+    path = index_path(directory)
+    previous = None if rebuild else VariableIndex.load(path)
+    variables = dict(previous.variables) if previous is not None else {}
+
+    pending = {
+        dataset_key(row["Package"], row["Item"]): row["Doc"]
+        for row in catalog.select(["Package", "Item", "Doc"]).iter_rows(named=True)
+        if row["Doc"]
+    }
+    pending = {key: url for key, url in pending.items() if key not in variables}
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {executor.submit(fetch_sections, url): key for key, url in pending.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                sections = future.result()
+            except Exception as e:
+                failed.append(key)
+                if on_result is not None:
+                    on_result(key, e)
+                continue
+            variables[key] = list(sections.variables)
+            if on_result is not None:
+                on_result(key, None)
+
+    index = VariableIndex(variables)
+    index.save(path)
+    return index, sorted(failed)
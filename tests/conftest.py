@@ -0,0 +1,117 @@
+"""
+Shared fixtures: a small local catalog, a fake network and a prefetcher
+that does not fetch
+"""
+
+import polars as pl
+import pytest
+import requests
+from rdatasets_search import net, prefetch, search
+
+
+@pytest.fixture
+def small_catalog(tmp_path, monkeypatch):
+    """Install a small in-memory catalog with the datasets.csv schema"""
+    # Keep derived indexes out of the user's cache directory
+    monkeypatch.setenv("RDATASETS_CACHE_DIR", str(tmp_path / "cache"))
+    df = pl.DataFrame({
+        "rownames": [1, 2, 3, 4, 5, 6],
+        "Package": ["AER", "AER", "MASS", "MASS", "datasets", "survival"],
+        "Item": ["Affairs", "CPS1985", "Boston", "survey", "mtcars", "lung"],
+        "Title": [
+            "Fair's Extramarital Affairs Data",
+            "Determinants of Wages Data (CPS 1985)",
+            "Housing Values in Suburbs of Boston",
+            "Student Survey Data",
+            "Motor Trend Car Road Tests",
+            "NCCTG Lung Cancer Data",
+        ],
+        "Rows": [601, 534, 506, 237, 32, 228],
+        "Cols": [9, 11, 14, 12, 11, 10],
+        "n_binary": [2, 3, 1, 2, 2, 1],
+        "n_character": [0, 0, 0, 0, 0, 0],
+        "n_factor": [2, 7, 0, 5, 0, 0],
+        "n_logical": [0, 0, 0, 0, 0, 0],
+        "n_numeric": [7, 4, 14, 7, 11, 10],
+        "CSV": [f"https://example.org/csv/{i}.csv" for i in range(6)],
+        "Doc": [f"https://example.org/doc/{i}.html" for i in range(6)],
+    })
+    previous = search._catalog
+    search.set_catalog(df)
+    yield df
+    search.set_catalog(previous)
+
+
+class FakeResponse:
+    """
+    A response with a status, headers and a body, streamed in chunks that
+    end in a dropped connection once fail_after bytes are sent
+    """
+
+    def __init__(self, content=b"", status_code=200, headers=None, fail_after=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {"Content-Length": str(len(content)), **(headers or {})}
+        self.fail_after = fail_after
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code), response=self)
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise requests.ConnectionError("connection reset")
+            yield self.content[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class FakeNetwork:
+    """
+    Stands in for net.get and net.head. Requests are answered by
+    handler(url, headers), or else by the queued responses in order;
+    exceptions among them are raised. HEAD requests use head_handler(url)
+    if set, else the GET answer.
+    """
+
+    def __init__(self):
+        self.urls: list[str] = []
+        self.calls: list[dict] = []
+        self.responses: list = []
+        self.handler = None
+        self.head_handler = None
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.urls.append(url)
+        self.calls.append(headers)
+        response = self.handler(url, headers) if self.handler else self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def head(self, url, **kwargs):
+        if self.head_handler:
+            return self.head_handler(url)
+        return self.get(url)
+
+
+class NoFetch(prefetch.DocumentationPrefetcher):
+    """A prefetcher that never touches the network"""
+
+    def __init__(self):
+        super().__init__(fetch=lambda url: "")
+
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    """Route net.get and net.head to a FakeNetwork"""
+    network = FakeNetwork()
+    monkeypatch.setattr(net, "get", network.get)
+    monkeypatch.setattr(net, "head", network.head)
+    return network
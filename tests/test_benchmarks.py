@@ -0,0 +1,30 @@
+"""
+Smoke test of the offline benchmark suite
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SUITE = Path(__file__).parent.parent / "benchmarks" / "bench_suite.py"
+
+
+def test_suite_writes_json_results(tmp_path):
+    """Test that a tiny run of the suite works offline and writes comparable results"""
+    output = tmp_path / "results.json"
+    command = [sys.executable, str(SUITE), "--scales", "0.01", "--repeat", "1", "--output", str(output)]
+
+    subprocess.run(command, check=True, capture_output=True, timeout=120)
+    report = json.loads(output.read_text())
+
+    assert report["catalog"] == "synthetic"
+    assert {"python", "polars", "version"} <= report["environment"].keys()
+    benchmarks = {result["benchmark"] for result in report["results"]}
+    assert benchmarks == {"having", "render", "docparse"}
+    assert all(result["best_ms"] >= 0 for result in report["results"])
+    assert all(result["rows"] == 23 for result in report["results"] if result["benchmark"] != "docparse")
+
+    # A second run compares itself with the first
+    compared = subprocess.run(command[:-2] + ["--compare", str(output)], check=True, capture_output=True, text=True, timeout=120)
+    assert "ratio" in compared.stdout
@@ -0,0 +1,73 @@
+"""
+Test the on-disk index cache and its conditional revalidation
+"""
+
+import pytest
+import requests
+from rdatasets_search import cache
+
+from .conftest import FakeResponse
+
+CSV = b"Package,Item,Title,Rows,Cols\nAER,Affairs,Fair's Affairs,601,9\n"
+URL = "https://example.org/datasets.csv"
+
+
+def test_first_load_writes_snapshot(tmp_path, fake_get):
+    """Test that the first load downloads the index and stores a snapshot"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=CSV, headers={"ETag": '"abc"'}))
+
+    df = cache.load_index(URL, ttl=60, directory=tmp_path)
+
+    assert len(df) == 1
+    assert (tmp_path / cache.SNAPSHOT_NAME).exists()
+    assert len(calls) == 1
+
+
+def test_fresh_snapshot_skips_network(tmp_path, fake_get):
+    """Test that a snapshot within the TTL is served without a request"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=CSV))
+    cache.load_index(URL, ttl=60, directory=tmp_path)
+
+    df = cache.load_index(URL, ttl=60, directory=tmp_path)
+
+    assert df["Item"].to_list() == ["Affairs"]
+    assert len(calls) == 1, "Fresh snapshot should not hit the network"
+
+
+def test_stale_snapshot_sends_validators(tmp_path, fake_get):
+    """Test that a stale snapshot is revalidated with ETag and Last-Modified"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=CSV, headers={
+        "ETag": '"abc"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"
+    }))
+    responses.append(FakeResponse(status_code=304))
+    cache.load_index(URL, ttl=0, directory=tmp_path)
+
+    df = cache.load_index(URL, ttl=0, directory=tmp_path)
+
+    assert len(df) == 1
+    assert calls[1]["If-None-Match"] == '"abc"'
+    assert calls[1]["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def test_network_failure_falls_back_to_stale_snapshot(tmp_path, fake_get):
+    """Test that a stale snapshot is used when the network is unavailable"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=CSV))
+    responses.append(requests.ConnectionError("offline"))
+    cache.load_index(URL, ttl=0, directory=tmp_path)
+
+    df = cache.load_index(URL, ttl=0, directory=tmp_path)
+
+    assert len(df) == 1
+
+
+def test_network_failure_without_snapshot_raises(tmp_path, fake_get):
+    """Test that a failed first download is reported"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(requests.ConnectionError("offline"))
+
+    with pytest.raises(requests.ConnectionError):
+        cache.load_index(URL, ttl=60, directory=tmp_path)
@@ -0,0 +1,161 @@
+"""
+Test the resident query daemon and its use by the CLI
+"""
+
+import io
+import json
+import socket
+import threading
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+from rdatasets_search import daemon
+from rdatasets_search.cli import app
+from rdatasets_search.search import data_having
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def server(small_catalog, tmp_path, monkeypatch):
+    """Serve the small catalog from a daemon thread, recording the requests"""
+    path = tmp_path / "daemon.sock"
+    monkeypatch.setenv("RDATASETS_SOCKET", str(path))
+    server = daemon.QueryServer(path)
+    server.requests = []
+    answer = server.answer
+
+    def recording(message):
+        server.requests.append(message)
+        return answer(message)
+
+    server.answer = recording
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_ping(server):
+    """Test that a running daemon is detected"""
+    header, payload = daemon.request("ping")
+
+    assert header["protocol"] == daemon.PROTOCOL
+    assert payload == b""
+    assert daemon.is_running()
+
+
+def test_having_formats(server):
+    """Test that having answers match data_having in every format"""
+    header, payload = daemon.request("having", filters=["binary", "rows > 500"], format="arrow")
+    assert header["rows"] == 3
+    assert pl.read_ipc_stream(io.BytesIO(payload)).equals(data_having("binary", "rows > 500"))
+
+    _, payload = daemon.request("having", filters=["factor"], format="ndjson")
+    assert [json.loads(line)["Item"] for line in payload.splitlines()] == ["Affairs", "CPS1985", "survey"]
+
+    _, payload = daemon.request("having", filters=["binary"], sort="rows", descending=True, limit=2, format="ndjson")
+    assert [json.loads(line)["Item"] for line in payload.splitlines()] == ["Affairs", "CPS1985"]
+
+
+def test_search(server):
+    """Test ranked search through the daemon"""
+    _, payload = daemon.request("search", query="lung cancer", filters=["rows > 100"], limit=1, format="json")
+
+    assert [row["Item"] for row in json.loads(payload)] == ["lung"]
+
+
+def test_show(server):
+    """Test dataset lookup through the daemon, suggestions included"""
+    _, payload = daemon.request("show", name="mass/boston", format="json")
+    assert [row["Item"] for row in json.loads(payload)] == ["Boston"]
+
+    with pytest.raises(ValueError, match="Did you mean: AER/Affairs"):
+        daemon.request("show", name="AER/Afairs")
+
+
+def test_errors(server):
+    """Test that invalid requests are reported without stopping the daemon"""
+    with pytest.raises(ValueError, match="Invalid argument format"):
+        daemon.request("having", filters=["bogus"])
+    with pytest.raises(ValueError, match="Unknown op"):
+        daemon.request("drop")
+    with pytest.raises(ValueError, match="Unknown format"):
+        daemon.request("having", filters=[], format="xml")
+    for op in ("having", "search"):
+        for limit in ("10", -1, True):
+            with pytest.raises(ValueError, match="Invalid limit"):
+                daemon.request(op, query="wage", filters=[], limit=limit)
+    assert daemon.is_running()
+
+
+def test_many_requests_per_connection(server):
+    """Test that one connection carries several requests"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(server.path))
+        stream = sock.makefile("rwb")
+        for message in ([1, 2], {"op": "ping"}, {"op": "having", "filters": ["rows < 100"], "format": "csv"}):
+            stream.write(json.dumps(message).encode() + b"\n")
+        stream.flush()
+
+        answers = []
+        for _ in range(3):
+            header = json.loads(stream.readline())
+            answers.append((header, stream.read(header["length"])))
+
+    assert answers[0][0]["ok"] is False
+    assert answers[1][0]["ok"] is True
+    assert answers[2][1].decode().splitlines()[1].startswith("5,datasets,mtcars")
+
+
+def test_cli_uses_daemon(server, monkeypatch):
+    """Test that having and search are answered by a running daemon"""
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["having", "rows > 500", "--format", "ndjson"])
+    assert result.exit_code == 0
+    assert len(result.stdout.splitlines()) == 3
+
+    monkeypatch.setattr("builtins.input", lambda prompt="": "q")
+    result = runner.invoke(app, ["search", "wage"])
+    assert result.exit_code == 0
+    assert "CPS1985" in result.stdout
+    assert [m["op"] for m in server.requests] == ["having", "search"]
+
+    monkeypatch.setenv("RDATASETS_DAEMON", "off")
+    assert runner.invoke(app, ["having", "binary", "--format", "csv"]).exit_code == 0
+    assert len(server.requests) == 2
+
+
+def test_no_daemon(small_catalog, tmp_path, monkeypatch):
+    """Test that a missing daemon or a stale socket file means answering locally"""
+    path = tmp_path / "daemon.sock"
+    monkeypatch.setenv("RDATASETS_SOCKET", str(path))
+    assert daemon.query("having", filters=[]) is None
+
+    # A socket file nobody listens on
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    assert daemon.query("having", filters=[]) is None
+    assert not daemon.is_running()
+
+
+def test_serve_until_shutdown(small_catalog, tmp_path):
+    """Test that serve() refuses a second daemon and cleans up on shutdown"""
+    path = tmp_path / "daemon.sock"
+    ready = threading.Event()
+    thread = threading.Thread(target=daemon.serve, args=(path,), kwargs={"on_ready": lambda s: ready.set()})
+    thread.start()
+    assert ready.wait(10)
+
+    with pytest.raises(RuntimeError, match="already running"):
+        daemon.serve(path)
+
+    daemon.request("shutdown", path)
+    thread.join(10)
+    assert not thread.is_alive()
+    assert not path.exists()
@@ -0,0 +1,56 @@
+"""
+Test the batch query API data_having_many()
+"""
+
+import pytest
+from rdatasets_search import search
+from rdatasets_search.search import data_having, data_having_many
+
+
+def test_results_match_individual_queries(small_catalog):
+    """Test that each batch result equals the corresponding data_having call"""
+    queries = [
+        ("binary",),
+        ("factor", "rows > 300"),
+        ("numeric", "cols == 11"),
+        (),
+    ]
+    batch = data_having_many(queries)
+    search.clear_query_cache()
+    for query, result in zip(queries, batch):
+        assert result.equals(data_having(*query))
+
+
+def test_results_keep_query_order(small_catalog):
+    """Test that results are returned in query order, duplicates included"""
+    batch = data_having_many([("rows > 500",), ("rows < 100",), ("ROWS>500",)])
+    assert batch[0]["Item"].to_list() == ["Affairs", "CPS1985", "Boston"]
+    assert batch[1]["Item"].to_list() == ["mtcars"]
+    assert batch[2] is batch[0]
+
+
+def test_each_predicate_evaluated_once(small_catalog, monkeypatch):
+    """Test that shared predicates are only evaluated once across queries"""
+    calls = []
+    index = search.get_index()
+    original = index.mask
+
+    def counting(predicate):
+        calls.append(predicate)
+        return original(predicate)
+
+    monkeypatch.setattr(index, "mask", counting)
+    data_having_many([(t, f"rows > {n}") for t in ["binary", "factor"] for n in (100, 500)])
+    assert len(calls) == len(set(calls)) == 4
+
+
+def test_results_are_memoized(small_catalog):
+    """Test that batch results populate the data_having cache"""
+    [result] = data_having_many([("factor", "cols > 10")])
+    assert data_having("cols > 10", "factor") is result
+
+
+def test_invalid_query_raises(small_catalog):
+    """Test that an invalid filter in any query raises ValueError"""
+    with pytest.raises(ValueError, match="Invalid argument format"):
+        data_having_many([("binary",), ("nonsense",)])
@@ -0,0 +1,146 @@
+"""
+Test the SQLite catalog backend against the in-memory one
+"""
+
+import threading
+
+import pytest
+from rdatasets_search import database, search
+from rdatasets_search.database import CatalogDatabase, open_database
+from rdatasets_search.search import data_having, data_having_many, data_search, parse_filter
+from rdatasets_search.variables import VariableIndex
+
+QUERIES = [
+    ["binary"],
+    ["factor", "rows > 300"],
+    ["rows <= 237"],
+    ["cols == 11"],
+    ["numeric", "cols != 11", "rows >= 228"],
+    ["character"],
+]
+
+
+@pytest.fixture
+def sqlite_backend(small_catalog, monkeypatch):
+    """Serve the small catalog from the SQLite backend instead of memory"""
+    monkeypatch.setenv("RDATASETS_BACKEND", "sqlite")
+    monkeypatch.setattr(search, "load_catalog", lambda: small_catalog)
+    search.set_catalog(None)
+    yield small_catalog
+    search.set_catalog(None)
+
+
+@pytest.mark.parametrize("filters", QUERIES, ids=" & ".join)
+def test_filter_matches_polars(small_catalog, tmp_path, filters):
+    """Test that one SQL query returns the same rows, in order, as the polars filter"""
+    path = tmp_path / "catalog.sqlite"
+    database.build(small_catalog, path)
+    db = CatalogDatabase(path)
+
+    result = db.filter([parse_filter(f) for f in filters])
+
+    assert result.equals(data_having(*filters))
+    assert result.schema == small_catalog.schema
+    db.close()
+
+
+def test_data_having_uses_database(sqlite_backend):
+    """Test that data_having answers from the database without loading the catalog"""
+    result = data_having("binary", "rows > 500")
+
+    assert result["Item"].to_list() == ["Affairs", "CPS1985", "Boston"]
+    assert search._catalog is None
+    assert [len(df) for df in data_having_many([("factor",), ("rows == 32",)])] == [3, 1]
+
+
+def test_queries_use_indexes(sqlite_backend):
+    """Test that range predicates are answered with the B-tree indexes"""
+    db = search.get_database()
+    where, params = db._where([parse_filter("rows > 500")])
+
+    plan = db.connection.execute(f"EXPLAIN QUERY PLAN SELECT * FROM datasets WHERE {where}", params).fetchall()
+
+    assert any("idx_Rows" in row[-1] for row in plan)
+
+
+def test_search_ranks_with_fts5(sqlite_backend):
+    """Test full-text search, prefix matching of the last word and filters"""
+    result = data_search("lung canc")
+    assert result["Item"].to_list() == ["lung"]
+    assert result["Score"][0] > 0
+
+    # "data" also matches the datasets package as a prefix
+    assert set(data_search("data")["Item"]) == {"Affairs", "CPS1985", "survey", "mtcars", "lung"}
+    assert data_search("data", "rows > 550")["Item"].to_list() == ["Affairs"]
+    assert len(data_search("data", limit=2)) == 2
+    assert len(data_search("")) == 0
+
+
+def test_var_filters(sqlite_backend):
+    """Test that variable filters are compiled to a key lookup"""
+    search.set_variable_index(VariableIndex({"AER/CPS1985": [("wage", "wage in dollars")]}))
+    try:
+        assert data_having("var: wage")["Item"].to_list() == ["CPS1985"]
+    finally:
+        search.set_variable_index(None)
+
+
+def test_injected_catalog_bypasses_database(sqlite_backend, monkeypatch):
+    """Test that a catalog installed with set_catalog is queried in memory"""
+    monkeypatch.setattr(search, "get_database", lambda: pytest.fail("database opened"))
+    search.set_catalog(sqlite_backend.head(2))
+
+    assert len(data_having("binary")) == 2
+
+
+def test_rebuilt_only_when_catalog_changes(small_catalog, tmp_path, monkeypatch):
+    """Test that a stale database is revalidated and rebuilt only on changes"""
+    db = open_database(lambda: small_catalog, directory=tmp_path)
+    fingerprint = db.fingerprint
+    db.close()
+
+    build = database.build
+    monkeypatch.setattr(database, "build", lambda *args: pytest.fail("rebuilt"))
+    db = open_database(lambda: small_catalog, directory=tmp_path, ttl=0)
+    assert db.fingerprint == fingerprint
+    db.close()
+
+    monkeypatch.setattr(database, "build", build)
+    changed = small_catalog.head(3)
+    db = open_database(lambda: changed, directory=tmp_path, ttl=0)
+    assert len(db.catalog()) == 3
+    db.close()
+
+
+def test_fresh_database_skips_loading(small_catalog, tmp_path):
+    """Test that a database younger than the TTL is opened without loading the catalog"""
+    open_database(lambda: small_catalog, directory=tmp_path).close()
+
+    db = open_database(lambda: pytest.fail("catalog loaded"), directory=tmp_path, ttl=3600)
+
+    assert db.catalog().equals(small_catalog)
+    db.close()
+
+
+def test_invalid_backend(monkeypatch):
+    """Test that an unknown backend name is reported"""
+    monkeypatch.setenv("RDATASETS_BACKEND", "duckdb")
+    with pytest.raises(ValueError, match="Invalid RDATASETS_BACKEND"):
+        database.backend()
+
+
+def test_concurrent_builds_do_not_clash(small_catalog, tmp_path):
+    """Test that builds write their own temporary files and leave others alone"""
+    path = tmp_path / "catalog.sqlite"
+    other = path.with_name(path.name + ".1.2.tmp")
+    other.write_bytes(b"half-built by another process")
+
+    threads = [threading.Thread(target=database.build, args=(small_catalog, path)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert other.read_bytes() == b"half-built by another process"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["catalog.sqlite", other.name]
+    assert CatalogDatabase(path).filter([parse_filter("binary")]).equals(data_having("binary"))
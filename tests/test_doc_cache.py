@@ -0,0 +1,173 @@
+"""
+Test the two-level documentation cache
+"""
+
+import os
+import time
+
+import pytest
+import requests
+from rdatasets_search import docs
+from rdatasets_search.docs import DocumentationCache, fetch_documentation
+
+from .conftest import FakeResponse
+
+URL = "https://example.org/doc/AER/Affairs.html"
+
+HTML = b"""<html><head><title>R: Fair's Extramarital Affairs Data</title></head>
+<body><div class="container">
+<h2>Fair's Extramarital Affairs Data</h2>
+<h3>Description</h3>
+<p>Infidelity data, known as Fair's Affairs.</p>
+<h3>Format</h3>
+<p>A data frame containing 601 observations on 9 variables.</p>
+<dl><dt>affairs</dt><dd><p>numeric. How often engaged in extramarital sexual intercourse.</p></dd>
+<dt>gender</dt><dd><p>factor indicating gender.</p></dd></dl>
+</div></body></html>"""
+
+
+@pytest.fixture
+def doc_cache(tmp_path, monkeypatch):
+    cache = DocumentationCache(tmp_path / "docs")
+    monkeypatch.setattr(docs, "_doc_cache", cache)
+    return cache
+
+
+def test_parse_documentation():
+    """Test that description and variables are extracted"""
+    text = docs.parse_documentation(HTML, URL)
+    assert text.startswith("Title: R: Fair's Extramarital Affairs Data\nURL: ")
+    assert "Infidelity data, known as Fair's Affairs." in text
+    assert "## Variables" in text
+    assert "affairs : numeric. How often" in text
+    assert "gender : factor indicating gender." in text
+
+
+def test_second_fetch_is_served_from_cache(doc_cache, fake_get):
+    """Test that a page is only downloaded once"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=HTML, headers={"ETag": '"v1"'}))
+
+    first = fetch_documentation(URL)
+    second = fetch_documentation(URL)
+
+    assert first == second
+    assert len(calls) == 1
+    assert doc_cache.get_html(URL) == HTML
+
+
+def test_disk_store_survives_new_process(doc_cache, fake_get, tmp_path):
+    """Test that a fresh cache instance reads the stored text from disk"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=HTML))
+    text = fetch_documentation(URL)
+
+    reopened = DocumentationCache(tmp_path / "docs")
+    assert reopened.get_text(URL) == text
+
+
+def test_errors_are_not_cached(doc_cache, fake_get):
+    """Test that a failed fetch is retried on the next call"""
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(requests.ConnectionError("offline"))
+    responses.append(FakeResponse(content=HTML))
+
+    assert fetch_documentation(URL).startswith("Error fetching documentation")
+    assert "Infidelity" in fetch_documentation(URL)
+
+
+def test_ttl_revalidates_with_validators(tmp_path, monkeypatch, fake_get):
+    """Test that stale pages are revalidated and a 304 keeps the stored text"""
+    cache = DocumentationCache(tmp_path / "docs", ttl=0)
+    monkeypatch.setattr(docs, "_doc_cache", cache)
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=HTML, headers={"ETag": '"v1"'}))
+    responses.append(FakeResponse(status_code=304))
+
+    first = fetch_documentation(URL)
+    second = fetch_documentation(URL)
+
+    assert first == second
+    assert calls[1]["If-None-Match"] == '"v1"'
+
+
+def test_stale_page_served_when_offline(tmp_path, monkeypatch, fake_get):
+    """Test that a stale page is better than an error when the network fails"""
+    cache = DocumentationCache(tmp_path / "docs", ttl=0)
+    monkeypatch.setattr(docs, "_doc_cache", cache)
+    calls, responses = fake_get.calls, fake_get.responses
+    responses.append(FakeResponse(content=HTML))
+    responses.append(requests.ConnectionError("offline"))
+
+    first = fetch_documentation(URL)
+    assert fetch_documentation(URL) == first
+
+
+def test_lru_eviction_respects_byte_cap(tmp_path):
+    """Test that the least recently used pages are evicted over the cap"""
+    cache = DocumentationCache(tmp_path / "docs", max_bytes=10_000)
+    page = b"x" * 3000
+    for i in range(3):
+        cache.put(f"https://example.org/{i}", page, "text")
+        # Distinct access times
+        meta = cache._paths(f"https://example.org/{i}")[2]
+        os.utime(meta, (time.time() - 100 + i, time.time() - 100 + i))
+
+    # Reading page 0 makes page 1 the least recently used
+    cache.memory.clear()
+    assert cache.get_text("https://example.org/0") == "text"
+    cache.put("https://example.org/3", page, "text")
+
+    assert cache.size() <= 10_000
+    assert cache.get_html("https://example.org/1") is None
+    assert cache.get_html("https://example.org/0") == page
+    assert cache.get_html("https://example.org/3") == page
+
+
+def test_put_scans_directory_once(tmp_path, monkeypatch):
+    """Test that the stored size is tracked in memory instead of rescanned per page"""
+    DocumentationCache(tmp_path / "docs").put("https://example.org/old", b"x" * 1000, "text")
+    cache = DocumentationCache(tmp_path / "docs", max_bytes=20_000)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for i in range(5):
+        cache.put(f"https://example.org/{i}", b"x" * 1000, "text")
+    cache.put("https://example.org/0", b"x" * 2000, "text")
+    cache.touch("https://example.org/1")
+    assert len(scans) == 1
+    assert cache.total == cache.size()
+
+    # Going over the cap scans again to evict
+    cache.put("https://example.org/big", b"x" * 15_000, "text")
+    assert cache.size() <= 20_000
+    assert cache.total == cache.size()
+
+
+def test_eviction_frees_room_for_several_puts(tmp_path, monkeypatch):
+    """Test that a full store is not rescanned on every put"""
+    cache = DocumentationCache(tmp_path / "docs", max_bytes=20_000)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for i in range(40):
+        cache.put(f"https://example.org/{i}", b"x" * 1000, "text")
+    assert cache.size() <= 20_000
+    # One scan to count, then one per EVICT_TO's worth of pages
+    assert len(scans) < 40 // 2
+
+
+def test_fresh_pages_are_served_from_memory_with_ttl(tmp_path, monkeypatch):
+    """Test that the in-process level is used while a page is fresh"""
+    cache = DocumentationCache(tmp_path / "docs", ttl=60)
+    cache.put(URL, HTML, "text")
+    monkeypatch.setattr(cache, "meta", lambda url: pytest.fail("read from disk"))
+    assert cache.get_text(URL) == "text"
+
+    # A stale copy in memory is only served when allowed; otherwise the disk decides
+    monkeypatch.undo()
+    cache.memory[URL] = ("old text", time.time() - 120)
+    assert cache.get_text(URL, allow_stale=True) == "old text"
+    assert cache.get_text(URL) == "text"
@@ -0,0 +1,69 @@
+"""
+Test the single-pass documentation parser against the BeautifulSoup path
+"""
+
+from pathlib import Path
+
+import pytest
+from rdatasets_search.docparse import UnsupportedLayout, extract_sections
+from rdatasets_search.docs import extract_sections_bs4, format_documentation, parse_documentation
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "docs"
+FIXTURES = sorted(FIXTURE_DIR.glob("*.html"))
+URL = "https://example.org/doc/AER/Affairs.html"
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.name)
+def test_fast_parser_matches_bs4(path):
+    """Test that both parsers extract the same sections from every fixture"""
+    content = path.read_bytes()
+
+    fast = extract_sections(content)
+
+    assert fast == extract_sections_bs4(content)
+    assert format_documentation(fast, URL) == format_documentation(extract_sections_bs4(content), URL)
+
+
+def test_affairs_sections():
+    """Test the sections extracted from a typical Rd2HTML page"""
+    sections = extract_sections((FIXTURE_DIR / "Affairs.html").read_bytes())
+
+    assert sections.title == "R: Fair's Extramarital Affairs Data"
+    assert sections.description[0].startswith("Infidelity data, known as Fair's Affairs.")
+    assert sections.format_description == ["A data frame containing 601 observations on 9 variables."]
+    assert [name for name, _ in sections.variables][:3] == ["affairs", "gender", "age"]
+    assert "4–10 times" in sections.variables[0][1]
+
+
+def test_variables_heading_without_format():
+    """Test that a Variables heading is used when there is no Format heading"""
+    sections = extract_sections((FIXTURE_DIR / "variables_heading.html").read_bytes())
+
+    assert sections.has_format
+    assert sections.variables[0] == ("inst:", "Institution code")
+
+
+@pytest.mark.parametrize("content", [
+    b'<html><body><div id="main"><h3>Description</h3><p>x</p></div></body></html>',
+    b"<html><head><title>R: x</title></head></html>",
+    b"<html><body><h3><em>Description</em></h3><p>x</p></body></html>",
+    "<html><body><h3>Description</h3><p>café</p></body></html>".encode("latin-1"),
+    b'<html><head><meta charset="iso-8859-1"></head><body><p>x</p></body></html>',
+])
+def test_unsupported_layouts_fall_back(content):
+    """Test that pages outside the fast path are rejected and parsed by BeautifulSoup"""
+    with pytest.raises(UnsupportedLayout):
+        extract_sections(content)
+
+    assert parse_documentation(content, URL) == format_documentation(extract_sections_bs4(content), URL)
+
+
+def test_parse_documentation_output():
+    """Test the formatted text of a parsed page"""
+    content = (FIXTURE_DIR / "no_format.html").read_bytes()
+
+    text = parse_documentation(content, URL)
+
+    assert text.startswith(f"Title: R: Boston Housing Values\nURL: {URL}\n\n")
+    assert "has 506 rows and 14 columns." in text
+    assert "## Variables" not in text
@@ -0,0 +1,237 @@
+"""
+Test streaming, resumable downloads with atomic writes
+"""
+
+import hashlib
+
+import pytest
+import requests
+from rdatasets_search import net
+from rdatasets_search.download import ChecksumError, fetch_many, part_path, stream_download
+
+from .conftest import FakeResponse
+
+BODY = b"rownames,x,y\n" + b"".join(f"{i},{i * 2},{i * 3}\n".encode() for i in range(5000))
+URL = "https://example.org/csv/big.csv"
+
+
+@pytest.fixture
+def server(fake_get):
+    """
+    A fake server that honours Range requests conditional on its ETag; can
+    drop the connection once
+    """
+    state = {"requests": [], "fail_after": None, "ranges": True, "body": BODY, "etag": '"v1"'}
+
+    def get(url, headers):
+        state["requests"].append(headers)
+        fail_after, state["fail_after"] = state["fail_after"], None
+        body = state["body"]
+        validators = {"ETag": state["etag"]} if state["etag"] else {}
+        current = headers.get("If-Range") in (None, state["etag"])
+        if "Range" in headers and state["ranges"] and current:
+            start = int(headers["Range"].removeprefix("bytes=").rstrip("-"))
+            if start >= len(body):
+                return FakeResponse(b"", status_code=416, headers={"Content-Range": f"bytes */{len(body)}"})
+            return FakeResponse(body[start:], status_code=206, fail_after=fail_after, headers=validators)
+        return FakeResponse(body, fail_after=fail_after, headers=validators)
+
+    fake_get.handler = get
+    return state
+
+
+def test_download_streams_to_destination(tmp_path, server):
+    """Test that the body is written to dest and no .part file remains"""
+    dest = tmp_path / "big.csv"
+    progress = []
+
+    stream_download(URL, dest, chunk_size=1024, progress=lambda done, total: progress.append((done, total)))
+
+    assert dest.read_bytes() == BODY
+    assert not part_path(dest).exists()
+    assert progress[-1] == (len(BODY), len(BODY))
+    assert len(progress) > 2, "Progress should be reported per chunk"
+
+
+def test_interrupted_download_leaves_no_destination(tmp_path, server):
+    """Test that a failed transfer never leaves a half-written destination"""
+    dest = tmp_path / "big.csv"
+    server["fail_after"] = 10_000
+
+    with pytest.raises(requests.ConnectionError):
+        stream_download(URL, dest, chunk_size=1024)
+
+    assert not dest.exists()
+    assert 0 < part_path(dest).stat().st_size < len(BODY)
+
+
+def test_interrupted_download_resumes_with_range(tmp_path, server):
+    """Test that the next attempt resumes from the partial file"""
+    dest = tmp_path / "big.csv"
+    server["fail_after"] = 10_000
+    with pytest.raises(requests.ConnectionError):
+        stream_download(URL, dest, chunk_size=1024)
+    partial = part_path(dest).stat().st_size
+
+    stream_download(URL, dest, chunk_size=1024)
+
+    assert server["requests"][-1]["Range"] == f"bytes={partial}-"
+    assert server["requests"][-1]["If-Range"] == '"v1"'
+    assert dest.read_bytes() == BODY
+    assert list(tmp_path.iterdir()) == [dest]
+
+
+def interrupt(dest, server):
+    server["fail_after"] = 10_000
+    with pytest.raises(requests.ConnectionError):
+        stream_download(URL, dest, chunk_size=1024)
+
+
+def test_changed_file_restarts(tmp_path, server):
+    """Test that a file changed since the partial download is fetched whole"""
+    dest = tmp_path / "big.csv"
+    interrupt(dest, server)
+    server["body"], server["etag"] = BODY.replace(b"1", b"7"), '"v2"'
+
+    stream_download(URL, dest, chunk_size=1024)
+
+    assert dest.read_bytes() == server["body"]
+
+
+def test_no_validator_restarts(tmp_path, server):
+    """Test that a partial file without a validator is not resumed"""
+    server["etag"] = None
+    dest = tmp_path / "big.csv"
+    interrupt(dest, server)
+
+    stream_download(URL, dest)
+
+    assert "Range" not in server["requests"][-1]
+    assert dest.read_bytes() == BODY
+
+
+def test_complete_part_checked_against_total(tmp_path, server):
+    """Test that a 416 reply completes the .part file only if it has every byte"""
+    dest = tmp_path / "big.csv"
+    interrupt(dest, server)
+    part_path(dest).write_bytes(BODY)
+    stream_download(URL, dest)
+    assert dest.read_bytes() == BODY
+    assert len(server["requests"]) == 2
+
+    # A .part file longer than the body is discarded and downloaded again
+    other = tmp_path / "other.csv"
+    interrupt(other, server)
+    part_path(other).write_bytes(BODY + b"extra")
+    stream_download(URL, other)
+    assert other.read_bytes() == BODY
+
+
+def test_resume_restarts_when_range_is_ignored(tmp_path, server):
+    """Test that a server answering 200 to a Range request restarts the file"""
+    dest = tmp_path / "big.csv"
+    part_path(dest).write_bytes(b"garbage")
+    server["ranges"] = False
+
+    stream_download(URL, dest)
+
+    assert dest.read_bytes() == BODY
+
+
+def test_checksum_is_verified(tmp_path, server):
+    """Test that a matching checksum passes and a wrong one is rejected"""
+    dest = tmp_path / "big.csv"
+    stream_download(URL, dest, checksum="sha256:" + hashlib.sha256(BODY).hexdigest())
+    assert dest.read_bytes() == BODY
+
+    other = tmp_path / "other.csv"
+    with pytest.raises(ChecksumError):
+        stream_download(URL, other, checksum="sha256:" + "0" * 64)
+    assert not other.exists()
+    assert not part_path(other).exists()
+
+
+@pytest.fixture
+def catalog_server(fake_get):
+    """A fake server for several files, with ETags and optional transient errors"""
+    state = {"gets": [], "heads": [], "errors": {}, "etag": '"v1"'}
+    bodies = {f"https://example.org/csv/{i}.csv": f"x\n{i}\n".encode() for i in range(5)}
+
+    def get(url, headers):
+        state["gets"].append(url)
+        if state["errors"].get(url):
+            state["errors"][url] -= 1
+            response = FakeResponse(b"", status_code=503)
+            error = requests.HTTPError("503")
+            error.response = response
+            raise error
+        response = FakeResponse(bodies[url])
+        response.headers["ETag"] = state["etag"]
+        return response
+
+    def head(url):
+        state["heads"].append(url)
+        return FakeResponse(headers={"ETag": state["etag"], "Content-Length": str(len(bodies[url]))})
+
+    fake_get.handler = get
+    fake_get.head_handler = head
+    state["files"] = [(url, f"d{i}.csv") for i, url in enumerate(bodies)]
+    return state
+
+
+def test_fetch_many_downloads_all(tmp_path, catalog_server):
+    """Test that every file is downloaded into the destination"""
+    results = fetch_many(catalog_server["files"], tmp_path, jobs=3)
+
+    assert set(results.values()) == {"downloaded"}
+    assert (tmp_path / "d3.csv").read_bytes() == b"x\n3\n"
+
+
+def test_fetch_many_skips_unchanged_files(tmp_path, catalog_server):
+    """Test that a second run only checks the files and downloads nothing"""
+    fetch_many(catalog_server["files"], tmp_path)
+    catalog_server["gets"].clear()
+
+    results = fetch_many(catalog_server["files"], tmp_path)
+
+    assert set(results.values()) == {"skipped"}
+    assert catalog_server["gets"] == []
+
+
+def test_fetch_many_redownloads_changed_files(tmp_path, catalog_server):
+    """Test that a changed ETag triggers a new download"""
+    fetch_many(catalog_server["files"], tmp_path)
+    catalog_server["etag"] = '"v2"'
+
+    results = fetch_many(catalog_server["files"], tmp_path)
+
+    assert set(results.values()) == {"downloaded"}
+
+
+def test_fetch_many_retries_transient_errors(tmp_path, catalog_server):
+    """Test that 503 responses are retried and failures are reported"""
+    ok_url, _ = catalog_server["files"][0]
+    bad_url, _ = catalog_server["files"][1]
+    catalog_server["errors"] = {ok_url: 2, bad_url: 10}
+    reported = []
+
+    results = fetch_many(
+        catalog_server["files"], tmp_path, retries=2, backoff=0,
+        on_result=lambda name, status, error: reported.append((name, status)),
+    )
+
+    assert results["d0.csv"] == "downloaded"
+    assert results["d1.csv"] == "failed"
+    assert catalog_server["gets"].count(bad_url) == 3
+    assert len(reported) == 5
+
+
+def test_fetch_many_is_the_only_retry_layer(tmp_path, catalog_server, monkeypatch):
+    """Test that fetch_many's session does not retry on its own"""
+    sessions = []
+    create_session = net.create_session
+    monkeypatch.setattr(net, "create_session", lambda **kwargs: sessions.append(kwargs) or create_session(**kwargs))
+
+    fetch_many(catalog_server["files"], tmp_path, jobs=2)
+
+    assert sessions == [{"pool_size": 2, "retries": 0}]
@@ -0,0 +1,87 @@
+"""
+Test ranked full-text search with data_search() and the inverted index
+"""
+
+import pytest
+from typer.testing import CliRunner
+from rdatasets_search import fulltext, search
+from rdatasets_search.cli import app
+from rdatasets_search.search import data_search
+
+
+def test_search_finds_title_words(small_catalog):
+    """Test that words in titles are found"""
+    result = data_search("wages")
+    assert result["Item"].to_list() == ["CPS1985"]
+
+
+def test_search_matches_package_and_item(small_catalog):
+    """Test that package and item names are searchable, case-insensitively"""
+    assert data_search("MASS")["Package"].unique().to_list() == ["MASS"]
+    assert data_search("mtcars")["Item"].to_list() == ["mtcars"]
+
+
+def test_results_are_ranked(small_catalog):
+    """Test that rows matching more terms rank first and scores decrease"""
+    result = data_search("lung cancer data")
+    assert result["Item"][0] == "lung"
+    scores = result["Score"].to_list()
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_last_term_matches_prefix(small_catalog):
+    """Test that a partially typed last word matches as a prefix"""
+    # "survey" in a title and the "survival" package
+    assert set(data_search("surv")["Item"].to_list()) == {"survey", "lung"}
+    # Earlier words must match exactly
+    assert len(data_search("surv zzzz")) == 0
+
+
+def test_filters_restrict_results(small_catalog):
+    """Test that having filters apply as post-filters"""
+    result = data_search("data", "factor", "rows > 500")
+    assert sorted(result["Item"].to_list()) == ["Affairs", "CPS1985"]
+
+
+def test_limit(small_catalog):
+    """Test that limit keeps only the best matches"""
+    full = data_search("data")
+    limited = data_search("data", limit=2)
+    assert limited["Item"].to_list() == full["Item"].to_list()[:2]
+    assert len(data_search("data", limit=0)) == 0
+    with pytest.raises(ValueError, match="Invalid limit: -1"):
+        data_search("data", limit=-1)
+
+
+def test_search_command_rejects_negative_limit(small_catalog, monkeypatch):
+    """Test that 'r-data search -n -1' fails as it does through the daemon"""
+    monkeypatch.setenv("RDATASETS_DAEMON", "off")
+    result = CliRunner().invoke(app, ["search", "data", "-n", "-1"])
+    assert result.exit_code == 1
+    assert "Invalid limit" in result.output
+
+
+def test_no_match_and_empty_query(small_catalog):
+    """Test that unknown words and empty queries return no rows"""
+    assert len(data_search("zzzz")) == 0
+    assert len(data_search("   ")) == 0
+
+
+def test_invalid_filter_raises(small_catalog):
+    """Test that invalid filters raise ValueError like data_having"""
+    with pytest.raises(ValueError, match="Invalid argument format"):
+        data_search("data", "nonsense")
+
+
+def test_index_is_persisted_and_reused(small_catalog, tmp_path):
+    """Test that the index is saved and only rebuilt for a different catalog"""
+    first = fulltext.load_or_build(small_catalog, tmp_path)
+    assert (tmp_path / fulltext.INDEX_NAME).exists()
+
+    second = fulltext.load_or_build(small_catalog, tmp_path)
+    assert second.fingerprint == first.fingerprint
+    assert second.search("boston") == first.search("boston")
+
+    changed = fulltext.load_or_build(small_catalog.head(2), tmp_path)
+    assert changed.fingerprint != first.fingerprint
+    assert changed.search("boston") == []
@@ -0,0 +1,58 @@
+"""
+Test that lightweight CLI commands do not load heavy dependencies or the catalog
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["polars", "requests", "bs4"]
+
+
+def run_python(code):
+    """Run code in a fresh interpreter and return its stdout"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def loaded_after(statement):
+    """Return the heavy modules present in sys.modules after running statement"""
+    code = (
+        "import sys\n"
+        f"{statement}\n"
+        f"print('LOADED:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    last_line = run_python(code).strip().splitlines()[-1]
+    assert last_line.startswith("LOADED:")
+    return [m for m in last_line.removeprefix("LOADED:").split(",") if m]
+
+
+def test_import_cli_is_lightweight():
+    """Test that importing the CLI module does not import polars, requests or bs4"""
+    assert loaded_after("import rdatasets_search.cli") == []
+
+
+@pytest.mark.parametrize("argv", [["info"], ["--help"], ["having", "--help"]])
+def test_lightweight_commands(argv):
+    """Test that info and --help neither import heavy modules nor load the catalog"""
+    statement = (
+        "from rdatasets_search.cli import app\n"
+        "try:\n"
+        f"    app({argv!r})\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+    assert loaded_after(statement) == []
+
+
+def test_search_import_does_not_load_catalog():
+    """Test that importing the search module does not fetch the index"""
+    statement = (
+        "import rdatasets_search.search as s\n"
+        "assert s._catalog is None"
+    )
+    assert "requests" not in loaded_after(statement)
@@ -0,0 +1,71 @@
+"""
+Test the secondary catalog indexes against plain polars filters
+"""
+
+import polars as pl
+import pytest
+from rdatasets_search import index as index_module
+from rdatasets_search.index import CatalogIndex
+from rdatasets_search.search import predicate_expr
+
+OPERATORS = [">", ">=", "<", "<=", "==", "!="]
+
+
+@pytest.fixture
+def catalog():
+    return pl.DataFrame({
+        "Rows": [10, 5, None, 10, 300, 5, 7],
+        "Cols": [3, 3, 4, None, 2, 8, 3],
+        "n_binary": [0, 1, 2, 0, None, 3, 0],
+        "n_numeric": [1, 1, 1, 0, 0, 2, 5],
+    })
+
+
+@pytest.mark.parametrize("operator", OPERATORS)
+@pytest.mark.parametrize("value", [-1, 0, 3, 5, 7, 10, 1000])
+@pytest.mark.parametrize("fraction", [0, 0.5, 1])
+def test_range_masks_match_polars(catalog, monkeypatch, operator, value, fraction):
+    """Test that binary-search range masks equal the polars comparison"""
+    monkeypatch.setattr(index_module, "MIN_SORTED_HEIGHT", 0)
+    monkeypatch.setattr(index_module, "SCATTER_FRACTION", fraction)
+    index = CatalogIndex(catalog)
+    assert set(index.sorted) == {"Rows", "Cols"}
+    for col_name in ("Rows", "Cols"):
+        predicate = (col_name, operator, value)
+        expected = catalog.filter(predicate_expr(predicate))
+        assert index.filter([predicate]).equals(expected)
+
+
+def test_small_catalogs_compare_directly(catalog):
+    """Test that catalogs below MIN_SORTED_HEIGHT keep no sorted permutations"""
+    index = CatalogIndex(catalog)
+    assert index.sorted == {}
+    predicate = ("Rows", "<", 10)
+    assert index.filter([predicate]).equals(catalog.filter(predicate_expr(predicate)))
+
+
+def test_flag_bitmaps(catalog):
+    """Test that n_* flags are precomputed bitmaps that treat nulls as absent"""
+    index = CatalogIndex(catalog)
+    assert index.mask(("n_binary", ">", 0)) is index.flags["n_binary"]
+    assert index.flags["n_binary"].to_list() == [False, True, True, False, False, True, False]
+
+
+def test_combined_predicates(catalog):
+    """Test that multiple predicates are combined with AND"""
+    index = CatalogIndex(catalog)
+    predicates = [("n_numeric", ">", 0), ("Rows", ">=", 7), ("Cols", "!=", 8)]
+    expected = catalog.filter(*[predicate_expr(p) for p in predicates])
+    assert index.filter(predicates).equals(expected)
+
+
+def test_unindexed_predicate_falls_back(catalog):
+    """Test that predicates without an index are evaluated directly"""
+    index = CatalogIndex(catalog)
+    predicate = ("n_numeric", ">=", 2)
+    assert index.filter([predicate]).equals(catalog.filter(predicate_expr(predicate)))
+
+
+def test_no_predicates_returns_catalog(catalog):
+    """Test that an empty predicate list returns the whole catalog"""
+    assert CatalogIndex(catalog).filter([]) is catalog
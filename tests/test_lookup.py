@@ -0,0 +1,84 @@
+"""
+Test direct dataset lookup by name, suggestions and r-data show
+"""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+from rdatasets_search import cli, store
+from rdatasets_search.cli import app
+from rdatasets_search.lookup import NameIndex, UnknownDataset, ngrams
+from rdatasets_search.search import data_lookup, get_index
+
+
+def test_exact_lookup(small_catalog):
+    """Test that exact names are answered by the hash index"""
+    assert data_lookup("MASS/Boston")["Rows"] == 506
+    assert get_index().rows_by_name["survival/lung"] == 5
+    # Misses build the n-gram index; exact names never do
+    assert get_index()._name_index is None
+
+
+def test_case_and_item_only(small_catalog):
+    """Test case-insensitive names and items given without their package"""
+    assert data_lookup("mass/BOSTON")["Item"] == "Boston"
+    assert data_lookup(" mtcars ")["Package"] == "datasets"
+
+
+def test_suggestions(small_catalog):
+    """Test that unknown names suggest the closest ones"""
+    with pytest.raises(UnknownDataset, match="Did you mean: MASS/Boston") as error:
+        data_lookup("MASS/Bostn")
+    assert error.value.suggestions[0] == "MASS/Boston"
+
+    # Items given alone are compared with items
+    with pytest.raises(UnknownDataset, match="Did you mean: MASS/Boston") as error:
+        data_lookup("Bostn")
+    assert error.value.suggestions[0] == "MASS/Boston"
+    assert get_index().name_index().suggest("mtcrs") == ["datasets/mtcars"]
+
+    with pytest.raises(ValueError, match="Unknown dataset: nothing/alike$"):
+        data_lookup("nothing/alike")
+
+
+def test_ambiguous_item():
+    """Test that an item in several packages lists them"""
+    index = NameIndex(["AER/Guns", "Ecdat/Guns", "MASS/Boston"])
+
+    assert index.resolve("guns") == [0, 1]
+    assert index.resolve("mass/boston") == [2]
+    assert index.suggest("Ecdat/Gun")[0] == "Ecdat/Guns"
+    assert "Ambiguous" in str(UnknownDataset("Guns", ["AER/Guns", "Ecdat/Guns"], ambiguous=True))
+
+
+def test_short_names_have_ngrams():
+    """Test that names shorter than an n-gram still index"""
+    assert ngrams("a") == {" a "}
+
+
+def test_store_uses_lookup(small_catalog):
+    """Test that the store resolves CSV URLs through the hash index"""
+    assert store.csv_url("AER", "CPS1985") == "https://example.org/csv/1.csv"
+    with pytest.raises(ValueError, match="Unknown dataset: AER/CPS1958. Did you mean: AER/CPS1985"):
+        store.csv_url("AER", "CPS1958")
+
+
+def test_show(small_catalog, monkeypatch):
+    """Test r-data show in text and machine-readable output"""
+    runner = CliRunner()
+    monkeypatch.setenv("RDATASETS_DAEMON", "off")
+    monkeypatch.setattr(cli, "fetch_documentation", lambda url: f"docs at {url}")
+
+    result = runner.invoke(app, ["show", "MASS/Boston"])
+    assert result.exit_code == 0
+    assert "MASS/Boston: Housing Values in Suburbs of Boston" in result.stdout
+    assert "Column types: binary 1, numeric 14" in result.stdout
+    assert "docs at https://example.org/doc/2.html" in result.stdout
+
+    result = runner.invoke(app, ["show", "lung", "--format", "json"])
+    assert [row["Package"] for row in json.loads(result.stdout)] == ["survival"]
+
+    result = runner.invoke(app, ["show", "AER/Afairs", "--no-doc"])
+    assert result.exit_code == 1
+    assert "Did you mean: AER/Affairs" in result.output
@@ -0,0 +1,134 @@
+"""
+Test the local mirror: incremental sync and serving without network
+"""
+
+import pytest
+import requests
+from rdatasets_search import mirror, net, search
+from rdatasets_search.docs import fetch_documentation
+from rdatasets_search.download import stream_download
+
+from .conftest import FakeResponse
+
+INDEX_URL = "https://example.org/Rdatasets/datasets.csv"
+DOC = "https://example.org/Rdatasets/doc/{}/{}.html"
+CSV = "https://example.org/Rdatasets/csv/{}/{}.csv"
+DATASETS = [("AER", "Affairs", 601), ("datasets", "mtcars", 32)]
+
+INDEX = "Package,Item,Title,Rows,Cols,n_binary,n_character,n_factor,n_logical,n_numeric,CSV,Doc\n" + "".join(
+    f"{p},{i},{i} data,{rows},3,0,0,1,0,2,{CSV.format(p, i)},{DOC.format(p, i)}\n" for p, i, rows in DATASETS
+)
+PAGE = "<html><head><title>R: {0} data</title></head><body><h3>Description</h3><p>About {0}.</p></body></html>"
+
+
+@pytest.fixture
+def remote(fake_get):
+    """A fake Rdatasets server with ETags"""
+    state = {"gets": [], "etag": '"v1"'}
+    files = {INDEX_URL: INDEX.encode()}
+    for p, i, _ in DATASETS:
+        files[DOC.format(p, i)] = PAGE.format(i).encode()
+        files[CSV.format(p, i)] = f"x\n{i}\n".encode()
+
+    def get(url, headers):
+        state["gets"].append(url)
+        return FakeResponse(files[url], headers={"ETag": state["etag"]})
+
+    fake_get.handler = get
+    fake_get.head_handler = lambda url: FakeResponse(files[url], headers={"ETag": state["etag"]})
+    return state
+
+
+@pytest.fixture
+def serving(tmp_path, monkeypatch):
+    """Serve from a synced mirror, with the real (refusing) network functions"""
+    directory = tmp_path / "mirror"
+    files = {INDEX_URL: INDEX.encode()}
+    for p, i, _ in DATASETS:
+        files[DOC.format(p, i)] = PAGE.format(i).encode()
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(net, "get", lambda url, **kwargs: FakeResponse(files[url], headers={"ETag": '"v1"'}))
+        mirror.sync(directory, INDEX_URL)
+
+    monkeypatch.setenv("RDATASETS_MIRROR", str(directory))
+    monkeypatch.setenv("RDATASETS_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(search, "csv_index", INDEX_URL)
+    previous = search._catalog
+    search.set_catalog(None)
+    yield directory
+    search.set_catalog(previous)
+
+
+def test_sync_mirrors_index_and_docs(tmp_path, remote):
+    """Test that the index and every documentation page are mirrored by URL"""
+    results = mirror.sync(tmp_path, INDEX_URL)
+
+    assert set(results.values()) == {"downloaded"}
+    assert (tmp_path / "example.org/Rdatasets/datasets.csv").read_text() == INDEX
+    assert (tmp_path / "example.org/Rdatasets/doc/AER/Affairs.html").exists()
+    assert not (tmp_path / "example.org/Rdatasets/csv").exists()
+
+
+def test_sync_with_csv(tmp_path, remote):
+    """Test that CSV files are mirrored on request"""
+    mirror.sync(tmp_path, INDEX_URL, csv=True)
+
+    assert (tmp_path / "example.org/Rdatasets/csv/datasets/mtcars.csv").read_bytes() == b"x\nmtcars\n"
+
+
+def test_resync_is_incremental(tmp_path, remote):
+    """Test that unchanged files are not downloaded again, changed ones are"""
+    mirror.sync(tmp_path, INDEX_URL, csv=True)
+    remote["gets"].clear()
+
+    results = mirror.sync(tmp_path, INDEX_URL, csv=True)
+
+    assert set(results.values()) == {"skipped"}
+    assert remote["gets"] == []
+
+    remote["etag"] = '"v2"'
+    results = mirror.sync(tmp_path, INDEX_URL)
+    assert set(results.values()) == {"downloaded"}
+
+
+def test_relative_path_rejects_traversal():
+    """Test that URLs cannot escape the mirror directory"""
+    assert mirror.relative_path("https://h.org/a/b.csv") == "h.org/a/b.csv"
+    with pytest.raises(ValueError):
+        mirror.relative_path("https://h.org/a/../../b.csv")
+
+
+def test_network_is_disabled_with_mirror(tmp_path, monkeypatch):
+    """Test that no request is sent while serving from a mirror"""
+    monkeypatch.setenv("RDATASETS_MIRROR", str(tmp_path))
+
+    with pytest.raises(net.NetworkDisabled):
+        net.get("https://example.org/")
+    with pytest.raises(requests.ConnectionError):
+        net.head("https://example.org/")
+
+
+def test_catalog_and_docs_served_from_mirror(serving):
+    """Test that the catalog and documentation come from the mirror"""
+    assert search.get_catalog()["Item"].to_list() == ["Affairs", "mtcars"]
+    assert len(search.data_having("rows > 100")) == 1
+
+    text = fetch_documentation(DOC.format("datasets", "mtcars"))
+    assert text.startswith("Title: R: mtcars data")
+    assert "About mtcars." in text
+
+    missing = fetch_documentation(DOC.format("MASS", "Boston"))
+    assert missing.startswith("Error fetching documentation")
+
+
+def test_download_copies_from_mirror(serving, tmp_path):
+    """Test that downloads are copied from the mirror, or fail if it lacks the file"""
+    csv_path = serving / "example.org/Rdatasets/csv/AER/Affairs.csv"
+    csv_path.parent.mkdir(parents=True)
+    csv_path.write_bytes(b"x\n1\n")
+
+    dest = stream_download(CSV.format("AER", "Affairs"), tmp_path / "Affairs.csv")
+    assert dest.read_bytes() == b"x\n1\n"
+
+    with pytest.raises(FileNotFoundError, match="Not in the mirror"):
+        stream_download(CSV.format("datasets", "mtcars"), tmp_path / "mtcars.csv")
@@ -0,0 +1,87 @@
+"""
+Test the shared HTTP session against a local keep-alive server
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from rdatasets_search import net
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures = 0
+
+    def do_GET(self):
+        if self.path == "/flaky" and Handler.failures > 0:
+            Handler.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    net.reset_session()
+    yield
+    net.reset_session()
+
+
+def test_connections_are_reused(server):
+    """Test that sequential requests to one host share a connection"""
+    for _ in range(5):
+        response = net.get(f"{server}/doc")
+        assert response.content == b"ok"
+
+    stats = net.stats()
+    assert stats["requests"] == 5
+    assert stats["connections"] == 1
+    assert stats["reused"] == 4
+
+
+def test_transient_errors_are_retried(server, monkeypatch):
+    """Test that 503 responses are retried by the session"""
+    monkeypatch.setenv("RDATASETS_HTTP_RETRIES", "2")
+    monkeypatch.setattr(Handler, "failures", 2)
+    monkeypatch.setattr(net, "BACKOFF_FACTOR", 0)
+
+    response = net.get(f"{server}/flaky")
+
+    assert response.status_code == 200
+
+
+def test_timeout_configuration(monkeypatch):
+    """Test that RDATASETS_HTTP_TIMEOUT overrides the caller's default"""
+    assert net.timeout(10) == 10
+    monkeypatch.setenv("RDATASETS_HTTP_TIMEOUT", "2.5")
+    assert net.timeout(10) == 2.5
+    monkeypatch.setenv("RDATASETS_HTTP_TIMEOUT", "soon")
+    with pytest.raises(ValueError):
+        net.timeout()
+
+
+def test_pool_size_configuration(monkeypatch):
+    """Test that the pool size comes from RDATASETS_HTTP_POOL_SIZE"""
+    monkeypatch.setenv("RDATASETS_HTTP_POOL_SIZE", "3")
+    adapter = net.get_session().get_adapter("https://example.org")
+    assert adapter._pool_maxsize == 3
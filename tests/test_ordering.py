@@ -0,0 +1,127 @@
+"""
+Test sorted and top-k results and lazily collected result pages
+"""
+
+import json
+import random
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+from rdatasets_search import cli, prefetch
+from rdatasets_search.cli import PageRenderer, app
+from rdatasets_search.search import data_having, order_results, top_k
+
+from .conftest import NoFetch
+
+
+def test_sort_and_limit(small_catalog):
+    """Test sorting by size, package and type counts, with and without a limit"""
+    assert data_having("binary", sort="rows")["Rows"].to_list() == [32, 228, 237, 506, 534, 601]
+    assert data_having("factor", sort="ROWS", descending=True, limit=2)["Item"].to_list() == ["Affairs", "CPS1985"]
+    assert data_having(sort="package", descending=True, limit=3)["Item"].to_list() == ["lung", "mtcars", "survey"]
+    # Ties keep catalog order
+    assert data_having(sort="binary", descending=True)["Item"].to_list() == [
+        "CPS1985", "Affairs", "survey", "mtcars", "Boston", "lung",
+    ]
+    assert data_having("rows > 500", limit=1)["Item"].to_list() == ["Affairs"]
+    assert data_having("rows > 5000", sort="cols", limit=3).is_empty()
+
+
+def test_unsorted_results_are_cached(small_catalog):
+    """Test that plain queries still return the memoized frame"""
+    assert data_having("binary") is data_having("binary")
+
+
+@pytest.mark.parametrize("sort, limit", [("bogus", None), ("rows", -1)])
+def test_invalid_ordering(small_catalog, sort, limit):
+    """Test that unknown sort keys and negative limits raise ValueError"""
+    with pytest.raises(ValueError):
+        data_having("binary", sort=sort, limit=limit)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("k", [0, 1, 3, 4, 7, 10])
+def test_top_k_matches_stable_sort(descending, k):
+    """Test that top_k picks the rows of a stable sort, ties and nulls included"""
+    df = pl.DataFrame({"a": [3, None, 5, 5, 1, 3, 5, None], "b": list("hgfedcba")})
+
+    expected = df.sort("a", descending=descending, nulls_last=True, maintain_order=True).head(k)
+
+    assert top_k(df, ["a"], k, descending).equals(expected)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_top_k_multiple_columns_with_nulls(descending):
+    """Test that every sort key orders the rows, including those with no first key"""
+    rng = random.Random(7)
+    for _ in range(200):
+        n = rng.randint(0, 12)
+        df = pl.DataFrame({
+            "a": [rng.choice([None, 1, 2, 3]) for _ in range(n)],
+            "b": [rng.choice([None, "x", "y", "z"]) for _ in range(n)],
+            "i": list(range(n)),
+        })
+        for k in range(n + 2):
+            expected = df.sort(["a", "b"], descending=descending, nulls_last=True, maintain_order=True).head(k)
+            assert top_k(df, ["a", "b"], k, descending).equals(expected)
+
+
+def test_lazy_sort_collects_pages_on_demand(small_catalog):
+    """Test that a lazily sorted result is collected one page at a time"""
+    ordered = order_results(small_catalog, "rows", lazy=True)
+    assert isinstance(ordered, pl.LazyFrame)
+
+    renderer = PageRenderer(ordered, page_size=4, total_rows=6)
+    text = renderer.render(2, 80)
+
+    assert list(renderer.frames) == [2]
+    assert "Page 2 of 2" in text and "Affairs" in text and "mtcars" not in text
+    assert renderer.row(1)["Item"] == "mtcars"
+    assert list(renderer.frames) == [2, 1]
+
+
+def test_having_sorted(small_catalog, monkeypatch):
+    """Test --sort, --desc and --limit in table and machine-readable output"""
+    runner = CliRunner()
+    monkeypatch.setenv("RDATASETS_DAEMON", "off")
+
+    result = runner.invoke(app, ["having", "binary", "--sort", "rows", "--desc", "--limit", "2", "--format", "ndjson"])
+    assert result.exit_code == 0
+    assert [json.loads(line)["Item"] for line in result.stdout.splitlines()] == ["Affairs", "CPS1985"]
+
+    result = runner.invoke(app, ["having", "binary", "--sort", "cols", "-n", "3", "--no-interactive"])
+    assert result.exit_code == 0
+    assert "Found 6 datasets" in result.stdout
+    assert "Showing 3 of them by cols" in result.stdout
+    assert "Affairs" in result.stdout and "Boston" not in result.stdout
+
+    assert runner.invoke(app, ["having", "binary", "--sort", "bogus"]).exit_code == 1
+
+
+def test_having_pages_sorted_results(small_catalog, monkeypatch):
+    """Test that the interactive table and documentation follow the sort"""
+    answers = iter(["1", "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    monkeypatch.setattr(cli, "clear_screen", lambda: None)
+    monkeypatch.setenv("RDATASETS_DAEMON", "off")
+    opened = []
+    monkeypatch.setattr(cli, "display_documentation_with_navigation", lambda doc, num, row: opened.append(row["Item"]) or "back")
+    monkeypatch.setattr(prefetch, "DocumentationPrefetcher", NoFetch)
+
+    result = CliRunner().invoke(app, ["having", "numeric", "--sort", "rows"])
+
+    assert result.exit_code == 0
+    assert opened == ["mtcars"]
+
+
+def test_having_limit_zero_does_not_page(small_catalog, monkeypatch):
+    """Test that --limit 0 reports the matches without an empty interactive table"""
+    monkeypatch.setenv("RDATASETS_DAEMON", "off")
+    monkeypatch.setattr("builtins.input", lambda prompt="": pytest.fail("should not prompt"))
+
+    result = CliRunner().invoke(app, ["having", "binary", "--limit", "0"])
+
+    assert result.exit_code == 0
+    assert "Showing 0 of them" in result.stdout
+    assert "Page" not in result.stdout
@@ -0,0 +1,82 @@
+"""
+Test machine-readable output and the non-interactive having command
+"""
+
+import io
+import json
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+from rdatasets_search import output
+from rdatasets_search.cli import app
+
+
+def written(df, output_format, batch_rows=output.BATCH_ROWS) -> bytes:
+    stream = io.BytesIO()
+    output.write(df, output_format, stream, batch_rows=batch_rows)
+    return stream.getvalue()
+
+
+@pytest.mark.parametrize("batch_rows", [1, 4, 100])
+def test_text_formats_across_batches(small_catalog, batch_rows):
+    """Test that batching does not change csv, json or ndjson output"""
+    csv = written(small_catalog, "csv", batch_rows)
+    assert pl.read_csv(io.BytesIO(csv)).equals(small_catalog)
+    assert csv.count(b"rownames") == 1
+
+    records = json.loads(written(small_catalog, "json", batch_rows))
+    assert records == small_catalog.to_dicts()
+
+    lines = written(small_catalog, "ndjson", batch_rows).decode().splitlines()
+    assert [json.loads(line) for line in lines] == small_catalog.to_dicts()
+
+
+def test_arrow_stream(small_catalog):
+    """Test that Arrow IPC output reads back with the same schema"""
+    data = written(small_catalog, "arrow")
+
+    assert pl.read_ipc_stream(io.BytesIO(data)).equals(small_catalog)
+
+
+def test_empty_results(small_catalog):
+    """Test that empty results are still valid documents"""
+    empty = small_catalog.head(0)
+
+    assert json.loads(written(empty, "json")) == []
+    assert written(empty, "ndjson") == b""
+    assert written(empty, "csv").decode().startswith("rownames,Package,Item")
+    assert pl.read_ipc_stream(io.BytesIO(written(empty, "arrow"))).schema == small_catalog.schema
+
+
+def test_unknown_format(small_catalog):
+    """Test that unknown formats are rejected"""
+    with pytest.raises(ValueError, match="Unknown format"):
+        written(small_catalog, "xml")
+
+
+def test_having_machine_output(small_catalog):
+    """Test that having --format prints only the data"""
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["having", "binary", "rows > 500", "--format", "ndjson"])
+
+    assert result.exit_code == 0
+    items = [json.loads(line)["Item"] for line in result.stdout.splitlines()]
+    assert items == ["Affairs", "CPS1985", "Boston"]
+
+    result = runner.invoke(app, ["having", "factor", "--format", "csv"])
+    assert pl.read_csv(io.BytesIO(result.stdout_bytes))["Item"].to_list() == ["Affairs", "CPS1985", "survey"]
+
+    assert runner.invoke(app, ["having", "binary", "--format", "xml"]).exit_code == 1
+
+
+def test_having_no_interactive(small_catalog, monkeypatch):
+    """Test that --no-interactive prints the whole table without prompting"""
+    monkeypatch.setattr("builtins.input", lambda prompt="": pytest.fail("prompted"))
+
+    result = CliRunner().invoke(app, ["having", "rows > 500", "--no-interactive"])
+
+    assert result.exit_code == 0
+    assert "Found 3 datasets" in result.stdout
+    assert "Affairs" in result.stdout and "Boston" in result.stdout
@@ -0,0 +1,81 @@
+"""
+Test background prefetching of documentation
+"""
+
+import threading
+
+from rdatasets_search.prefetch import DocumentationPrefetcher
+
+
+class RecordingFetch:
+    """A fetch function that records calls and can be held back"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def __call__(self, url):
+        with self.lock:
+            self.calls.append(url)
+        self.started.set()
+        self.release.wait(5)
+        return f"doc for {url}"
+
+
+def test_prefetched_page_is_reused():
+    """Test that get() returns the prefetched result without fetching again"""
+    fetch = RecordingFetch()
+    fetch.release.set()
+    with DocumentationPrefetcher(fetch, max_workers=2) as prefetcher:
+        prefetcher.prefetch(["a", "b"])
+        assert prefetcher.get("a") == "doc for a"
+        assert prefetcher.ready("b") or prefetcher.get("b") == "doc for b"
+    assert sorted(fetch.calls) == ["a", "b"]
+
+
+def test_changing_page_cancels_queued_work():
+    """Test that queued fetches for pages no longer shown are cancelled"""
+    fetch = RecordingFetch()
+    with DocumentationPrefetcher(fetch, max_workers=1) as prefetcher:
+        prefetcher.prefetch(["a", "b", "c"])
+        # "a" is running, "b" and "c" are queued behind it
+        assert fetch.started.wait(5)
+        prefetcher.prefetch(["d"])
+        fetch.release.set()
+        assert prefetcher.get("d") == "doc for d"
+        # Used fetches are forgotten; "a" is dropped once done
+        assert set(prefetcher.futures) == {"a"}
+        prefetcher.futures["a"].result()
+        prefetcher.prefetch([])
+        assert prefetcher.futures == {}
+    assert "b" not in fetch.calls and "c" not in fetch.calls
+
+
+def test_unknown_url_is_fetched_directly():
+    """Test that get() falls back to fetching pages that were not prefetched"""
+    fetch = RecordingFetch()
+    fetch.release.set()
+    with DocumentationPrefetcher(fetch) as prefetcher:
+        assert prefetcher.get("x") == "doc for x"
+    assert fetch.calls == ["x"]
+
+
+def test_failed_prefetch_is_retried():
+    """Test that an error report from a background fetch is fetched again"""
+    results = iter(["Error fetching documentation: timed out\nURL: a", "doc for a", "doc for a"])
+    calls = []
+
+    def flaky(url):
+        calls.append(url)
+        return next(results)
+
+    with DocumentationPrefetcher(flaky, max_workers=1) as prefetcher:
+        prefetcher.prefetch(["a"])
+        prefetcher.futures["a"].exception(5)
+        # Showing the page again resubmits the failed fetch
+        prefetcher.prefetch(["a"])
+        assert prefetcher.get("a") == "doc for a"
+        assert prefetcher.get("a") == "doc for a"
+    assert calls == ["a", "a", "a"]
@@ -0,0 +1,100 @@
+"""
+Test dataset profiling and the column statistics filters
+"""
+
+import os
+
+import pytest
+from rdatasets_search import profiling, search
+from rdatasets_search.profiling import StatsIndex
+from rdatasets_search.search import data_having, parse_filter
+
+FILES = {
+    # 50% missing in y, 3 distinct x values
+    "AER_Affairs.csv": "rownames,x,y,g\n1,1,NA,a\n2,2,5,b\n3,3,NA,a\n4,3,6,b\n",
+    # Many distinct numeric values, no missing values
+    "MASS_Boston.csv": "rownames,medv,chas\n" + "".join(f"{i},{i * 1.5},{i % 2 == 0}\n" for i in range(1, 2001)),
+    "datasets_mtcars.csv": "rownames,mpg,name\n1,21.0,Mazda\n2,22.8,Datsun\n",
+}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    directory = tmp_path / "csv"
+    directory.mkdir()
+    for name, content in FILES.items():
+        (directory / name).write_text(content)
+    return directory
+
+
+@pytest.fixture
+def stats(small_catalog, sources, tmp_path):
+    stats, results = profiling.build(small_catalog, sources=[sources], jobs=2, directory=tmp_path)
+    search.set_stats_index(StatsIndex(stats))
+    yield stats, results
+    search.set_stats_index(None)
+
+
+def test_profile_file(sources):
+    """Test the per-column statistics of a file"""
+    profile = {row[0]: row for row in profiling.profile_file(sources / "AER_Affairs.csv")}
+
+    assert "rownames" not in profile
+    name, kind, dtype, rows, nulls, missing, distinct, low, high = profile["y"]
+    assert (kind, rows, nulls, missing, distinct, low, high) == ("numeric", 4, 2, 50.0, 2, 5.0, 6.0)
+    assert profile["g"][1:3] == ("character", "String")
+    assert profile["g"][7] is None
+
+
+def test_build_reports_missing_sources(stats):
+    """Test that only datasets with a local copy are profiled"""
+    _, results = stats
+    assert results["AER/Affairs"] == "profiled"
+    assert results["MASS/Boston"] == "profiled"
+    assert results["survival/lung"] == "missing"
+
+
+def test_having_missing(stats):
+    """Test filtering on the share of missing values"""
+    assert data_having("missing > 20")["Item"].to_list() == ["Affairs"]
+    assert len(data_having("missing > 60")) == 0
+
+
+def test_having_distinct_by_kind(stats):
+    """Test filtering on distinct values, restricted to a column type"""
+    assert data_having("numeric distinct > 1000")["Item"].to_list() == ["Boston"]
+    assert data_having("logical distinct == 2")["Item"].to_list() == ["Boston"]
+    assert sorted(data_having("character distinct >= 2")["Item"].to_list()) == ["Affairs", "mtcars"]
+
+
+def test_having_min_max_combined(stats):
+    """Test numeric ranges combined with catalog filters"""
+    assert data_having("max > 2500", "rows > 500")["Item"].to_list() == ["Boston"]
+    assert data_having("numeric min < 2")["Item"].to_list() == ["Affairs", "Boston"]
+
+
+def test_parse_stats_filter():
+    """Test the normalized predicates of statistics filters"""
+    assert parse_filter("Missing > 20") == ("stats:missing", ">", 20.0)
+    assert parse_filter("numeric distinct>1000") == ("stats:numeric:distinct", ">", 1000.0)
+    assert parse_filter("max >= 1e6") == ("stats:max", ">=", 1e6)
+
+
+def test_rebuild_skips_unchanged(stats, small_catalog, sources, tmp_path):
+    """Test that only changed sources are profiled again"""
+    path = sources / "datasets_mtcars.csv"
+    path.write_text(FILES["datasets_mtcars.csv"] + "3,NA,Valiant\n")
+    os.utime(path, (1, 1))
+
+    _, results = profiling.build(small_catalog, sources=[sources], jobs=1, directory=tmp_path)
+
+    assert results["AER/Affairs"] == "unchanged"
+    assert results["datasets/mtcars"] == "profiled"
+    assert profiling.load(tmp_path).filter(column="mpg")["nulls"].to_list() == [1]
+
+
+def test_missing_stats_raise(small_catalog, monkeypatch, tmp_path):
+    """Test that statistics filters explain how to build the catalog"""
+    search.set_stats_index(None)
+    with pytest.raises(ValueError, match="r-data profile"):
+        data_having("missing > 20")
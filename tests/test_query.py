@@ -0,0 +1,84 @@
+"""
+Test boolean filter queries: parsing, caching and evaluation on both backends
+"""
+
+import polars as pl
+import pytest
+from rdatasets_search import database, query, search
+from rdatasets_search.database import CatalogDatabase
+from rdatasets_search.search import data_having, data_search, parse_filter, query_key
+
+# Query, and the equivalent polars filter over the small catalog
+QUERIES = [
+    ("binary OR factor", (pl.col("n_binary") > 0) | (pl.col("n_factor") > 0)),
+    ("NOT factor", ~(pl.col("n_factor") > 0)),
+    ("not (rows > 500 or cols < 11)", ~((pl.col("Rows") > 500) | (pl.col("Cols") < 11))),
+    ("200 <= rows <= 540", pl.col("Rows").is_between(200, 540)),
+    ("numeric >= 10", pl.col("n_numeric") >= 10),
+    ("n_factor > 2 AND (rows > 550 OR cols == 12)", (pl.col("n_factor") > 2) & ((pl.col("Rows") > 550) | (pl.col("Cols") == 12))),
+    ("factor rows < 600", (pl.col("n_factor") > 0) & (pl.col("Rows") < 600)),
+    ("500 < rows OR NOT NOT binary", (pl.col("Rows") > 500) | (pl.col("n_binary") > 0)),
+]
+
+
+def test_parse_trees():
+    """Test the predicate trees of boolean queries"""
+    assert parse_filter("binary OR factor") == ("or", "of", (("n_binary", ">", 0), ("n_factor", ">", 0)))
+    assert parse_filter("NOT logical") == ("not", "of", (("n_logical", ">", 0),))
+    assert parse_filter("100 <= Rows < 1000") == ("and", "of", (("Rows", ">=", 100), ("Rows", "<", 1000)))
+    assert parse_filter("1000 > rows") == ("Rows", "<", 1000)
+    assert parse_filter("numeric >= 3") == ("n_numeric", ">=", 3)
+    assert parse_filter('var:"Household Income" or numeric distinct > 5') == (
+        "or", "of", (("var", "has", "household income"), ("stats:numeric:distinct", ">", 5.0)),
+    )
+    # AND binds tighter than OR
+    assert parse_filter("binary or factor and rows > 5")[0] == "or"
+
+
+def test_simple_filters_unchanged():
+    """Test that single filters parse as before"""
+    assert parse_filter("binary") == ("n_binary", ">", 0)
+    assert parse_filter("rows > 100") == ("Rows", ">", 100)
+    assert parse_filter("var: income and wages")[0] == "var"
+
+
+@pytest.mark.parametrize("text", ["binary OR", "(binary", "binary)", "rows > abc OR binary", "foo OR bar", "NOT"])
+def test_invalid_queries(text):
+    """Test that malformed queries raise ValueError"""
+    with pytest.raises(ValueError, match="Invalid query"):
+        parse_filter(text)
+
+
+def test_top_level_and_shares_the_cache(small_catalog):
+    """Test that the operands of a top-level AND are separate predicates"""
+    assert query_key("binary AND rows > 100") == query_key("rows > 100", "binary")
+    assert data_having("binary AND rows > 100") is data_having("binary", "rows > 100")
+
+
+def test_plans_are_cached():
+    """Test that parsed queries are reused by query text"""
+    query.parse_query.cache_clear()
+    parse_filter("binary OR factor")
+    parse_filter("binary OR factor")
+
+    assert query.parse_query.cache_info().hits == 1
+
+
+@pytest.mark.parametrize("text, expected", QUERIES, ids=[text for text, _ in QUERIES])
+def test_matches_polars(small_catalog, tmp_path, text, expected):
+    """Test that queries match the equivalent polars filter on both backends"""
+    result = data_having(text)
+    assert result.equals(small_catalog.filter(expected))
+
+    path = tmp_path / "catalog.sqlite"
+    database.build(small_catalog, path)
+    db = CatalogDatabase(path)
+    assert db.filter(sorted(query_key(text))).equals(result)
+    db.close()
+
+
+def test_search_with_query(small_catalog):
+    """Test that boolean queries restrict ranked search"""
+    result = data_search("data", "NOT factor OR rows < 300")
+
+    assert set(result["Item"]) == {"survey", "mtcars", "lung"}
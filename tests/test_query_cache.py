@@ -0,0 +1,69 @@
+"""
+Test memoization and incremental refinement in data_having()
+"""
+
+import pytest
+from rdatasets_search import search
+from rdatasets_search.search import data_having, query_key
+
+
+def test_query_key_is_order_and_case_independent():
+    """Test that equivalent queries share a cache key"""
+    assert query_key("binary", "rows > 100") == query_key("ROWS>100", "Binary")
+    assert query_key("binary", "binary") == query_key("binary")
+    assert query_key("rows > 100") != query_key("rows >= 100")
+
+
+def test_repeated_query_returns_cached_result(small_catalog):
+    """Test that a repeated query is served from the cache"""
+    first = data_having("binary", "rows > 100")
+    second = data_having("Rows > 100", "BINARY")
+    assert first is second
+
+
+def test_refinement_filters_cached_subset(small_catalog, monkeypatch):
+    """Test that a refining query starts from the cached subset, not the catalog"""
+    data_having("factor")
+
+    def fail():
+        raise AssertionError("Refinement should not rescan the catalog")
+
+    monkeypatch.setattr(search, "get_catalog", fail)
+    refined = data_having("factor", "rows > 500")
+
+    assert sorted(refined["Item"].to_list()) == ["Affairs", "CPS1985"]
+
+
+def test_refinement_matches_full_scan(small_catalog):
+    """Test that cached refinement gives the same result as a fresh query"""
+    data_having("numeric")
+    refined = data_having("numeric", "cols <= 11", "rows > 100")
+    search.clear_query_cache()
+    fresh = data_having("numeric", "cols <= 11", "rows > 100")
+    assert refined.equals(fresh)
+
+
+def test_cache_is_cleared_when_catalog_changes(small_catalog):
+    """Test that replacing the catalog invalidates memoized results"""
+    before = data_having("binary")
+    search.set_catalog(small_catalog.head(2))
+    after = data_having("binary")
+    assert len(before) == 6
+    assert len(after) == 2
+
+
+def test_cache_is_bounded(small_catalog, monkeypatch):
+    """Test that the least recently used results are evicted"""
+    monkeypatch.setattr(search, "QUERY_CACHE_SIZE", 2)
+    data_having("rows > 1")
+    data_having("rows > 2")
+    data_having("rows > 3")
+    assert query_key("rows > 1") not in search._query_cache
+    assert len(search._query_cache) == 2
+
+
+def test_invalid_arguments_are_not_cached(small_catalog):
+    """Test that errors are raised before anything is cached"""
+    with pytest.raises(ValueError):
+        data_having("binary", "invalid_type")
+    assert len(search._query_cache) == 0
@@ -0,0 +1,88 @@
+"""
+Test the pagination renderer: ANSI screen clearing and the page cache
+"""
+
+import pytest
+from rdatasets_search import cli, prefetch
+from rdatasets_search.cli import PageRenderer
+
+from .conftest import NoFetch
+
+
+@pytest.fixture
+def count_formats(monkeypatch):
+    """Count the calls to format_dataframe_output"""
+    calls = []
+    original = cli.format_dataframe_output
+
+    def counting(df, width=None):
+        calls.append(width)
+        return original(df, width)
+
+    monkeypatch.setattr(cli, "format_dataframe_output", counting)
+    return calls
+
+
+def test_render_page(small_catalog):
+    """Test the text of a rendered page"""
+    renderer = PageRenderer(small_catalog, page_size=4)
+
+    first = renderer.render(1, 80)
+    last = renderer.render(2, 80)
+
+    assert renderer.total_pages == 2
+    assert first.startswith("Page 1 of 2 (showing 1-4 of 6 results)")
+    assert "Affairs" in first and "mtcars" not in first
+    assert "n) Next page" in first and "p) Previous page" not in first
+    assert "Page 2 of 2 (showing 5-6 of 6 results)" in last
+    assert "5 " in last and "mtcars" in last
+    assert "p) Previous page" in last and "n) Next page" not in last
+
+
+def test_pages_cached_by_width(small_catalog, count_formats):
+    """Test that a page is formatted again only for a new terminal width"""
+    renderer = PageRenderer(small_catalog, page_size=4)
+
+    text = renderer.render(1, 80)
+    assert renderer.render(2, 80) != text
+    assert renderer.render(1, 80) is text
+    assert count_formats == [80, 80]
+
+    renderer.render(1, 60)
+    assert count_formats == [80, 80, 60]
+
+
+def test_cache_is_bounded(small_catalog, monkeypatch):
+    """Test that the least recently drawn pages are dropped"""
+    monkeypatch.setattr(PageRenderer, "MAX_PAGES", 2)
+    renderer = PageRenderer(small_catalog, page_size=1)
+
+    for page in (1, 2, 1, 3):
+        renderer.render(page, 80)
+
+    assert list(renderer.pages) == [(1, 80), (3, 80)]
+
+
+def test_clear_screen_without_subprocess(monkeypatch, capsys):
+    """Test that the screen is cleared with ANSI escapes, not a shell"""
+    monkeypatch.setattr(cli.os, "name", "posix")
+    monkeypatch.setattr(cli.os, "system", lambda command: pytest.fail("spawned a shell"))
+    monkeypatch.setattr(cli.typer, "echo", lambda message, nl=True: print(message, end="\n" if nl else ""))
+
+    cli.clear_screen()
+
+    assert capsys.readouterr().out == cli.CLEAR_SCREEN
+
+
+def test_paginate_reuses_rendered_pages(small_catalog, count_formats, monkeypatch):
+    """Test that returning to a page seen before does not format it again"""
+    answers = iter(["n", "p", "n", "q"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    monkeypatch.setattr(cli, "clear_screen", lambda: None)
+    monkeypatch.setattr(cli, "terminal_width", lambda: 80)
+    monkeypatch.setattr(prefetch, "DocumentationPrefetcher", NoFetch)
+
+    cli.paginate_results(small_catalog, small_catalog, page_size=4)
+
+    assert count_formats == [80, 80]
+
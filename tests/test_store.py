@@ -0,0 +1,105 @@
+"""
+Test the local Parquet store and the lazy load API
+"""
+
+import polars as pl
+import pytest
+from typer.testing import CliRunner
+from rdatasets_search import store
+from rdatasets_search.cli import app
+
+from .conftest import FakeResponse
+
+CSV = b"rownames,age,gender,affairs\n1,37,male,0\n2,27,female,NA\n3,32,female,3\n"
+
+
+@pytest.fixture
+def downloads(fake_get, monkeypatch, tmp_path):
+    """Serve CSV for every URL; returns the URLs requested"""
+    monkeypatch.setenv("RDATASETS_STORE_DIR", str(tmp_path / "store"))
+    fake_get.handler = lambda url, headers: FakeResponse(CSV)
+    return fake_get.urls
+
+
+def test_convert_csv_infers_types_and_nulls(tmp_path):
+    """Test that CSVs become Parquet with inferred types and NA as null"""
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_bytes(CSV)
+
+    df = pl.read_parquet(store.convert_csv(csv_path, tmp_path / "data.parquet"))
+
+    assert df.schema["age"] == pl.Int64
+    assert df["affairs"].to_list() == [0, None, 3]
+
+
+def test_load_downloads_once(small_catalog, downloads):
+    """Test that a dataset is downloaded into the store on first load only"""
+    frame = store.load("AER", "Affairs")
+
+    assert isinstance(frame, pl.LazyFrame)
+    assert frame.filter(pl.col("age") > 30).select("affairs").collect()["affairs"].to_list() == [0, 3]
+    assert downloads == ["https://example.org/csv/0.csv"]
+
+    store.load("AER", "Affairs").collect()
+    assert len(downloads) == 1, "Stored datasets should not be downloaded again"
+    assert not list(store.path_for("AER", "Affairs").parent.glob("*.csv*"))
+
+
+def test_load_refresh_downloads_again(small_catalog, downloads):
+    """Test that refresh replaces the stored copy"""
+    store.load("AER", "Affairs")
+    store.load("AER", "Affairs", refresh=True)
+    assert len(downloads) == 2
+
+
+def test_unknown_dataset(small_catalog, downloads):
+    """Test that datasets missing from the catalog are reported"""
+    with pytest.raises(ValueError, match="Unknown dataset"):
+        store.load("AER", "Nope")
+
+
+def test_invalid_names(tmp_path):
+    """Test that names cannot escape the store directory"""
+    with pytest.raises(ValueError):
+        store.path_for("..", "x", tmp_path)
+    with pytest.raises(ValueError):
+        store.path_for("AER", "a/b", tmp_path)
+
+
+def test_add_many_skips_stored(small_catalog, downloads):
+    """Test that bulk adds skip datasets already in the store"""
+    datasets = [("AER", "Affairs", "https://example.org/csv/0.csv"), ("MASS", "Boston", "https://example.org/csv/2.csv")]
+    store.load("AER", "Affairs")
+
+    results = store.add_many(datasets, jobs=2)
+
+    assert results == {"AER/Affairs": "skipped", "MASS/Boston": "downloaded"}
+    assert store.path_for("MASS", "Boston").exists()
+
+
+def test_add_many_retries_transient_errors(small_catalog, downloads, fake_get):
+    """Test that bulk adds retry 5xx answers, `retries` times"""
+    url = "https://example.org/csv/2.csv"
+    failures = {url: 2}
+
+    def flaky(url, headers):
+        if failures.get(url):
+            failures[url] -= 1
+            return FakeResponse(status_code=503)
+        return FakeResponse(CSV)
+
+    fake_get.handler = flaky
+    assert store.add_many([("MASS", "Boston", url)], retries=2, backoff=0) == {"MASS/Boston": "downloaded"}
+    assert len(downloads) == 3
+
+    failures[url] = 1
+    assert store.add_many([("MASS", "survey", url)], retries=0, backoff=0) == {"MASS/survey": "failed"}
+
+
+def test_fetch_store_passes_retries(small_catalog, monkeypatch):
+    """Test that 'r-data fetch --store' hands --retries to add_many"""
+    calls = []
+    monkeypatch.setattr(store, "add_many", lambda datasets, **kwargs: calls.append(kwargs) or {})
+    result = CliRunner().invoke(app, ["fetch", "rows > 600", "--store", "--retries", "5"])
+    assert result.exit_code == 0
+    assert calls[0]["retries"] == 5
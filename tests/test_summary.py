@@ -0,0 +1,97 @@
+"""
+Test the summary statistics behind 'r-data stats'
+"""
+
+import json
+
+from typer.testing import CliRunner
+from rdatasets_search import summary
+from rdatasets_search.cli import app
+from rdatasets_search.search import data_having
+from rdatasets_search.summary import NO_TYPES, summarize
+
+
+def test_overview(small_catalog):
+    """Test counts, totals and quantiles of rows and columns"""
+    overview = summarize(small_catalog).overview
+
+    assert overview["datasets"] == 6
+    assert overview["packages"] == 4
+    assert overview["rows"]["total"] == 2138
+    assert overview["rows"]["min"] == 32
+    assert overview["rows"]["median"] == 506
+    assert overview["rows"]["max"] == 601
+    assert overview["cols"]["mean"] == 67 / 6
+
+
+def test_types_and_mixes(small_catalog):
+    """Test per-type counts and the histogram of type combinations"""
+    summary = summarize(small_catalog)
+
+    types = {row["type"]: row for row in summary.types.to_dicts()}
+    assert types["factor"] == {"type": "factor", "datasets": 3, "columns": 14}
+    assert types["character"]["datasets"] == 0
+    assert summary.mixes.to_dicts() == [
+        {"mix": "binary+factor+numeric", "datasets": 3},
+        {"mix": "binary+numeric", "datasets": 3},
+    ]
+
+
+def test_packages_and_largest(small_catalog):
+    """Test the package ranking and the largest datasets"""
+    summary = summarize(small_catalog, top=2)
+
+    assert summary.packages["Package"].to_list() == ["AER", "MASS"]
+    assert summary.packages.row(0, named=True) == {"Package": "AER", "datasets": 2, "rows": 1135, "cols": 20}
+    assert summary.largest["Item"].to_list() == ["Affairs", "CPS1985"]
+
+
+def test_filtered_and_empty(small_catalog):
+    """Test summaries of a filtered subset and of no datasets"""
+    assert summarize(data_having("factor")).overview["datasets"] == 3
+
+    empty = summarize(data_having("character"))
+    assert empty.overview["datasets"] == 0
+    assert empty.overview["rows"]["median"] is None
+    assert empty.mixes.is_empty() and empty.largest.is_empty()
+
+
+def test_no_type_label(small_catalog):
+    """Test that datasets without any counted type are grouped together"""
+    catalog = small_catalog.with_columns(n_binary=0, n_factor=0, n_numeric=0)
+
+    assert summarize(catalog).mixes.to_dicts() == [{"mix": NO_TYPES, "datasets": 6}]
+
+
+def test_stats_command(small_catalog):
+    """Test the table and JSON output of 'r-data stats'"""
+    runner = CliRunner()
+
+    table = runner.invoke(app, ["stats", "binary", "rows > 500"])
+    assert table.exit_code == 0
+    assert "Datasets: 3 in 2 packages" in table.output
+    assert "Type mixes" in table.output
+
+    result = runner.invoke(app, ["stats", "--format", "json", "--top", "1"])
+    assert result.exit_code == 0
+    report = json.loads(result.output)
+    assert report["overview"]["datasets"] == 6
+    assert report["largest"] == [{"Package": "AER", "Item": "Affairs", "Rows": 601, "Cols": 9}]
+
+    assert runner.invoke(app, ["stats", "--format", "xml"]).exit_code == 1
+    assert runner.invoke(app, ["stats", "bogus"]).exit_code == 1
+
+    result = runner.invoke(app, ["stats", "--top", "-1"])
+    assert result.exit_code == 1
+    assert "Invalid --top: -1" in result.output
+
+
+def test_stats_unexpected_error(small_catalog, monkeypatch):
+    """Test that unexpected failures are reported with exit code 1"""
+    def broken(result, top):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(summary, "summarize", broken)
+    result = CliRunner().invoke(app, ["stats"])
+    assert result.exit_code == 1
+    assert "Unexpected error: disk on fire" in result.output
@@ -0,0 +1,111 @@
+"""
+Test the offline variable index and "var: ..." filters
+"""
+
+import pytest
+import requests
+from rdatasets_search import docs, search, variables
+from rdatasets_search.docparse import DocSections
+from rdatasets_search.search import data_having, parse_filter
+from rdatasets_search.variables import VariableIndex
+
+DOC_VARIABLES = {
+    "https://example.org/doc/0.html": [("affairs", "How often engaged in extramarital affairs"), ("age", "age in years")],
+    "https://example.org/doc/1.html": [("wage", "wage (in dollars per hour)"), ("age", "age in years"), ("gender", "factor")],
+    "https://example.org/doc/2.html": [("medv", "median value of owner-occupied homes")],
+    "https://example.org/doc/3.html": [("Sex:", "The sex of the student"), ("Age:", "Age of the student in years")],
+    "https://example.org/doc/4.html": [("mpg", "Miles/(US) gallon")],
+    "https://example.org/doc/5.html": [("inst:", "Institution code"), ("time:", "Survival time in days")],
+}
+
+
+@pytest.fixture
+def fake_sections(monkeypatch):
+    """Serve the documented variables of the small catalog without network"""
+    fetched = []
+
+    def fetch_sections(doc_url):
+        fetched.append(doc_url)
+        if doc_url not in DOC_VARIABLES:
+            raise requests.ConnectionError("offline")
+        return DocSections("R: x", True, [], True, [], DOC_VARIABLES[doc_url])
+
+    monkeypatch.setattr(docs, "fetch_sections", fetch_sections)
+    return fetched
+
+
+@pytest.fixture
+def variable_index(small_catalog, fake_sections, tmp_path):
+    index, failed = variables.build(small_catalog, directory=tmp_path)
+    assert failed == []
+    search.set_variable_index(index)
+    yield index
+    search.set_variable_index(None)
+
+
+def test_parse_variable_filter():
+    """Test that variable filters are normalized to lowercase terms"""
+    assert parse_filter("var: Income") == ("var", "has", "income")
+    assert parse_filter("VAR:household  income") == ("var", "has", "household income")
+    with pytest.raises(ValueError, match="Invalid argument format"):
+        parse_filter("var:")
+
+
+def test_index_matches_names_and_descriptions():
+    """Test that names and description terms map to their datasets"""
+    index = VariableIndex({
+        "AER/Affairs": [("age", "age in years")],
+        "MASS/Boston": [("medv", "median value of homes")],
+    })
+    assert index.datasets_matching("age") == {"AER/Affairs"}
+    assert index.datasets_matching("median homes") == {"MASS/Boston"}
+    assert index.datasets_matching("age homes") == set()
+
+
+def test_having_var(variable_index):
+    """Test that var filters find datasets by their documented variables"""
+    result = data_having("var: age")
+    assert sorted(result["Item"].to_list()) == ["Affairs", "CPS1985", "survey"]
+
+
+def test_having_var_combined_with_other_filters(variable_index):
+    """Test that var filters combine with type and size filters"""
+    result = data_having("var: age", "factor", "rows > 300")
+    assert sorted(result["Item"].to_list()) == ["Affairs", "CPS1985"]
+    assert len(data_having("var: nonexistent")) == 0
+
+
+def test_index_is_persisted(variable_index, tmp_path):
+    """Test that a built index is loaded back from the cache directory"""
+    loaded = variables.load(tmp_path)
+    assert loaded.variables == variable_index.variables
+
+
+def test_rebuild_only_fetches_new_datasets(small_catalog, fake_sections, tmp_path):
+    """Test that re-running the build skips datasets already indexed"""
+    variables.build(small_catalog.head(3), directory=tmp_path)
+    fake_sections.clear()
+
+    index, _ = variables.build(small_catalog, directory=tmp_path)
+
+    assert len(fake_sections) == 3
+    assert len(index) == 6
+
+
+def test_failed_pages_are_reported(small_catalog, fake_sections, tmp_path):
+    """Test that unreachable pages are reported and retried on the next build"""
+    catalog = small_catalog.with_columns(
+        small_catalog["Doc"].scatter(0, "https://example.org/doc/missing.html")
+    )
+
+    index, failed = variables.build(catalog, directory=tmp_path)
+
+    assert failed == ["AER/Affairs"]
+    assert "AER/Affairs" not in index.variables
+
+
+def test_missing_index_raises(small_catalog, tmp_path, monkeypatch):
+    """Test that var filters explain how to build the index"""
+    search.set_variable_index(None)
+    with pytest.raises(ValueError, match="index-variables"):
+        data_having("var: age")